@@ -22,6 +22,7 @@ class Config:
         
         # VOICEVOX Configuration
         self.voicevox_server_url = os.getenv('VOICEVOX_SERVER_URL', 'http://127.0.0.1:50021')
+        self.voicevox_max_workers = 4  # Sentences or chunks sent to VOICEVOX at the same time
         
         # Directory Configuration
         self.output_dir = os.getenv('OUTPUT_DIR', './output')
@@ -32,6 +33,8 @@ class Config:
         self.video_width = 1920
         self.video_height = 1080
         self.video_fps = 24
+        self.video_crf = 23  # Constant quality for H.264 encoding (lower is better, 0-51)
+        self.use_pyav_decoder = False  # Decode background videos with PyAV when MoviePy has to process frames
         
         # Image Configuration
         self.max_images = 5
@@ -45,6 +48,9 @@ class Config:
         self.audio_format = 'wav'
         self.speaker_id = 3  # VOICEVOX speaker ID
         
+        # Thumbnail Configuration
+        self.jpeg_quality = 88  # JPEG quality for saved thumbnails
+        
         # Create directories if they don't exist
         self._create_directories()
         self._create_credentials_dir()
@@ -106,6 +112,15 @@ class Config:
             
         if self.video_fps <= 0 or self.video_fps > 60:
             errors.append("Video FPS must be between 1 and 60")
+            
+        if self.video_crf < 0 or self.video_crf > 51:
+            errors.append("Video CRF must be between 0 and 51")
+            
+        if self.voicevox_max_workers <= 0 or self.voicevox_max_workers > 16:
+            errors.append("VOICEVOX max workers must be between 1 and 16")
+            
+        if self.jpeg_quality < 1 or self.jpeg_quality > 95:
+            errors.append("JPEG quality must be between 1 and 95")
         
         # Image configuration validation
         if self.max_images <= 0 or self.max_images > 20:
@@ -13,6 +13,7 @@ import os
 import sys
 import argparse
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, Any
 from datetime import datetime
 
@@ -122,30 +123,46 @@ class VideoWorkflow:
                 }
                 self._update_progress("スクリプト生成", 25, f"スクリプト生成完了: {script_data['title']}")
             
-            # ステップ3: 動画取得
-            self._update_progress("動画取得", 30, "関連動画を検索・ダウンロード中...")
-            videos = self.video_fetcher.fetch_videos(script_data['keywords'], self.config.max_videos)
-            result['steps']['video_fetching'] = {
-                'success': True,
-                'count': len(videos),
-                'videos': videos  # 動画リストを結果に保存
-            }
-            self._update_progress("動画取得", 40, f"{len(videos)}本の動画をダウンロード完了")
-            
-            # ステップ4: 画像取得（フォールバック用）
-            self._update_progress("画像取得", 45, "関連画像を検索・ダウンロード中...")
-            images = self.image_fetcher.fetch_images(script_data['keywords'], self.config.max_images)
-            result['steps']['image_fetching'] = {
-                'success': True,
-                'count': len(images),
-                'images': images  # 画像リストを結果に保存
-            }
-            self._update_progress("画像取得", 50, f"{len(images)}枚の画像をダウンロード完了")
-            
-            # ステップ5: 音声生成
-            self._update_progress("音声生成", 55, "スクリプトから音声を生成中...")
+            # 音声生成はVOICEVOX側の処理なので、動画・画像のダウンロードと並行して進める
             is_custom = result['steps']['script_generation']['custom']
-            audio_path = self.voice_generator.generate_voice(script_data['script'], is_custom_script=is_custom)
+            voice_executor = ThreadPoolExecutor(max_workers=1)
+            voice_future = voice_executor.submit(
+                self.voice_generator.generate_voice, script_data['script'], is_custom_script=is_custom
+            )
+            try:
+                # ステップ3: 動画取得
+                self._update_progress("動画取得", 30, "関連動画を検索・ダウンロード中...")
+                videos = self.video_fetcher.fetch_videos(script_data['keywords'], self.config.max_videos)
+                result['steps']['video_fetching'] = {
+                    'success': True,
+                    'count': len(videos),
+                    'videos': videos  # 動画リストを結果に保存
+                }
+                self._update_progress("動画取得", 40, f"{len(videos)}本の動画をダウンロード完了")
+                
+                # 音声生成が既に失敗していれば、残りのダウンロードを待たずにエラーにする
+                self._raise_if_voice_failed(voice_future)
+                
+                # ステップ4: 画像取得（フォールバック用）
+                self._update_progress("画像取得", 45, "関連画像を検索・ダウンロード中...")
+                images = self.image_fetcher.fetch_images(script_data['keywords'], self.config.max_images)
+                result['steps']['image_fetching'] = {
+                    'success': True,
+                    'count': len(images),
+                    'images': images  # 画像リストを結果に保存
+                }
+                self._update_progress("画像取得", 50, f"{len(images)}枚の画像をダウンロード完了")
+                
+                # ステップ5: 音声生成
+                self._update_progress("音声生成", 55, "音声生成の完了を待機中...")
+                audio_path = voice_future.result()
+            except BaseException:
+                # 音声生成の完了は待たずにエラーを返す（未開始なら取り消し、生成済み・生成後の音声は削除）
+                voice_future.cancel()
+                voice_executor.shutdown(wait=False)
+                voice_future.add_done_callback(self._discard_voice_result)
+                raise
+            voice_executor.shutdown()
             result['steps']['voice_generation'] = {
                 'success': True,
                 'audio_path': audio_path
@@ -369,6 +386,22 @@ class VideoWorkflow:
             
             raise RuntimeError(error_msg)
     
+    @staticmethod
+    def _raise_if_voice_failed(voice_future):
+        """バックグラウンドの音声生成が失敗済みなら、その例外を送出"""
+        if voice_future.done():
+            voice_future.result()
+    
+    @staticmethod
+    def _discard_voice_result(voice_future):
+        """中断した動画生成のために作られた音声ファイルを削除"""
+        if voice_future.cancelled() or voice_future.exception() is not None:
+            return
+        try:
+            os.remove(voice_future.result())
+        except OSError:
+            pass
+    
     def _cleanup_temp_files(self):
         """一時ファイルをクリーンアップ"""
         try:
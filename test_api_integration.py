@@ -283,6 +283,7 @@ class TestVOICEVOXAPIIntegration(unittest.TestCase):
         """Set up test fixtures"""
         self.config = Mock(spec=Config)
         self.config.voicevox_server_url = "http://localhost:50021"
+        self.config.voicevox_max_workers = 4
         self.config.speaker_id = 1
         self.config.temp_dir = tempfile.mkdtemp()
     
@@ -79,6 +79,7 @@ class TestConfig(unittest.TestCase):
         self.assertEqual(config.youtube_credentials_file, './credentials/youtube_credentials.json')
         self.assertEqual(config.youtube_token_file, './credentials/youtube_token.json')
         self.assertEqual(config.voicevox_server_url, 'http://127.0.0.1:50021')
+        self.assertEqual(config.voicevox_max_workers, 4)
         self.assertEqual(config.output_dir, './output')
         self.assertEqual(config.temp_dir, './temp')
         
@@ -87,6 +88,8 @@ class TestConfig(unittest.TestCase):
         self.assertEqual(config.video_width, 1920)
         self.assertEqual(config.video_height, 1080)
         self.assertEqual(config.video_fps, 24)
+        self.assertEqual(config.video_crf, 23)
+        self.assertFalse(config.use_pyav_decoder)
         
         # Check image settings
         self.assertEqual(config.max_images, 5)
@@ -95,6 +98,9 @@ class TestConfig(unittest.TestCase):
         # Check audio settings
         self.assertEqual(config.audio_format, 'wav')
         self.assertEqual(config.speaker_id, 3)
+        
+        # Check thumbnail settings
+        self.assertEqual(config.jpeg_quality, 88)
     
     @patch('os.makedirs')
     def test_create_directories_success(self, mock_makedirs):
@@ -255,6 +261,42 @@ class TestConfig(unittest.TestCase):
             error_msg = str(context.exception)
             self.assertIn("Speaker ID must be non-negative", error_msg)
     
+    @patch('config.load_dotenv')
+    @patch.dict(os.environ, {'GEMINI_API_KEY': 'test', 'UNSPLASH_ACCESS_KEY': 'test'})
+    def test_validate_invalid_voicevox_max_workers(self, mock_load_dotenv):
+        """Test validation with a non-positive VOICEVOX worker count"""
+        config = Config()
+        
+        config.voicevox_max_workers = 0  # Invalid
+        
+        with patch('os.path.exists', return_value=True), \
+             patch('os.access', return_value=True), \
+             patch.object(config, '_check_voicevox_connection', return_value=True):
+            
+            with self.assertRaises(ValueError) as context:
+                config.validate()
+            
+            error_msg = str(context.exception)
+            self.assertIn("VOICEVOX max workers must be between 1 and 16", error_msg)
+    
+    @patch('config.load_dotenv')
+    @patch.dict(os.environ, {'GEMINI_API_KEY': 'test', 'UNSPLASH_ACCESS_KEY': 'test'})
+    def test_validate_invalid_jpeg_quality(self, mock_load_dotenv):
+        """Test validation with a JPEG quality outside Pillow's useful range"""
+        config = Config()
+        
+        config.jpeg_quality = 100  # Invalid
+        
+        with patch('os.path.exists', return_value=True), \
+             patch('os.access', return_value=True), \
+             patch.object(config, '_check_voicevox_connection', return_value=True):
+            
+            with self.assertRaises(ValueError) as context:
+                config.validate()
+            
+            error_msg = str(context.exception)
+            self.assertIn("JPEG quality must be between 1 and 95", error_msg)
+    
     @patch('config.load_dotenv')
     @patch.dict(os.environ, {'GEMINI_API_KEY': 'test', 'UNSPLASH_ACCESS_KEY': 'test'})
     def test_validate_voicevox_not_accessible(self, mock_load_dotenv):
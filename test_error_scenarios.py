@@ -3,6 +3,7 @@ from unittest.mock import Mock, patch, MagicMock
 import os
 import tempfile
 import requests
+from concurrent.futures import Future
 from main import VideoWorkflow
 from script_generator import ScriptGenerator
 from image_fetcher import ImageFetcher
@@ -11,6 +12,24 @@ from video_creator import VideoCreator
 from config import Config
 
 
+class SynchronousExecutor:
+    """ThreadPoolExecutor stand-in that runs each job at submit time, so its future is already done"""
+    
+    def __init__(self, max_workers=None):
+        pass
+    
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+    
+    def shutdown(self, wait=True):
+        pass
+
+
 class TestNetworkErrorScenarios(unittest.TestCase):
     """Test network error scenarios across all components"""
     
@@ -327,6 +346,7 @@ class TestServiceUnavailableScenarios(unittest.TestCase):
         """Set up test fixtures"""
         self.config = Mock(spec=Config)
         self.config.voicevox_server_url = "http://localhost:50021"
+        self.config.voicevox_max_workers = 4
         self.config.speaker_id = 1
     
     @patch('requests.Session.post')
@@ -369,6 +389,7 @@ class TestWorkflowErrorRecovery(unittest.TestCase):
         self.config.temp_dir = tempfile.mkdtemp()
         self.config.output_dir = tempfile.mkdtemp()
         self.config.max_images = 5
+        self.config.max_videos = 5
     
     def tearDown(self):
         """Clean up test fixtures"""
@@ -448,10 +469,47 @@ class TestWorkflowErrorRecovery(unittest.TestCase):
         # Should have attempted image fetching
         mock_image_fetcher.fetch_images.assert_called_once()
         
-        # Should not have attempted voice or video generation
-        mock_voice_gen.generate_voice.assert_not_called()
+        # Voice generation runs alongside fetching, but video creation must not start
         mock_video_creator.create_video.assert_not_called()
     
+    @patch('main.ThreadPoolExecutor', SynchronousExecutor)
+    @patch('main.VideoCreator')
+    @patch('main.VoiceGenerator')
+    @patch('main.ImageFetcher')
+    @patch('main.VideoFetcher')
+    @patch('main.ScriptGenerator')
+    def test_workflow_voice_failure_stops_before_image_fetching(self, mock_script_class, mock_video_fetcher_class,
+                                                               mock_image_class, mock_voice_class, mock_video_class):
+        """Test a VOICEVOX failure during video fetching fails the workflow before images are fetched"""
+        mock_script_gen = Mock()
+        mock_script_gen.generate_script.return_value = {
+            'title': 'Test', 'script': 'Test script', 'keywords': 'test'
+        }
+        mock_script_class.return_value = mock_script_gen
+        
+        # Voice generation has already failed by the time the videos are downloaded
+        mock_voice_gen = Mock()
+        mock_voice_gen.generate_voice.side_effect = RuntimeError("VOICEVOX server is not accessible")
+        mock_voice_class.return_value = mock_voice_gen
+        
+        mock_video_fetcher = Mock()
+        mock_video_fetcher.fetch_videos.return_value = []
+        mock_video_fetcher_class.return_value = mock_video_fetcher
+        
+        mock_image_fetcher = Mock()
+        mock_image_class.return_value = mock_image_fetcher
+        mock_video_class.return_value = Mock()
+        
+        self.config.validate.return_value = True
+        
+        workflow = VideoWorkflow(self.config)
+        
+        with self.assertRaises(RuntimeError) as context:
+            workflow.generate_video("test theme")
+        
+        self.assertIn("VOICEVOX server is not accessible", str(context.exception))
+        mock_image_fetcher.fetch_images.assert_not_called()
+    
     @patch('main.VideoCreator')
     @patch('main.VoiceGenerator')
     @patch('main.ImageFetcher')
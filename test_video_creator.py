@@ -1,51 +1,101 @@
-import unittest
-from unittest.mock import Mock, patch, MagicMock
+import pytest
+import json
+import re
+import numpy as np
+from unittest.mock import Mock, MagicMock, call
 import os
-import tempfile
+import shutil
+from types import SimpleNamespace
 from video_creator import VideoCreator
 from config import Config
 
 
-class TestVideoCreator(unittest.TestCase):
+# Expected RuntimeError message for each raw error passed to _handle_video_error
+HANDLE_VIDEO_ERROR_PATTERNS = {
+    error_msg: re.compile(re.escape(expected))
+    for error_msg, expected in [
+        ("Codec not found", "Video codec error"),
+        ("Out of memory", "Insufficient memory"),
+        ("Permission denied", "Permission denied"),
+        ("No space left on disk", "Insufficient disk space"),
+        ("Unknown error", "Video creation failed"),
+    ]
+}
+
+
+@pytest.fixture(autouse=True)
+def software_encoder(monkeypatch):
+    """Pin the detected encoder so tests don't probe the local FFmpeg"""
+    monkeypatch.setattr(VideoCreator, '_detected_encoder', 'libx264')
+
+
+@pytest.fixture
+def create_video_mocks(monkeypatch):
+    """Install AudioFileClip, slideshow and render mocks used by create_video tests"""
+    mocks = SimpleNamespace(
+        audio_clip=Mock(),
+        slideshow=Mock(),
+        render=Mock(),
+        audio=Mock(),
+        video=Mock(),
+        final_clip=Mock()
+    )
+    mocks.audio.duration = 25.0
+    mocks.audio_clip.return_value = mocks.audio
+    mocks.slideshow.return_value = mocks.video
+    mocks.video.set_audio.return_value = mocks.final_clip
+    
+    monkeypatch.setattr('video_creator.AudioFileClip', mocks.audio_clip)
+    monkeypatch.setattr(VideoCreator, '_probe_duration', Mock(return_value=None))
+    monkeypatch.setattr(VideoCreator, '_create_image_slideshow', mocks.slideshow)
+    monkeypatch.setattr(VideoCreator, '_render_slideshow_ffmpeg', Mock(return_value=False))
+    monkeypatch.setattr(VideoCreator, '_render_video_background_ffmpeg', Mock(return_value=False))
+    monkeypatch.setattr(VideoCreator, '_render_video', mocks.render)
+    
+    return mocks
+
+
+class TestVideoCreator:
     """Test cases for VideoCreator class"""
     
-    def setUp(self):
+    def setup_method(self):
         """Set up test fixtures"""
         self.config = Mock(spec=Config)
         self.config.video_duration = 30
         self.config.video_width = 1920
         self.config.video_height = 1080
         self.config.video_fps = 30
+        self.config.video_crf = 23
+        self.config.use_pyav_decoder = False
         self.config.output_dir = "/tmp/test_output"
         
         # Create temp directories for testing
         os.makedirs(self.config.output_dir, exist_ok=True)
     
-    def tearDown(self):
+    def teardown_method(self):
         """Clean up test fixtures"""
         # Clean up test directories
         for test_dir in [self.config.output_dir]:
             if os.path.exists(test_dir):
-                import shutil
                 shutil.rmtree(test_dir, ignore_errors=True)
     
     def test_init(self):
         """Test VideoCreator initialization"""
         creator = VideoCreator(self.config)
         
-        self.assertEqual(creator.config, self.config)
-        self.assertEqual(creator.target_duration, 30)
-        self.assertEqual(creator.video_size, (1920, 1080))
-        self.assertEqual(creator.fps, 30)
+        assert creator.config == self.config
+        assert creator.target_duration == 30
+        assert creator.video_size == (1920, 1080)
+        assert creator.fps == 30
     
     def test_create_video_no_images(self):
         """Test video creation with no images"""
         creator = VideoCreator(self.config)
         
-        with self.assertRaises(ValueError) as context:
+        with pytest.raises(ValueError) as context:
             creator.create_video([], "audio.wav")
         
-        self.assertIn("No images provided", str(context.exception))
+        assert "No images provided" in str(context.value)
     
     def test_create_video_audio_not_found(self):
         """Test video creation with non-existent audio file"""
@@ -53,31 +103,17 @@ class TestVideoCreator(unittest.TestCase):
         
         images = [{'local_path': 'test.jpg'}]
         
-        with self.assertRaises(ValueError) as context:
+        with pytest.raises(ValueError) as context:
             creator.create_video(images, "nonexistent_audio.wav")
         
-        self.assertIn("Audio file not found", str(context.exception))
+        assert "Audio file not found" in str(context.value)
     
-    @patch('video_creator.AudioFileClip')
-    @patch.object(VideoCreator, '_create_image_slideshow')
-    @patch.object(VideoCreator, '_render_video')
-    @patch('time.time')
-    def test_create_video_success(self, mock_time, mock_render, mock_slideshow, mock_audio_clip):
+    def test_create_video_success(self, monkeypatch, create_video_mocks):
         """Test successful video creation"""
-        creator = VideoCreator(self.config)
-        
-        # Mock dependencies
-        mock_time.return_value = 1234567890
+        monkeypatch.setattr('time.time', Mock(return_value=1234567890))
+        mocks = create_video_mocks
         
-        mock_audio = Mock()
-        mock_audio.duration = 25.0
-        mock_audio_clip.return_value = mock_audio
-        
-        mock_video = Mock()
-        mock_slideshow.return_value = mock_video
-        
-        mock_final_clip = Mock()
-        mock_video.set_audio.return_value = mock_final_clip
+        creator = VideoCreator(self.config)
         
         # Create test audio file
         test_audio = os.path.join(self.config.output_dir, "test_audio.wav")
@@ -89,33 +125,22 @@ class TestVideoCreator(unittest.TestCase):
         result = creator.create_video(images, test_audio)
         
         expected_path = os.path.join(self.config.output_dir, "video_1234567890.mp4")
-        self.assertEqual(result, expected_path)
+        assert result == expected_path
         
-        mock_slideshow.assert_called_once_with(images, 25.0)  # Should use actual audio duration
-        mock_video.set_audio.assert_called_once()
-        mock_render.assert_called_once_with(mock_final_clip, expected_path)
+        mocks.slideshow.assert_called_once_with(images, 25.0)  # Should use actual audio duration
+        mocks.video.set_audio.assert_called_once()
+        mocks.render.assert_called_once_with(mocks.final_clip, expected_path, test_audio)
         
         # Check cleanup calls
-        mock_audio.close.assert_called_once()
-        mock_video.close.assert_called_once()
-        mock_final_clip.close.assert_called_once()
-    
-    @patch('video_creator.AudioFileClip')
-    @patch.object(VideoCreator, '_create_image_slideshow')
-    @patch.object(VideoCreator, '_render_video')
-    def test_create_video_custom_filename(self, mock_render, mock_slideshow, mock_audio_clip):
+        mocks.audio.close.assert_called_once()
+        mocks.video.close.assert_called_once()
+        mocks.final_clip.close.assert_called_once()
+    
+    def test_create_video_custom_filename(self, create_video_mocks):
         """Test video creation with custom filename"""
-        creator = VideoCreator(self.config)
-        
-        # Mock dependencies
-        mock_audio = Mock()
-        mock_audio.duration = 25.0
-        mock_audio_clip.return_value = mock_audio
+        mocks = create_video_mocks
         
-        mock_video = Mock()
-        mock_slideshow.return_value = mock_video
-        mock_final_clip = Mock()
-        mock_video.set_audio.return_value = mock_final_clip
+        creator = VideoCreator(self.config)
         
         # Create test audio file
         test_audio = os.path.join(self.config.output_dir, "test_audio.wav")
@@ -127,24 +152,15 @@ class TestVideoCreator(unittest.TestCase):
         result = creator.create_video(images, test_audio, "custom_video.mp4")
         
         expected_path = os.path.join(self.config.output_dir, "custom_video.mp4")
-        self.assertEqual(result, expected_path)
-        mock_render.assert_called_once_with(mock_final_clip, expected_path)
+        assert result == expected_path
+        mocks.render.assert_called_once_with(mocks.final_clip, expected_path, test_audio)
     
-    @patch('video_creator.AudioFileClip')
-    @patch.object(VideoCreator, '_create_image_slideshow')
-    def test_create_video_duration_limit(self, mock_slideshow, mock_audio_clip):
+    def test_create_video_duration_limit(self, create_video_mocks):
         """Test video creation with audio longer than target duration"""
-        creator = VideoCreator(self.config)
-        
-        # Mock long audio
-        mock_audio = Mock()
-        mock_audio.duration = 45.0  # Longer than 30-second target
-        mock_audio_clip.return_value = mock_audio
+        mocks = create_video_mocks
+        mocks.audio.duration = 45.0  # Longer than 30-second target
         
-        mock_video = Mock()
-        mock_slideshow.return_value = mock_video
-        mock_final_clip = Mock()
-        mock_video.set_audio.return_value = mock_final_clip
+        creator = VideoCreator(self.config)
         
         # Create test audio file
         test_audio = os.path.join(self.config.output_dir, "test_audio.wav")
@@ -153,31 +169,288 @@ class TestVideoCreator(unittest.TestCase):
         
         images = [{'local_path': 'test.jpg'}]
         
-        with patch.object(creator, '_render_video'):
-            creator.create_video(images, test_audio)
+        creator.create_video(images, test_audio)
         
         # Should use target duration (30s) instead of actual duration (45s)
-        mock_slideshow.assert_called_once_with(images, 30.0)
-        mock_audio.subclip.assert_called_once_with(0, 30.0)
+        mocks.slideshow.assert_called_once_with(images, 30.0)
+        mocks.audio.subclip.assert_called_once_with(0, 30.0)
+    
+    def test_create_videos_batch_single_job(self, monkeypatch):
+        """Test a single batch job runs in this process with a numbered filename"""
+        mock_pool = Mock()
+        monkeypatch.setattr('video_creator.ProcessPoolExecutor', mock_pool)
+        
+        creator = VideoCreator(self.config)
+        creator.create_video = Mock(return_value='out.mp4')
+        
+        assert creator.create_videos_batch([{'images': [], 'audio_path': 'a.wav'}]) == ['out.mp4']
+        
+        kwargs = creator.create_video.call_args[1]
+        assert re.fullmatch(r'video_\d+_1\.mp4', kwargs['output_filename'])
+        mock_pool.assert_not_called()
+    
+    def test_create_videos_batch_splits_threads(self, monkeypatch):
+        """Test batch jobs run in worker processes that share the cores"""
+        monkeypatch.setattr('video_creator.os.cpu_count', Mock(return_value=8))
+        executor = MagicMock()
+        executor.submit.side_effect = [Mock(result=Mock(return_value=path)) for path in ('a.mp4', 'b.mp4')]
+        mock_pool = MagicMock()
+        mock_pool.return_value.__enter__.return_value = executor
+        monkeypatch.setattr('video_creator.ProcessPoolExecutor', mock_pool)
+        
+        creator = VideoCreator(self.config)
+        jobs = [
+            {'images': [], 'audio_path': 'a.wav', 'output_filename': 'a.mp4'},
+            {'images': [], 'audio_path': 'b.wav'}
+        ]
+        
+        assert creator.create_videos_batch(jobs) == ['a.mp4', 'b.mp4']
+        
+        mock_pool.assert_called_once_with(max_workers=2)
+        worker = executor.submit.call_args_list[0][0][0].__self__
+        assert worker is not creator
+        assert worker.threads == 4
+        assert creator.threads is None
+        assert executor.submit.call_args_list[0][1]['output_filename'] == 'a.mp4'
+        assert re.fullmatch(r'video_\d+_2\.mp4', executor.submit.call_args_list[1][1]['output_filename'])
+    
+    def test_create_video_ffmpeg_slideshow(self, monkeypatch, create_video_mocks):
+        """Test still-image videos skip MoviePy when FFmpeg renders the slideshow"""
+        mocks = create_video_mocks
+        mock_ffmpeg = Mock(return_value=True)
+        monkeypatch.setattr(VideoCreator, '_render_slideshow_ffmpeg', mock_ffmpeg)
+        
+        creator = VideoCreator(self.config)
+        
+        test_audio = os.path.join(self.config.output_dir, "test_audio.wav")
+        with open(test_audio, 'wb') as f:
+            f.write(b'fake audio data')
+        
+        images = [{'local_path': 'test.jpg'}]
+        
+        result = creator.create_video(images, test_audio, "custom_video.mp4")
+        
+        expected_path = os.path.join(self.config.output_dir, "custom_video.mp4")
+        assert result == expected_path
+        mock_ffmpeg.assert_called_once_with(images, test_audio, 25.0, expected_path)
+        mocks.slideshow.assert_not_called()
+        mocks.render.assert_not_called()
+        mocks.audio.close.assert_called_once()
+    
+    def test_create_video_probes_audio_duration(self, monkeypatch, create_video_mocks):
+        """Test FFmpeg renders don't open the MoviePy audio reader when ffprobe knows the duration"""
+        mocks = create_video_mocks
+        monkeypatch.setattr(VideoCreator, '_probe_duration', Mock(return_value=20.0))
+        mock_ffmpeg = Mock(return_value=True)
+        monkeypatch.setattr(VideoCreator, '_render_slideshow_ffmpeg', mock_ffmpeg)
+        
+        creator = VideoCreator(self.config)
+        
+        test_audio = os.path.join(self.config.output_dir, "test_audio.wav")
+        with open(test_audio, 'wb') as f:
+            f.write(b'fake audio data')
+        
+        images = [{'local_path': 'test.jpg'}]
+        
+        creator.create_video(images, test_audio, "custom_video.mp4")
+        
+        expected_path = os.path.join(self.config.output_dir, "custom_video.mp4")
+        mock_ffmpeg.assert_called_once_with(images, test_audio, 20.0, expected_path)
+        mocks.audio_clip.assert_not_called()
+    
+    def test_render_slideshow_ffmpeg_command(self, monkeypatch):
+        """Test FFmpeg slideshow command fits, fades and concatenates the images"""
+        mock_run = Mock(return_value=Mock(returncode=0, stderr=''))
+        monkeypatch.setattr('video_creator.subprocess.run', mock_run)
+        monkeypatch.setattr('video_creator.os.path.exists', Mock(return_value=True))
+        monkeypatch.setattr('video_creator.os.path.getsize', Mock(return_value=5000000))
+        
+        creator = VideoCreator(self.config)
+        images = [{'local_path': 'image1.jpg'}, {'local_path': 'image2.jpg'}]
+        
+        assert creator._render_slideshow_ffmpeg(images, 'audio.wav', 30.0, 'out.mp4') is True
+        
+        cmd = mock_run.call_args[0][0]
+        assert cmd.count('-loop') == 2
+        assert cmd[cmd.index('-c:v') + 1] == 'libx264'
+        assert cmd[-1] == 'out.mp4'
+        
+        filter_graph = cmd[cmd.index('-filter_complex') + 1]
+        assert 'pad=1920:1080' in filter_graph
+        assert 'fade=t=out:st=14.500' in filter_graph
+        assert 'fade=t=in:st=0' in filter_graph
+        assert filter_graph.endswith('[v0][v1]concat=n=2:v=1:a=0[v]')
+    
+    def test_create_video_ffmpeg_background(self, monkeypatch, create_video_mocks):
+        """Test background videos are rendered by FFmpeg without MoviePy"""
+        mocks = create_video_mocks
+        mock_ffmpeg = Mock(return_value=True)
+        monkeypatch.setattr(VideoCreator, '_render_video_background_ffmpeg', mock_ffmpeg)
+        mock_background = Mock()
+        monkeypatch.setattr(VideoCreator, '_create_video_background', mock_background)
+        
+        creator = VideoCreator(self.config)
+        
+        test_audio = os.path.join(self.config.output_dir, "test_audio.wav")
+        with open(test_audio, 'wb') as f:
+            f.write(b'fake audio data')
+        
+        videos = [{'local_path': 'background.mp4'}]
+        
+        result = creator.create_video([], test_audio, "custom_video.mp4", videos=videos)
+        
+        expected_path = os.path.join(self.config.output_dir, "custom_video.mp4")
+        assert result == expected_path
+        mock_ffmpeg.assert_called_once_with(videos, test_audio, 25.0, expected_path)
+        mock_background.assert_not_called()
+        mocks.render.assert_not_called()
+    
+    def test_render_video_background_ffmpeg_single_video(self, monkeypatch):
+        """Test a single background video is looped at the demuxer and letterboxed"""
+        mock_run = Mock(return_value=Mock(returncode=0, stderr=''))
+        monkeypatch.setattr('video_creator.subprocess.run', mock_run)
+        monkeypatch.setattr(VideoCreator, '_can_stream_copy', Mock(return_value=False))
+        monkeypatch.setattr('video_creator.os.path.exists', Mock(return_value=True))
+        monkeypatch.setattr('video_creator.os.path.getsize', Mock(return_value=5000000))
+        
+        creator = VideoCreator(self.config)
+        
+        assert creator._render_video_background_ffmpeg(
+            [{'local_path': 'background.mp4'}], 'audio.wav', 30.0, 'out.mp4'
+        ) is True
+        
+        cmd = mock_run.call_args[0][0]
+        assert cmd[cmd.index('-stream_loop') + 1] == '-1'
+        assert cmd[cmd.index('-filter_complex') + 1].startswith(
+            '[0:v]scale=1920:1080:force_original_aspect_ratio=decrease,pad=1920:1080'
+        )
+        assert cmd[cmd.index('-map') + 1] == '[v0]'
+        assert cmd[cmd.index('-t') + 1] == '30.000'
+        assert cmd[cmd.index('-c:a') + 1] == 'aac'
+        assert '-hwaccel' not in cmd
+    
+    def test_render_video_background_ffmpeg_nvenc_decodes_on_gpu(self, monkeypatch):
+        """Test NVENC renders also decode background videos with CUDA and cap the bitrate"""
+        monkeypatch.setattr(VideoCreator, '_detected_encoder', 'h264_nvenc')
+        mock_run = Mock(return_value=Mock(returncode=0, stderr=''))
+        monkeypatch.setattr('video_creator.subprocess.run', mock_run)
+        monkeypatch.setattr(VideoCreator, '_can_stream_copy', Mock(return_value=False))
+        monkeypatch.setattr('video_creator.os.path.exists', Mock(return_value=True))
+        monkeypatch.setattr('video_creator.os.path.getsize', Mock(return_value=5000000))
+        
+        creator = VideoCreator(self.config)
+        
+        assert creator._render_video_background_ffmpeg(
+            [{'local_path': 'background.mp4'}], 'audio.wav', 30.0, 'out.mp4'
+        ) is True
+        
+        cmd = mock_run.call_args[0][0]
+        assert cmd[cmd.index('-hwaccel') + 1] == 'cuda'
+        assert cmd.index('-hwaccel') < cmd.index('-i')
+        assert cmd[cmd.index('-c:v') + 1] == 'h264_nvenc'
+        assert cmd[cmd.index('-maxrate') + 1] == '4000k'
     
-    @patch('video_creator.ImageClip')
-    @patch('video_creator.concatenate_videoclips')
-    @patch('os.path.exists')
-    def test_create_image_slideshow_success(self, mock_exists, mock_concat, mock_image_clip):
+    def test_render_video_background_ffmpeg_stream_copy(self, monkeypatch):
+        """Test a background video already in the output format is remuxed without re-encoding"""
+        probe = Mock(returncode=0, stdout=json.dumps({
+            'streams': [{'codec_name': 'h264', 'pix_fmt': 'yuv420p', 'width': 1920, 'height': 1080,
+                         'r_frame_rate': '30/1'}],
+            'format': {'duration': '42.0'}
+        }))
+        mock_run = Mock(side_effect=[probe, Mock(returncode=0, stderr='')])
+        monkeypatch.setattr('video_creator.subprocess.run', mock_run)
+        monkeypatch.setattr('video_creator.os.path.exists', Mock(return_value=True))
+        monkeypatch.setattr('video_creator.os.path.getsize', Mock(return_value=5000000))
+        
+        creator = VideoCreator(self.config)
+        
+        assert creator._render_video_background_ffmpeg(
+            [{'local_path': 'background.mp4'}], 'audio.wav', 30.0, 'out.mp4'
+        ) is True
+        
+        cmd = mock_run.call_args[0][0]
+        assert cmd[cmd.index('-c:v') + 1] == 'copy'
+        assert '-filter_complex' not in cmd
+        assert '-stream_loop' not in cmd
+    
+    @pytest.mark.parametrize('stream_changes, source_duration', [
+        ({'width': 1280, 'height': 720}, '42.0'),
+        ({'r_frame_rate': '25/1'}, '42.0'),
+        ({'codec_name': 'hevc'}, '42.0'),
+        ({}, '12.0'),
+    ])
+    def test_can_stream_copy_rejects_mismatch(self, monkeypatch, stream_changes, source_duration):
+        """Test stream copy is skipped for other sizes, frame rates, codecs or too-short sources"""
+        stream = {'codec_name': 'h264', 'pix_fmt': 'yuv420p', 'width': 1920, 'height': 1080, 'r_frame_rate': '30/1'}
+        stream.update(stream_changes)
+        probe = Mock(returncode=0, stdout=json.dumps({'streams': [stream], 'format': {'duration': source_duration}}))
+        monkeypatch.setattr('video_creator.subprocess.run', Mock(return_value=probe))
+        
+        creator = VideoCreator(self.config)
+        
+        assert creator._can_stream_copy('background.mp4', 30.0) is False
+    
+    def test_render_video_background_ffmpeg_concat_list(self, monkeypatch):
+        """Test multiple background videos are looped as one concat-demuxer input with one fit filter"""
+        concat_lists = []
+        
+        def run(cmd, **kwargs):
+            list_path = cmd[cmd.index('-i') + 1]
+            with open(list_path, encoding='utf-8') as f:
+                concat_lists.append((list_path, f.read()))
+            return Mock(returncode=0, stderr='')
+        
+        mock_run = Mock(side_effect=run)
+        monkeypatch.setattr('video_creator.subprocess.run', mock_run)
+        monkeypatch.setattr('video_creator.os.path.exists', Mock(return_value=True))
+        monkeypatch.setattr('video_creator.os.path.getsize', Mock(return_value=5000000))
+        
+        creator = VideoCreator(self.config)
+        videos = [{'local_path': '/videos/a.mp4'}, {'local_path': "/videos/it's.mp4"}]
+        
+        assert creator._render_video_background_ffmpeg(videos, 'audio.m4a', 25.0, 'out.mp4') is True
+        
+        cmd = mock_run.call_args[0][0]
+        inputs = [cmd[i + 1] for i, arg in enumerate(cmd) if arg == '-i']
+        assert len(inputs) == 2 and inputs[1] == 'audio.m4a'
+        assert cmd[cmd.index('-f') + 1] == 'concat'
+        assert cmd[cmd.index('-stream_loop') + 1] == '-1'
+        assert cmd[cmd.index('-filter_complex') + 1].count('scale=') == 1
+        assert cmd[cmd.index('-c:a') + 1] == 'copy'
+        
+        list_path, contents = concat_lists[0]
+        assert contents == "file '/videos/a.mp4'\nfile '/videos/it'\\''s.mp4'\n"
+        assert not os.path.isfile(list_path)
+    
+    def test_render_slideshow_ffmpeg_unavailable(self, monkeypatch):
+        """Test FFmpeg slideshow reports fallback when FFmpeg is missing"""
+        monkeypatch.setattr('video_creator.subprocess.run', Mock(side_effect=FileNotFoundError()))
+        monkeypatch.setattr('video_creator.os.path.exists', Mock(return_value=True))
+        
+        creator = VideoCreator(self.config)
+        
+        assert creator._render_slideshow_ffmpeg([{'local_path': 'image1.jpg'}], 'audio.wav', 30.0, 'out.mp4') is False
+    
+    def test_create_image_slideshow_success(self, monkeypatch):
         """Test successful image slideshow creation"""
+        mock_image_clip = Mock()
+        mock_concat = Mock()
+        monkeypatch.setattr('video_creator.ImageClip', mock_image_clip)
+        monkeypatch.setattr('video_creator.concatenate_videoclips', mock_concat)
+        monkeypatch.setattr('os.path.exists', Mock(return_value=True))
+        
         creator = VideoCreator(self.config)
         
-        mock_exists.return_value = True
+        # Mock fitted frames loaded with Pillow (looked up by path, loading runs on a thread pool)
+        mock_frame1 = Mock()
+        mock_frame2 = Mock()
+        frames = {'image1.jpg': mock_frame1, 'image2.jpg': mock_frame2}
+        creator._load_fitted_image = Mock(side_effect=frames.get)
         
         # Mock image clips
-        mock_clip1 = Mock()
-        mock_clip2 = Mock()
-        mock_image_clip.side_effect = [mock_clip1, mock_clip2]
-        
-        # Mock resize method
         mock_resized1 = Mock()
         mock_resized2 = Mock()
-        creator._resize_and_fit_image = Mock(side_effect=[mock_resized1, mock_resized2])
+        mock_image_clip.side_effect = [mock_resized1, mock_resized2]
         
         # Mock duration setting and transitions
         mock_resized1.set_duration.return_value = mock_resized1
@@ -197,12 +470,12 @@ class TestVideoCreator(unittest.TestCase):
         
         result = creator._create_image_slideshow(images, 30.0)
         
-        self.assertEqual(result, mock_final)
+        assert result == mock_final
         
-        # Check that images were processed
-        self.assertEqual(mock_image_clip.call_count, 2)
-        mock_image_clip.assert_any_call('image1.jpg')
-        mock_image_clip.assert_any_call('image2.jpg')
+        # Check that images were resized once up front and wrapped in clips
+        creator._load_fitted_image.assert_has_calls([call('image1.jpg'), call('image2.jpg')], any_order=True)
+        assert creator._load_fitted_image.call_count == 2
+        assert mock_image_clip.call_args_list == [call(mock_frame1), call(mock_frame2)]
         
         # Check duration setting (15 seconds per image for 30-second total)
         mock_resized1.set_duration.assert_called_with(15.0)
@@ -212,191 +485,250 @@ class TestVideoCreator(unittest.TestCase):
         mock_resized1.fadeout.assert_called_once()
         mock_resized2.fadein.assert_called_once()
         
-        mock_concat.assert_called_once()
+        mock_concat.assert_called_once_with([mock_resized1, mock_resized2], method="chain")
     
-    @patch('video_creator.ImageClip')
-    @patch('os.path.exists')
-    def test_create_image_slideshow_missing_image(self, mock_exists, mock_image_clip):
-        """Test image slideshow creation with missing image"""
-        creator = VideoCreator(self.config)
-        
-        # First image exists, second doesn't
-        mock_exists.side_effect = [True, False]
-        
-        mock_clip = Mock()
-        mock_image_clip.return_value = mock_clip
-        
-        # Mock resize and other methods
-        creator._resize_and_fit_image = Mock(return_value=mock_clip)
-        mock_clip.set_duration.return_value = mock_clip
-        mock_clip.fadeout.return_value = mock_clip
+    def test_create_image_slideshow_reuses_repeated_images(self, monkeypatch):
+        """Test repeated image paths are loaded and resized only once"""
+        mock_image_clip = Mock()
+        monkeypatch.setattr('video_creator.ImageClip', mock_image_clip)
+        monkeypatch.setattr('video_creator.concatenate_videoclips', Mock(return_value=Mock(duration=30.0)))
+        monkeypatch.setattr('os.path.exists', Mock(return_value=True))
         
-        with patch('video_creator.concatenate_videoclips') as mock_concat:
-            mock_final = Mock()
-            mock_final.duration = 30.0
-            mock_concat.return_value = mock_final
-            
-            with patch('builtins.print') as mock_print:
-                images = [
-                    {'local_path': 'image1.jpg'},
-                    {'local_path': 'missing.jpg'}
-                ]
-                
-                result = creator._create_image_slideshow(images, 30.0)
-                
-                # Should print warning for missing image
-                mock_print.assert_called()
-                warning_calls = [call for call in mock_print.call_args_list 
-                               if 'Warning' in str(call)]
-                self.assertTrue(len(warning_calls) > 0)
-                
-                # Should still create slideshow with available images
-                self.assertEqual(mock_image_clip.call_count, 1)  # Only first image processed
-    
-    @patch('os.path.exists')
-    def test_create_image_slideshow_no_valid_images(self, mock_exists):
-        """Test image slideshow creation with no valid images"""
         creator = VideoCreator(self.config)
+        mock_frame1 = Mock()
+        mock_frame2 = Mock()
+        frames = {'image1.jpg': mock_frame1, 'image2.jpg': mock_frame2}
+        creator._load_fitted_image = Mock(side_effect=frames.get)
         
-        mock_exists.return_value = False  # All images missing
-        
-        images = [{'local_path': 'missing1.jpg'}, {'local_path': 'missing2.jpg'}]
+        images = [
+            {'local_path': 'image1.jpg'},
+            {'local_path': 'image2.jpg'},
+            {'local_path': './image1.jpg'}
+        ]
         
-        with self.assertRaises(RuntimeError) as context:
-            creator._create_image_slideshow(images, 30.0)
+        creator._create_image_slideshow(images, 30.0)
         
-        self.assertIn("No valid images found", str(context.exception))
+        assert creator._load_fitted_image.call_count == 2
+        assert mock_image_clip.call_args_list == [call(mock_frame1), call(mock_frame2), call(mock_frame1)]
     
-    @patch('video_creator.ImageClip')
-    @patch('video_creator.concatenate_videoclips')
-    @patch('os.path.exists')
-    def test_create_image_slideshow_duration_adjustment(self, mock_exists, mock_concat, mock_image_clip):
-        """Test image slideshow duration adjustment"""
+    def test_create_image_slideshow_missing_image(self, monkeypatch, capsys):
+        """Test image slideshow creation with missing image"""
+        mock_image_clip = Mock()
+        monkeypatch.setattr('video_creator.ImageClip', mock_image_clip)
+        # First image exists, second doesn't
+        monkeypatch.setattr('os.path.exists', Mock(side_effect=[True, False]))
+        
         creator = VideoCreator(self.config)
         
-        mock_exists.return_value = True
         mock_clip = Mock()
         mock_image_clip.return_value = mock_clip
-        creator._resize_and_fit_image = Mock(return_value=mock_clip)
+        
+        # Mock image loading and other methods
+        creator._load_fitted_image = Mock(return_value=Mock())
         mock_clip.set_duration.return_value = mock_clip
+        mock_clip.fadeout.return_value = mock_clip
         
-        # Test duration too long
         mock_final = Mock()
-        mock_final.duration = 35.0  # Longer than target 30s
-        mock_concat.return_value = mock_final
+        mock_final.duration = 30.0
+        monkeypatch.setattr('video_creator.concatenate_videoclips', Mock(return_value=mock_final))
         
-        mock_subclip = Mock()
-        mock_final.subclip.return_value = mock_subclip
+        images = [
+            {'local_path': 'image1.jpg'},
+            {'local_path': 'missing.jpg'}
+        ]
         
-        images = [{'local_path': 'image1.jpg'}]
+        creator._create_image_slideshow(images, 30.0)
         
-        result = creator._create_image_slideshow(images, 30.0)
+        # Should print warning for missing image
+        assert 'Warning' in capsys.readouterr().out
         
-        # Should trim to exact duration
-        mock_final.subclip.assert_called_once_with(0, 30.0)
-        self.assertEqual(result, mock_subclip)
+        # Should still create slideshow with available images
+        assert mock_image_clip.call_count == 1  # Only first image processed
     
-    @patch('video_creator.ImageClip')
-    @patch('video_creator.concatenate_videoclips')
-    @patch('os.path.exists')
-    def test_create_image_slideshow_duration_extension(self, mock_exists, mock_concat, mock_image_clip):
-        """Test image slideshow duration extension"""
+    def test_create_image_slideshow_no_valid_images(self, monkeypatch):
+        """Test image slideshow creation with no valid images"""
+        monkeypatch.setattr('os.path.exists', Mock(return_value=False))  # All images missing
+        
         creator = VideoCreator(self.config)
         
-        mock_exists.return_value = True
-        mock_clip = Mock()
-        mock_image_clip.return_value = mock_clip
-        creator._resize_and_fit_image = Mock(return_value=mock_clip)
-        mock_clip.set_duration.return_value = mock_clip
+        images = [{'local_path': 'missing1.jpg'}, {'local_path': 'missing2.jpg'}]
         
-        # Test duration too short
-        mock_final = Mock()
-        mock_final.duration = 25.0  # Shorter than target 30s
-        mock_concat.return_value = mock_final
+        with pytest.raises(RuntimeError) as context:
+            creator._create_image_slideshow(images, 30.0)
         
-        # Mock extension creation
-        mock_image_clip_from_last = Mock()
-        mock_clip.to_ImageClip.return_value = mock_image_clip_from_last
-        mock_extension = Mock()
-        mock_image_clip_from_last.set_duration.return_value = mock_extension
+        assert "No valid images found" in str(context.value)
+    
+    def test_create_image_slideshow_duration_with_missing_image(self, monkeypatch):
+        """Test the duration is split across existing images in a single concatenation"""
+        mock_image_clip = Mock()
+        mock_concat = Mock(return_value=Mock(duration=30.0))
+        monkeypatch.setattr('video_creator.ImageClip', mock_image_clip)
+        monkeypatch.setattr('video_creator.concatenate_videoclips', mock_concat)
+        monkeypatch.setattr('os.path.exists', Mock(side_effect=[True, False, True]))
         
-        mock_extended = Mock()
-        mock_concat.side_effect = [mock_final, mock_extended]  # First call returns short clip, second returns extended
+        creator = VideoCreator(self.config)
+        creator._load_fitted_image = Mock(return_value=Mock())
+        
+        mock_first = Mock()
+        mock_last = Mock()
+        mock_image_clip.side_effect = [mock_first, mock_last]
+        mock_first.set_duration.return_value = mock_first
+        mock_first.fadeout.return_value = mock_first
+        mock_last.set_duration.return_value = mock_last
+        mock_last.fadein.return_value = mock_last
         
-        images = [{'local_path': 'image1.jpg'}]
+        images = [{'local_path': 'image1.jpg'}, {'local_path': 'missing.jpg'}, {'local_path': 'image2.jpg'}]
         
         result = creator._create_image_slideshow(images, 30.0)
         
-        # Should extend with static last frame
-        mock_image_clip_from_last.set_duration.assert_called_once_with(5.0)  # 30 - 25 = 5 seconds
-        self.assertEqual(mock_concat.call_count, 2)
-        self.assertEqual(result, mock_extended)
-    
-    @patch('video_creator.ColorClip')
-    @patch('video_creator.CompositeVideoClip')
-    def test_resize_and_fit_image_with_background(self, mock_composite, mock_color_clip):
-        """Test image resizing with background when image doesn't fill frame"""
-        creator = VideoCreator(self.config)
+        # Remaining images share the full duration instead of padding with a frozen frame
+        mock_first.set_duration.assert_called_once_with(15.0)
+        mock_last.set_duration.assert_called_once_with(15.0)
         
-        # Mock image that's smaller after scaling
-        mock_image = Mock()
-        mock_image.size = (800, 600)  # 4:3 aspect ratio, will have black bars on 16:9 video
+        # The last existing image doesn't fade out to black
+        mock_last.fadeout.assert_not_called()
+        mock_concat.assert_called_once_with([mock_first, mock_last], method="chain")
+        assert result == mock_concat.return_value
+    
+    def test_load_fitted_image_letterboxes(self, tmp_path):
+        """Test image is resized once with Pillow and centered on a black frame"""
+        from PIL import Image
         
-        mock_resized = Mock()
-        mock_image.resize.return_value = mock_resized
+        image_path = str(tmp_path / 'image.png')
+        Image.new('RGB', (800, 600), (255, 255, 255)).save(image_path)
         
-        mock_background = Mock()
-        mock_color_clip.return_value = mock_background
+        creator = VideoCreator(self.config)
+        frame = creator._load_fitted_image(image_path)
         
-        mock_positioned = Mock()
-        mock_resized.set_position.return_value = mock_positioned
+        # 800x600 scales to 1440x1080, leaving 240px bars on each side
+        assert frame.shape == (1080, 1920, 3)
+        assert frame[:, :240].max() == 0
+        assert frame[:, -240:].max() == 0
+        assert frame[540, 960].tolist() == [255, 255, 255]
+    
+    def test_resize_and_fit_video_letterboxes_frames(self):
+        """Test video letterboxing pastes frames into a canvas instead of compositing clips"""
+        creator = VideoCreator(self.config)
         
-        mock_final = Mock()
-        mock_composite.return_value = mock_final
+        mock_video = Mock()
+        mock_video.size = (1280, 960)  # 4:3, scales to 1440x1080 with side bars
+        mock_resized = Mock()
+        mock_video.resize.return_value = mock_resized
+        
+        result = creator._resize_and_fit_video(mock_video)
+        
+        mock_video.resize.assert_called_once_with((1440, 1080))
+        mock_resized.fl_image.assert_called_once()
+        assert result == mock_resized.fl_image.return_value
+        
+        # Every frame is pasted into the same canvas; only the picture area changes
+        letterbox = mock_resized.fl_image.call_args[0][0]
+        first = letterbox(np.full((1080, 1440, 3), 200, dtype=np.uint8))
+        second = letterbox(np.full((1080, 1440, 3), 100, dtype=np.uint8))
+        assert second is first
+        assert first.shape == (1080, 1920, 3)
+        assert (first[:, 240:1680] == 100).all()
+        assert not first[:, :240].any() and not first[:, 1680:].any()
+    
+    def test_loop_video_lazy_loop(self, monkeypatch):
+        """Test short videos are looped with MoviePy's loop effect instead of concatenated copies"""
+        mock_loop = Mock()
+        mock_concat = Mock()
+        monkeypatch.setattr('video_creator.loop', mock_loop)
+        monkeypatch.setattr('video_creator.concatenate_videoclips', mock_concat)
         
-        result = creator._resize_and_fit_image(mock_image)
+        creator = VideoCreator(self.config)
+        mock_clip = Mock()
+        mock_clip.duration = 8.0
         
-        # Check scaling calculation (should scale to fit height: 1080/600 = 1.8)
-        expected_new_size = (1440, 1080)  # 800*1.8, 600*1.8
-        mock_image.resize.assert_called_once_with(expected_new_size)
+        result = creator._loop_video(mock_clip, 30.0)
         
-        # Should create background
-        mock_color_clip.assert_called_once_with(size=(1920, 1080), color=(0, 0, 0))
+        mock_loop.assert_called_once_with(mock_clip, duration=30.0)
+        mock_concat.assert_not_called()
+        assert result == mock_loop.return_value
+    
+    def test_loop_video_cuts_long_video(self, monkeypatch):
+        """Test videos longer than the target are cut instead of looped"""
+        mock_loop = Mock()
+        monkeypatch.setattr('video_creator.loop', mock_loop)
         
-        # Should center image (offset = (1920-1440)/2 = 240 horizontally, 0 vertically)
-        mock_resized.set_position.assert_called_once_with((240, 0))
+        creator = VideoCreator(self.config)
+        mock_clip = Mock()
+        mock_clip.duration = 45.0
         
-        # Should composite
-        mock_composite.assert_called_once_with([mock_background, mock_positioned])
+        result = creator._loop_video(mock_clip, 30.0)
         
-        self.assertEqual(result, mock_final)
+        mock_clip.subclip.assert_called_once_with(0, 30.0)
+        mock_loop.assert_not_called()
+        assert result == mock_clip.subclip.return_value
     
-    def test_resize_and_fit_image_exact_fit(self):
-        """Test image resizing when image fits exactly"""
+    @pytest.mark.parametrize('enabled, installed, expected', [
+        (True, True, 'pyav'),
+        (True, False, 'moviepy'),
+        (False, True, 'moviepy'),
+    ])
+    def test_load_video_clip_decoder(self, monkeypatch, enabled, installed, expected):
+        """Test PyAV decoding is used only when enabled in config and installed"""
+        decoders = {'pyav': Mock(), 'moviepy': Mock()}
+        monkeypatch.setattr('video_creator.PyAVVideoClip', decoders['pyav'])
+        monkeypatch.setattr('video_creator.VideoFileClip', decoders['moviepy'])
+        monkeypatch.setattr('video_creator.PYAV_AVAILABLE', installed)
+        self.config.use_pyav_decoder = enabled
+        
         creator = VideoCreator(self.config)
         
-        # Mock image that fits exactly after scaling
-        mock_image = Mock()
-        mock_image.size = (1920, 1080)  # Exact video size
+        assert creator._load_video_clip('background.mp4') is decoders[expected].return_value
+        decoders[expected].assert_called_once_with('background.mp4')
+    
+    def test_pyav_reader_offsets_start_time_and_falls_back_after_empty_seek(self, monkeypatch):
+        """Test seeks include the stream start offset and an empty decode reuses the last frame"""
+        from fractions import Fraction
+        from video_creator import PyAVVideoReader
+        
+        def make_frame(time):
+            frame = Mock(time=time)
+            frame.to_ndarray.return_value = np.full((1, 1, 3), int(time * 10), dtype=np.uint8)
+            return frame
+        
+        stream = SimpleNamespace(duration=20, time_base=Fraction(1, 10), start_time=5, average_rate=10)
+        container = Mock()
+        container.streams.video = [stream]
+        # First decode yields frames at 0.5s-0.7s (clip time 0-0.2s); the backward seek yields nothing
+        container.decode.side_effect = [iter([make_frame(0.5), make_frame(0.6), make_frame(0.7)]), iter([])]
+        monkeypatch.setattr('video_creator.av', SimpleNamespace(open=Mock(return_value=container)), raising=False)
+        
+        reader = PyAVVideoReader('background.mp4')
+        
+        assert reader.get_frame(0.1)[0, 0, 0] == 6
+        container.seek.assert_called_with(6, stream=stream, backward=True)
+        
+        assert reader.get_frame(0.0)[0, 0, 0] == 6
+        container.seek.assert_called_with(5, stream=stream, backward=True)
+    
+    def test_pyav_reader_raises_when_no_frame_decodes(self, monkeypatch):
+        """Test a video that yields no frames at all raises a clear error"""
+        from fractions import Fraction
+        from video_creator import PyAVVideoReader
         
-        mock_resized = Mock()
-        mock_image.resize.return_value = mock_resized
+        stream = SimpleNamespace(duration=20, time_base=Fraction(1, 10), start_time=None, average_rate=10)
+        container = Mock()
+        container.streams.video = [stream]
+        container.decode.side_effect = lambda s: iter([])
+        monkeypatch.setattr('video_creator.av', SimpleNamespace(open=Mock(return_value=container)), raising=False)
         
-        result = creator._resize_and_fit_image(mock_image)
+        reader = PyAVVideoReader('background.mp4')
         
-        # Should just resize without background
-        mock_image.resize.assert_called_once_with((1920, 1080))
-        self.assertEqual(result, mock_resized)
+        with pytest.raises(RuntimeError, match="No frame could be decoded"):
+            reader.get_frame(1.0)
     
-    @patch('video_creator.os.path.exists')
-    @patch('video_creator.os.path.getsize')
-    def test_render_video_success(self, mock_getsize, mock_exists):
+    def test_render_video_success(self, monkeypatch):
         """Test successful video rendering"""
+        monkeypatch.setattr('video_creator.os.path.exists', Mock(return_value=True))
+        monkeypatch.setattr('video_creator.os.path.getsize', Mock(return_value=5000000))  # 5MB file
+        
         creator = VideoCreator(self.config)
         
         mock_clip = Mock()
-        mock_exists.return_value = True
-        mock_getsize.return_value = 5000000  # 5MB file
         
         output_path = "/tmp/test_output/test.mp4"
         
@@ -406,209 +738,290 @@ class TestVideoCreator(unittest.TestCase):
         mock_clip.write_videofile.assert_called_once()
         call_args = mock_clip.write_videofile.call_args
         
-        self.assertEqual(call_args[0][0], output_path)  # First positional arg is output path
+        assert call_args[0][0] == output_path  # First positional arg is output path
         
         # Check codec parameters
         kwargs = call_args[1]
-        self.assertEqual(kwargs['codec'], 'libx264')
-        self.assertEqual(kwargs['audio_codec'], 'aac')
-        self.assertEqual(kwargs['fps'], 30)
-        self.assertEqual(kwargs['bitrate'], '2000k')
-        self.assertEqual(kwargs['audio_bitrate'], '128k')
-    
-    @patch('video_creator.os.path.exists')
-    def test_render_video_file_not_created(self, mock_exists):
+        assert kwargs['codec'] == 'libx264'
+        assert kwargs['audio_codec'] == 'aac'
+        assert kwargs['fps'] == 30
+        assert kwargs['bitrate'] is None  # Quality is controlled by CRF instead
+        assert kwargs['ffmpeg_params'] == ['-crf', '23', '-pix_fmt', 'yuv420p', '-movflags', '+faststart']
+        assert kwargs['audio_bitrate'] == '128k'
+        assert kwargs['preset'] == 'veryfast'
+        assert kwargs['threads'] == os.cpu_count()
+        assert kwargs['temp_audiofile'] == 'temp-audio.m4a'
+        assert 'audio' not in kwargs
+    
+    def test_render_video_bitrate_without_constant_quality(self, monkeypatch):
+        """Test VideoToolbox keeps the fixed bitrate since it has no CRF mode"""
+        monkeypatch.setattr(VideoCreator, '_detected_encoder', 'h264_videotoolbox')
+        monkeypatch.setattr('video_creator.os.path.exists', Mock(return_value=True))
+        monkeypatch.setattr('video_creator.os.path.getsize', Mock(return_value=5000000))
+        
+        creator = VideoCreator(self.config)
+        mock_clip = Mock()
+        
+        creator._render_video(mock_clip, "/tmp/test_output/test.mp4")
+        
+        kwargs = mock_clip.write_videofile.call_args[1]
+        assert kwargs['bitrate'] == '2000k'
+        assert kwargs['ffmpeg_params'] == ['-pix_fmt', 'yuv420p', '-movflags', '+faststart']
+        
+        # VideoToolbox has no presets, so none is passed on either render path
+        assert 'preset' not in kwargs
+        assert '-preset' not in creator._video_encode_args
+        assert creator._video_encode_args[:4] == ['-c:v', 'h264_videotoolbox', '-b:v', '2000k']
+    
+    def test_render_video_copies_aac_audio(self, monkeypatch):
+        """Test AAC audio is muxed directly instead of being re-encoded"""
+        monkeypatch.setattr('video_creator.os.path.exists', Mock(return_value=True))
+        monkeypatch.setattr('video_creator.os.path.getsize', Mock(return_value=5000000))
+        
+        creator = VideoCreator(self.config)
+        mock_clip = Mock()
+        
+        creator._render_video(mock_clip, "/tmp/test_output/test.mp4", "/tmp/voice.m4a")
+        
+        kwargs = mock_clip.write_videofile.call_args[1]
+        assert kwargs['audio'] == "/tmp/voice.m4a"
+        assert kwargs['ffmpeg_params'][-1] == '-shortest'
+        assert 'temp_audiofile' not in kwargs
+        
+        # Shared encoder options must not pick up the per-call flag
+        assert '-shortest' not in VideoCreator.OUTPUT_PARAMS
+        assert '-shortest' not in creator._quality_params
+    
+    def test_render_video_hardware_encoder(self, monkeypatch):
+        """Test rendering passes encoder-specific options for NVENC"""
+        monkeypatch.setattr(VideoCreator, '_detected_encoder', 'h264_nvenc')
+        monkeypatch.setattr('video_creator.os.path.exists', Mock(return_value=True))
+        monkeypatch.setattr('video_creator.os.path.getsize', Mock(return_value=5000000))
+        
+        creator = VideoCreator(self.config)
+        mock_clip = Mock()
+        
+        creator._render_video(mock_clip, "/tmp/test_output/test.mp4")
+        
+        kwargs = mock_clip.write_videofile.call_args[1]
+        assert kwargs['codec'] == 'h264_nvenc'
+        assert kwargs['preset'] == 'p4'
+        assert kwargs['ffmpeg_params'][:4] == ['-rc', 'vbr', '-cq', '23']
+        assert kwargs['audio_codec'] == 'aac'
+    
+    def test_detect_encoder_prefers_working_hardware(self, monkeypatch):
+        """Test encoder detection skips listed encoders whose test encode fails"""
+        monkeypatch.setattr(VideoCreator, '_detected_encoder', None)
+        listing = Mock(returncode=0, stdout=' V..... h264_nvenc\n V..... h264_qsv\n V..... libx264\n')
+        mock_run = Mock(side_effect=[listing, Mock(returncode=1), Mock(returncode=0)])
+        monkeypatch.setattr('video_creator.subprocess.run', mock_run)
+        
+        assert VideoCreator._detect_encoder() == 'h264_qsv'
+        
+        # The test encode uses the same encoder options as the renders
+        probe_args = mock_run.call_args_list[2][0][0]
+        assert '-preset' in probe_args and '-global_quality' in probe_args
+        
+        # Result is cached, so a second lookup doesn't run FFmpeg again
+        assert VideoCreator._detect_encoder() == 'h264_qsv'
+        assert mock_run.call_count == 3
+    
+    def test_detect_encoder_without_ffmpeg(self, monkeypatch):
+        """Test encoder detection falls back to libx264 when FFmpeg is missing"""
+        monkeypatch.setattr(VideoCreator, '_detected_encoder', None)
+        monkeypatch.setattr('video_creator.subprocess.run', Mock(side_effect=FileNotFoundError()))
+        
+        assert VideoCreator._detect_encoder() == 'libx264'
+    
+    def test_render_video_file_not_created(self, monkeypatch):
         """Test video rendering when file is not created"""
+        monkeypatch.setattr('video_creator.os.path.exists', Mock(return_value=False))  # File not created
+        
         creator = VideoCreator(self.config)
         
         mock_clip = Mock()
-        mock_exists.return_value = False  # File not created
         
-        with self.assertRaises(RuntimeError) as context:
+        with pytest.raises(RuntimeError) as context:
             creator._render_video(mock_clip, "/tmp/test.mp4")
         
-        self.assertIn("Video file was not created", str(context.exception))
+        assert "Video file was not created" in str(context.value)
     
-    @patch('video_creator.os.path.exists')
-    @patch('video_creator.os.path.getsize')
-    def test_render_video_corrupted(self, mock_getsize, mock_exists):
+    def test_render_video_corrupted(self, monkeypatch):
         """Test video rendering when file is corrupted"""
+        monkeypatch.setattr('video_creator.os.path.exists', Mock(return_value=True))
+        monkeypatch.setattr('video_creator.os.path.getsize', Mock(return_value=500))  # Too small, indicates corruption
+        
         creator = VideoCreator(self.config)
         
         mock_clip = Mock()
-        mock_exists.return_value = True
-        mock_getsize.return_value = 500  # Too small, indicates corruption
         
-        with self.assertRaises(RuntimeError) as context:
+        with pytest.raises(RuntimeError) as context:
             creator._render_video(mock_clip, "/tmp/test.mp4")
         
-        self.assertIn("Video file appears to be corrupted", str(context.exception))
+        assert "Video file appears to be corrupted" in str(context.value)
     
-    @patch('video_creator.os.path.exists')
-    @patch('video_creator.os.remove')
-    def test_render_video_cleanup_on_error(self, mock_remove, mock_exists):
+    def test_render_video_cleanup_on_error(self, monkeypatch):
         """Test video rendering cleanup on error"""
+        mock_remove = Mock()
+        monkeypatch.setattr('video_creator.os.path.exists', Mock(return_value=True))  # Partial file exists
+        monkeypatch.setattr('video_creator.os.remove', mock_remove)
+        
         creator = VideoCreator(self.config)
         
         mock_clip = Mock()
         mock_clip.write_videofile.side_effect = Exception("Render error")
-        mock_exists.return_value = True  # Partial file exists
         
         output_path = "/tmp/test.mp4"
         
-        with self.assertRaises(RuntimeError):
+        with pytest.raises(RuntimeError):
             creator._render_video(mock_clip, output_path)
         
         # Should attempt to remove partial file
         mock_remove.assert_called_once_with(output_path)
     
-    def test_handle_video_error_codec(self):
-        """Test video error handling for codec issues"""
+    @pytest.mark.parametrize('error_msg', list(HANDLE_VIDEO_ERROR_PATTERNS))
+    def test_handle_video_error(self, error_msg):
+        """Test video error handling for codec, memory, permission, disk space and generic errors"""
         creator = VideoCreator(self.config)
         
-        with self.assertRaises(RuntimeError) as context:
-            creator._handle_video_error(Exception("Codec not found"))
-        
-        self.assertIn("Video codec error", str(context.exception))
+        with pytest.raises(RuntimeError, match=HANDLE_VIDEO_ERROR_PATTERNS[error_msg]):
+            creator._handle_video_error(Exception(error_msg))
     
-    def test_handle_video_error_memory(self):
-        """Test video error handling for memory issues"""
-        creator = VideoCreator(self.config)
-        
-        with self.assertRaises(RuntimeError) as context:
-            creator._handle_video_error(Exception("Out of memory"))
+    def test_get_video_info_success(self, monkeypatch):
+        """Test successful video info retrieval"""
+        probe = Mock(returncode=0, stdout=json.dumps({
+            'streams': [
+                {'codec_type': 'video', 'width': 1920, 'height': 1080, 'r_frame_rate': '30/1'},
+                {'codec_type': 'audio'}
+            ],
+            'format': {'duration': '30.0'}
+        }))
+        mock_run = Mock(return_value=probe)
+        mock_video_clip = Mock()
+        monkeypatch.setattr('video_creator.subprocess.run', mock_run)
+        monkeypatch.setattr('video_creator.VideoFileClip', mock_video_clip)
+        monkeypatch.setattr('video_creator.os.path.exists', Mock(return_value=True))
+        monkeypatch.setattr('video_creator.os.path.getsize', Mock(return_value=5000000))
         
-        self.assertIn("Insufficient memory", str(context.exception))
-    
-    def test_handle_video_error_permission(self):
-        """Test video error handling for permission issues"""
         creator = VideoCreator(self.config)
         
-        with self.assertRaises(RuntimeError) as context:
-            creator._handle_video_error(Exception("Permission denied"))
+        result = creator.get_video_info("/path/to/video.mp4")
         
-        self.assertIn("Permission denied", str(context.exception))
-    
-    def test_handle_video_error_disk_space(self):
-        """Test video error handling for disk space issues"""
-        creator = VideoCreator(self.config)
+        expected = {
+            'duration': 30.0,
+            'fps': 30,
+            'size': (1920, 1080),
+            'file_size': 5000000,
+            'has_audio': True
+        }
         
-        with self.assertRaises(RuntimeError) as context:
-            creator._handle_video_error(Exception("No space left on disk"))
+        assert result == expected
+        assert mock_run.call_args[0][0][0] == 'ffprobe'
         
-        self.assertIn("Insufficient disk space", str(context.exception))
+        # Metadata comes from ffprobe, so the file is never opened for decoding
+        mock_video_clip.assert_not_called()
     
-    def test_handle_video_error_generic(self):
-        """Test video error handling for generic errors"""
-        creator = VideoCreator(self.config)
+    def test_get_video_info_without_ffprobe(self, monkeypatch):
+        """Test video info falls back to MoviePy when ffprobe is missing"""
+        mock_video_clip = Mock()
+        monkeypatch.setattr('video_creator.subprocess.run', Mock(side_effect=FileNotFoundError()))
+        monkeypatch.setattr('video_creator.VideoFileClip', mock_video_clip)
+        monkeypatch.setattr('video_creator.os.path.exists', Mock(return_value=True))
+        monkeypatch.setattr('video_creator.os.path.getsize', Mock(return_value=5000000))
         
-        with self.assertRaises(RuntimeError) as context:
-            creator._handle_video_error(Exception("Unknown error"))
-        
-        self.assertIn("Video creation failed", str(context.exception))
-    
-    @patch('video_creator.VideoFileClip')
-    @patch('video_creator.os.path.exists')
-    @patch('video_creator.os.path.getsize')
-    def test_get_video_info_success(self, mock_getsize, mock_exists, mock_video_clip):
-        """Test successful video info retrieval"""
         creator = VideoCreator(self.config)
         
-        mock_exists.return_value = True
-        mock_getsize.return_value = 5000000
-        
         mock_clip = Mock()
         mock_clip.duration = 30.0
         mock_clip.fps = 30
         mock_clip.size = (1920, 1080)
-        mock_clip.audio = Mock()  # Has audio
+        mock_clip.audio = None
         mock_video_clip.return_value = mock_clip
         
         result = creator.get_video_info("/path/to/video.mp4")
         
-        expected = {
+        assert result == {
             'duration': 30.0,
             'fps': 30,
             'size': (1920, 1080),
             'file_size': 5000000,
-            'has_audio': True
+            'has_audio': False
         }
-        
-        self.assertEqual(result, expected)
         mock_clip.close.assert_called_once()
     
-    @patch('video_creator.os.path.exists')
-    def test_get_video_info_file_not_found(self, mock_exists):
+    def test_get_video_info_file_not_found(self, monkeypatch):
         """Test video info retrieval with non-existent file"""
-        creator = VideoCreator(self.config)
+        monkeypatch.setattr('video_creator.os.path.exists', Mock(return_value=False))
         
-        mock_exists.return_value = False
+        creator = VideoCreator(self.config)
         
         result = creator.get_video_info("/path/to/nonexistent.mp4")
         
-        self.assertIsNone(result)
+        assert result is None
     
-    @patch('video_creator.VideoFileClip')
-    @patch('video_creator.os.path.exists')
-    def test_get_video_info_error(self, mock_exists, mock_video_clip):
+    def test_get_video_info_error(self, monkeypatch, capsys):
         """Test video info retrieval with error"""
+        monkeypatch.setattr('video_creator.subprocess.run', Mock(return_value=Mock(returncode=1, stdout='')))
+        monkeypatch.setattr('video_creator.VideoFileClip', Mock(side_effect=Exception("Cannot read video")))
+        monkeypatch.setattr('video_creator.os.path.exists', Mock(return_value=True))
+        
         creator = VideoCreator(self.config)
         
-        mock_exists.return_value = True
-        mock_video_clip.side_effect = Exception("Cannot read video")
+        result = creator.get_video_info("/path/to/video.mp4")
         
-        with patch('builtins.print') as mock_print:
-            result = creator.get_video_info("/path/to/video.mp4")
-            
-            self.assertIsNone(result)
-            mock_print.assert_called()  # Should print warning
+        assert result is None
+        assert capsys.readouterr().out  # Should print warning
     
-    @patch('video_creator.os.path.exists')
-    @patch('video_creator.os.remove')
-    @patch('video_creator.os.listdir')
-    def test_cleanup_temp_files(self, mock_listdir, mock_remove, mock_exists):
+    def test_cleanup_temp_files(self, monkeypatch):
         """Test cleanup of temporary files"""
-        creator = VideoCreator(self.config)
-        
+        mock_remove = Mock()
+        monkeypatch.setattr('video_creator.os.remove', mock_remove)
         # Mock files in current directory
-        mock_listdir.return_value = [
-            'temp-audio.m4a',
-            'temp-audio.wav',
-            'TEMP_MPY_wvfqtABC.avi',
-            'normal_file.txt'  # Should be ignored
+        entries = [
+            SimpleNamespace(name=name, path=os.path.join('.', name), is_file=lambda follow_symlinks=True: True)
+            for name in [
+                'temp-audio.m4a',
+                'temp-audio.wav',
+                'TEMP_MPY_wvfqtABC.avi',
+                'normal_file.txt'  # Should be ignored
+            ]
         ]
+        mock_scandir = MagicMock()
+        mock_scandir.return_value.__enter__.return_value = iter(entries)
+        monkeypatch.setattr('video_creator.os.scandir', mock_scandir)
+        # First 3 exist, last doesn't
+        monkeypatch.setattr('video_creator.os.path.exists', Mock(side_effect=[True, True, True, False]))
         
-        mock_exists.side_effect = [True, True, True, False]  # First 3 exist, last doesn't
+        creator = VideoCreator(self.config)
         
         creator.cleanup_temp_files()
         
         # Should remove temp files
         expected_calls = [
-            unittest.mock.call('temp-audio.m4a'),
-            unittest.mock.call('temp-audio.wav'),
-            unittest.mock.call('TEMP_MPY_wvfqtABC.avi')
+            call('temp-audio.m4a'),
+            call('temp-audio.wav'),
+            call(os.path.join('.', 'TEMP_MPY_wvfqtABC.avi'))
         ]
         
         mock_remove.assert_has_calls(expected_calls, any_order=True)
-        self.assertEqual(mock_remove.call_count, 3)
+        assert mock_remove.call_count == 3
 
 
-class TestCreateVideoCreator(unittest.TestCase):
+class TestCreateVideoCreator:
     """Test cases for create_video_creator factory function"""
     
-    @patch('video_creator.Config')
-    def test_create_video_creator(self, mock_config_class):
+    def test_create_video_creator(self, monkeypatch):
         """Test factory function creates VideoCreator instance"""
         from video_creator import create_video_creator
         
-        mock_config = Mock()
-        mock_config_class.return_value = mock_config
+        mock_config_class = Mock(return_value=Mock())
+        monkeypatch.setattr('video_creator.Config', mock_config_class)
         
         creator = create_video_creator()
         
-        self.assertIsInstance(creator, VideoCreator)
+        assert isinstance(creator, VideoCreator)
         mock_config_class.assert_called_once()
 
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    pytest.main([__file__])
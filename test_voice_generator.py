@@ -1,594 +1,768 @@
-import unittest
-from unittest.mock import Mock, patch, mock_open, MagicMock
+import pytest
+from unittest.mock import Mock, patch, MagicMock, DEFAULT
 import os
-import json
+import re
+import io
+import shutil
+import tempfile
+import threading
+import time
 import wave
 import requests
-from voice_generator import VoiceGenerator
+from voice_generator import VoiceGenerator, create_voice_generator
 from config import Config
 
 
-class TestVoiceGenerator(unittest.TestCase):
-    """Test cases for VoiceGenerator class"""
-    
-    def setUp(self):
-        """Set up test fixtures"""
-        self.config = Mock(spec=Config)
-        self.config.voicevox_server_url = "http://localhost:50021"
-        self.config.speaker_id = 1
-        self.config.temp_dir = "/tmp/test"
-        
-        # Create temp directory for testing
-        os.makedirs(self.config.temp_dir, exist_ok=True)
-    
-    def tearDown(self):
-        """Clean up test fixtures"""
-        # Clean up test temp directory
-        if os.path.exists(self.config.temp_dir):
-            import shutil
-            shutil.rmtree(self.config.temp_dir, ignore_errors=True)
-    
-    def test_init(self):
-        """Test VoiceGenerator initialization"""
-        generator = VoiceGenerator(self.config)
-        
-        self.assertEqual(generator.config, self.config)
-        self.assertEqual(generator.base_url, "http://localhost:50021")
-        self.assertIsInstance(generator.session, requests.Session)
-        self.assertEqual(generator.session.timeout, 30)
-    
-    def test_init_strip_trailing_slash(self):
-        """Test initialization with trailing slash in URL"""
-        self.config.voicevox_server_url = "http://localhost:50021/"
-        generator = VoiceGenerator(self.config)
-        
-        self.assertEqual(generator.base_url, "http://localhost:50021")
-    
-    def test_preprocess_text_basic(self):
-        """Test basic text preprocessing"""
-        generator = VoiceGenerator(self.config)
-        
-        # Test whitespace normalization
-        text = "  こんにちは   世界  "
-        result = generator._preprocess_text(text)
-        self.assertEqual(result, "こんにちは 世界")
-        
-        # Test punctuation with pauses
-        text = "こんにちは。元気ですか？そうですね！"
-        result = generator._preprocess_text(text)
-        expected = "こんにちは。、元気ですか？、そうですね！、"
-        self.assertEqual(result, expected)
-    
-    def test_preprocess_text_special_characters(self):
-        """Test special character replacement"""
-        generator = VoiceGenerator(self.config)
-        
-        text = "AI・ML～50%の確率で成功…"
-        result = generator._preprocess_text(text)
-        expected = "AIとMLから50パーセントの確率で成功。"
-        self.assertEqual(result, expected)
-    
-    def test_generate_voice_empty_script(self):
-        """Test voice generation with empty script"""
-        generator = VoiceGenerator(self.config)
-        
-        with self.assertRaises(ValueError) as context:
-            generator.generate_voice("")
-        
-        self.assertIn("Script text cannot be empty", str(context.exception))
-        
-        with self.assertRaises(ValueError) as context:
-            generator.generate_voice("   ")
-        
-        self.assertIn("Script text cannot be empty", str(context.exception))
-    
-    @patch('requests.Session.post')
-    def test_create_audio_query_success(self, mock_post):
-        """Test successful audio query creation"""
-        generator = VoiceGenerator(self.config)
-        
-        # Mock successful response
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            'accent_phrases': [{'moras': [{'text': 'テ'}, {'text': 'ス'}, {'text': 'ト'}]}],
-            'speedScale': 1.0
-        }
-        mock_post.return_value = mock_response
-        
-        result = generator._create_audio_query("テスト")
-        
-        self.assertIn('accent_phrases', result)
-        mock_post.assert_called_once()
-        args, kwargs = mock_post.call_args
-        self.assertIn('audio_query', args[0])
-        self.assertEqual(kwargs['params']['text'], "テスト")
-        self.assertEqual(kwargs['params']['speaker'], 1)
-    
-    @patch('requests.Session.post')
-    def test_create_audio_query_errors(self, mock_post):
-        """Test audio query creation error handling"""
-        generator = VoiceGenerator(self.config)
-        
-        # Test 400 error
-        mock_response = Mock()
-        mock_response.status_code = 400
-        mock_post.return_value = mock_response
-        
-        with self.assertRaises(RuntimeError) as context:
-            generator._create_audio_query("test")
-        self.assertIn("Invalid text or speaker ID", str(context.exception))
-        
-        # Test 503 error
-        mock_response.status_code = 503
-        with self.assertRaises(RuntimeError) as context:
-            generator._create_audio_query("test")
-        self.assertIn("VOICEVOX server is not running", str(context.exception))
-        
-        # Test other error
-        mock_response.status_code = 500
-        with self.assertRaises(RuntimeError) as context:
-            generator._create_audio_query("test")
-        self.assertIn("VOICEVOX API error: 500", str(context.exception))
-    
-    @patch('requests.Session.post')
-    def test_create_audio_query_network_errors(self, mock_post):
-        """Test audio query network error handling"""
-        generator = VoiceGenerator(self.config)
-        
-        # Test connection error
-        mock_post.side_effect = requests.exceptions.ConnectionError("Connection failed")
-        
-        with self.assertRaises(RuntimeError) as context:
-            generator._create_audio_query("test")
-        self.assertIn("Cannot connect to VOICEVOX server", str(context.exception))
-        
-        # Test timeout error
-        mock_post.side_effect = requests.exceptions.Timeout("Timeout")
-        
-        with self.assertRaises(RuntimeError) as context:
-            generator._create_audio_query("test")
-        self.assertIn("VOICEVOX server timeout", str(context.exception))
-        
-        # Test generic request error
-        mock_post.side_effect = requests.exceptions.RequestException("Network error")
-        
-        with self.assertRaises(RuntimeError) as context:
-            generator._create_audio_query("test")
-        self.assertIn("Network error", str(context.exception))
-    
-    def test_estimate_duration(self):
-        """Test audio duration estimation"""
-        generator = VoiceGenerator(self.config)
-        
-        # Test with accent phrases
-        audio_query = {
-            'accent_phrases': [
-                {'moras': [{'text': 'テ'}, {'text': 'ス'}, {'text': 'ト'}]}
-            ],
-            'speedScale': 1.0
-        }
-        
-        duration = generator._estimate_duration(audio_query)
-        expected = 3 * 0.15  # 3 moras * 0.15 seconds per mora
-        self.assertEqual(duration, expected)
-        
-        # Test with speed scale
-        audio_query['speedScale'] = 2.0
-        duration = generator._estimate_duration(audio_query)
-        expected = (3 * 0.15) / 2.0
-        self.assertEqual(duration, expected)
-    
-    def test_estimate_duration_fallback(self):
-        """Test duration estimation fallback"""
-        generator = VoiceGenerator(self.config)
-        
-        # Test with query that has no accent_phrases or valid data (should use fallback)
-        audio_query = {"invalid": "data"}
-        
-        duration = generator._estimate_duration(audio_query)
-        # Since accent_phrases is empty, total_moras will be 0, so base_duration is 0
-        # This should return 0.0, not use the fallback
-        self.assertEqual(duration, 0.0)
-    
-    @patch('requests.Session.post')
-    def test_synthesize_voice_success(self, mock_post):
-        """Test successful voice synthesis"""
-        generator = VoiceGenerator(self.config)
-        
-        # Mock successful response
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.content = b'fake audio data'
-        mock_post.return_value = mock_response
-        
-        audio_query = {'accent_phrases': [], 'speedScale': 1.0}
-        result = generator._synthesize_voice(audio_query)
-        
-        self.assertEqual(result, b'fake audio data')
-        mock_post.assert_called_once()
-        args, kwargs = mock_post.call_args
-        self.assertIn('synthesis', args[0])
-        self.assertEqual(kwargs['json'], audio_query)
-    
-    @patch('requests.Session.post')
-    def test_synthesize_voice_speed_adjustment(self, mock_post):
-        """Test voice synthesis with speed adjustment for long content"""
-        generator = VoiceGenerator(self.config)
-        
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.content = b'fake audio data'
-        mock_post.return_value = mock_response
-        
-        # Create query that would result in > 30 second duration
-        long_audio_query = {
-            'accent_phrases': [
-                {'moras': [{'text': 'あ'} for _ in range(250)]}  # 250 moras = 37.5 seconds
-            ],
-            'speedScale': 1.0
-        }
-        
-        with patch.object(generator, '_estimate_duration', return_value=35):
-            generator._synthesize_voice(long_audio_query)
-        
-        # Speed should be adjusted
-        call_args = mock_post.call_args
-        adjusted_query = call_args[1]['json']
-        self.assertGreater(adjusted_query['speedScale'], 1.0)
-    
-    @patch('requests.Session.post')
-    def test_synthesize_voice_error(self, mock_post):
-        """Test voice synthesis error handling"""
-        generator = VoiceGenerator(self.config)
-        
-        # Test API error
-        mock_response = Mock()
-        mock_response.status_code = 500
-        mock_post.return_value = mock_response
-        
-        with self.assertRaises(RuntimeError) as context:
-            generator._synthesize_voice({})
-        self.assertIn("Voice synthesis failed: 500", str(context.exception))
-        
-        # Test network error
-        mock_post.side_effect = requests.exceptions.RequestException("Network error")
-        
-        with self.assertRaises(RuntimeError) as context:
-            generator._synthesize_voice({})
-        self.assertIn("Voice synthesis network error", str(context.exception))
-    
-    @patch('builtins.open', new_callable=mock_open)
-    @patch('os.path.exists')
-    @patch('wave.open')
-    def test_save_audio_file_success(self, mock_wave_open, mock_exists, mock_file_open):
-        """Test successful audio file saving"""
-        generator = VoiceGenerator(self.config)
-        
-        # Mock file operations
-        mock_exists.return_value = True
-        mock_wav_file = Mock()
-        mock_wav_file.getnframes.return_value = 1000  # Non-empty file
-        mock_wave_open.return_value.__enter__.return_value = mock_wav_file
-        
-        audio_data = b'fake audio data'
-        output_path = "/tmp/test/test.wav"
-        
-        generator._save_audio_file(audio_data, output_path)
-        
-        mock_file_open.assert_called_once_with(output_path, 'wb')
-        mock_file_open().write.assert_called_once_with(audio_data)
-        mock_wave_open.assert_called_once_with(output_path, 'rb')
-    
-    @patch('builtins.open', new_callable=mock_open)
-    @patch('os.path.exists')
-    def test_save_audio_file_not_created(self, mock_exists, mock_file_open):
-        """Test audio file saving when file is not created"""
-        generator = VoiceGenerator(self.config)
-        
-        mock_exists.return_value = False  # File not created
-        
-        with self.assertRaises(RuntimeError) as context:
-            generator._save_audio_file(b'data', "/tmp/test.wav")
-        
-        self.assertIn("Failed to create audio file", str(context.exception))
-    
-    @patch('builtins.open', new_callable=mock_open)
-    @patch('os.path.exists')
-    @patch('wave.open')
-    def test_save_audio_file_empty(self, mock_wave_open, mock_exists, mock_file_open):
-        """Test audio file saving with empty audio"""
-        generator = VoiceGenerator(self.config)
-        
-        mock_exists.return_value = True
-        mock_wav_file = Mock()
-        mock_wav_file.getnframes.return_value = 0  # Empty file
-        mock_wave_open.return_value.__enter__.return_value = mock_wav_file
-        
-        with self.assertRaises(RuntimeError) as context:
-            generator._save_audio_file(b'data', "/tmp/test.wav")
-        
-        self.assertIn("Generated audio file is empty", str(context.exception))
-    
-    @patch('builtins.open', new_callable=mock_open)
-    @patch('os.path.exists')
-    @patch('wave.open')
-    def test_save_audio_file_corrupted(self, mock_wave_open, mock_exists, mock_file_open):
-        """Test audio file saving with corrupted file"""
-        generator = VoiceGenerator(self.config)
-        
-        mock_exists.return_value = True
-        mock_wave_open.side_effect = wave.Error("Corrupted file")
-        
-        with self.assertRaises(RuntimeError) as context:
-            generator._save_audio_file(b'data', "/tmp/test.wav")
-        
-        self.assertIn("Generated audio file is corrupted", str(context.exception))
-    
-    @patch('builtins.open', side_effect=IOError("Permission denied"))
-    def test_save_audio_file_io_error(self, mock_file_open):
-        """Test audio file saving with IO error"""
-        generator = VoiceGenerator(self.config)
-        
-        with self.assertRaises(RuntimeError) as context:
-            generator._save_audio_file(b'data', "/tmp/test.wav")
-        
-        self.assertIn("Failed to save audio file", str(context.exception))
-    
-    @patch('wave.open')
-    def test_get_audio_duration_success(self, mock_wave_open):
-        """Test successful audio duration calculation"""
-        generator = VoiceGenerator(self.config)
-        
-        mock_wav_file = Mock()
-        mock_wav_file.getnframes.return_value = 44100  # 1 second at 44.1kHz
-        mock_wav_file.getframerate.return_value = 44100
-        mock_wave_open.return_value.__enter__.return_value = mock_wav_file
-        
-        duration = generator._get_audio_duration("/path/to/audio.wav")
-        
-        self.assertEqual(duration, 1.0)
-    
-    @patch('wave.open')
-    def test_get_audio_duration_error(self, mock_wave_open):
-        """Test audio duration calculation with error"""
-        generator = VoiceGenerator(self.config)
-        
-        mock_wave_open.side_effect = Exception("File error")
-        
-        duration = generator._get_audio_duration("/path/to/audio.wav")
-        
-        self.assertEqual(duration, 0.0)
-    
-    def test_handle_voice_error_connection(self):
-        """Test voice error handling for connection issues"""
-        generator = VoiceGenerator(self.config)
-        
-        with self.assertRaises(RuntimeError) as context:
-            generator._handle_voice_error(Exception("Connection failed"))
-        
-        self.assertIn("VOICEVOX server is not accessible", str(context.exception))
-        
-        with self.assertRaises(RuntimeError) as context:
-            generator._handle_voice_error(Exception("Server not running"))
-        
-        self.assertIn("VOICEVOX server is not accessible", str(context.exception))
-    
-    def test_handle_voice_error_timeout(self):
-        """Test voice error handling for timeout"""
-        generator = VoiceGenerator(self.config)
-        
-        with self.assertRaises(RuntimeError) as context:
-            generator._handle_voice_error(Exception("Request timeout"))
-        
-        self.assertIn("VOICEVOX server timeout", str(context.exception))
-    
-    def test_handle_voice_error_speaker(self):
-        """Test voice error handling for speaker issues"""
-        generator = VoiceGenerator(self.config)
-        
-        with self.assertRaises(RuntimeError) as context:
-            generator._handle_voice_error(Exception("Invalid speaker ID"))
-        
-        self.assertIn("Invalid speaker ID", str(context.exception))
-    
-    def test_handle_voice_error_generic(self):
-        """Test voice error handling for generic errors"""
-        generator = VoiceGenerator(self.config)
-        
-        with self.assertRaises(RuntimeError) as context:
-            generator._handle_voice_error(Exception("Unknown error"))
-        
-        self.assertIn("Voice generation failed", str(context.exception))
-    
-    @patch('os.listdir')
-    @patch('os.path.exists')
-    @patch('os.remove')
-    def test_cleanup_temp_audio(self, mock_remove, mock_exists, mock_listdir):
-        """Test cleanup of temporary audio files"""
-        generator = VoiceGenerator(self.config)
-        
-        # Mock temp files
-        mock_listdir.return_value = [
-            'voice_123.wav',
-            'voice_456.wav',
-            'other_file.txt',  # Should be ignored
-            'voice_789.wav'
-        ]
-        mock_exists.return_value = True
-        
-        generator.cleanup_temp_audio()
-        
-        # Should remove only voice files
-        self.assertEqual(mock_remove.call_count, 3)
-        mock_remove.assert_any_call(os.path.join(self.config.temp_dir, 'voice_123.wav'))
-        mock_remove.assert_any_call(os.path.join(self.config.temp_dir, 'voice_456.wav'))
-        mock_remove.assert_any_call(os.path.join(self.config.temp_dir, 'voice_789.wav'))
-    
-    @patch('requests.Session.get')
-    def test_test_connection_success(self, mock_get):
-        """Test successful connection test"""
-        generator = VoiceGenerator(self.config)
-        
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_get.return_value = mock_response
-        
-        result = generator.test_connection()
-        
-        self.assertTrue(result)
-        mock_get.assert_called_once_with("http://localhost:50021/version", timeout=5)
-    
-    @patch('requests.Session.get')
-    def test_test_connection_failure(self, mock_get):
-        """Test connection test failure"""
-        generator = VoiceGenerator(self.config)
-        
-        # Test API error
-        mock_response = Mock()
-        mock_response.status_code = 500
-        mock_get.return_value = mock_response
-        
-        result = generator.test_connection()
-        self.assertFalse(result)
-        
-        # Test network error
-        mock_get.side_effect = Exception("Network error")
-        
-        result = generator.test_connection()
-        self.assertFalse(result)
-    
-    @patch('requests.Session.get')
-    def test_get_available_speakers_success(self, mock_get):
-        """Test successful speakers retrieval"""
-        generator = VoiceGenerator(self.config)
-        
-        mock_speakers = [
-            {'name': 'ずんだもん', 'speaker_uuid': 'test1'},
-            {'name': '四国めたん', 'speaker_uuid': 'test2'}
-        ]
-        
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = mock_speakers
-        mock_get.return_value = mock_response
-        
-        result = generator.get_available_speakers()
-        
-        self.assertEqual(result, mock_speakers)
-        mock_get.assert_called_once_with("http://localhost:50021/speakers", timeout=10)
-    
-    @patch('requests.Session.get')
-    def test_get_available_speakers_failure(self, mock_get):
-        """Test speakers retrieval failure"""
-        generator = VoiceGenerator(self.config)
-        
-        # Test API error
-        mock_response = Mock()
-        mock_response.status_code = 500
-        mock_get.return_value = mock_response
-        
-        result = generator.get_available_speakers()
-        self.assertEqual(result, [])
-        
-        # Test network error
-        mock_get.side_effect = Exception("Network error")
-        
-        result = generator.get_available_speakers()
-        self.assertEqual(result, [])
-    
-    @patch.object(VoiceGenerator, '_preprocess_text')
-    @patch.object(VoiceGenerator, '_create_audio_query')
-    @patch.object(VoiceGenerator, '_synthesize_voice')
-    @patch.object(VoiceGenerator, '_save_audio_file')
-    @patch.object(VoiceGenerator, '_get_audio_duration')
-    @patch('time.time')
-    def test_generate_voice_success(self, mock_time, mock_duration, mock_save, 
-                                   mock_synthesize, mock_query, mock_preprocess):
-        """Test successful voice generation"""
-        generator = VoiceGenerator(self.config)
-        
-        # Mock all dependencies
-        mock_time.return_value = 1234567890
-        mock_preprocess.return_value = "processed text"
-        mock_query.return_value = {'test': 'query'}
-        mock_synthesize.return_value = b'audio data'
-        mock_duration.return_value = 25.0  # Within 30-second limit
-        
-        result = generator.generate_voice("test script")
-        
-        expected_path = os.path.join(self.config.temp_dir, "voice_1234567890.wav")
-        self.assertEqual(result, expected_path)
-        
-        mock_preprocess.assert_called_once_with("test script")
-        mock_query.assert_called_once_with("processed text")
-        mock_synthesize.assert_called_once_with({'test': 'query'})
-        mock_save.assert_called_once_with(b'audio data', expected_path)
-    
-    @patch.object(VoiceGenerator, '_preprocess_text')
-    @patch.object(VoiceGenerator, '_create_audio_query')
-    @patch.object(VoiceGenerator, '_synthesize_voice')
-    @patch.object(VoiceGenerator, '_save_audio_file')
-    @patch.object(VoiceGenerator, '_get_audio_duration')
-    def test_generate_voice_custom_filename(self, mock_duration, mock_save, 
-                                           mock_synthesize, mock_query, mock_preprocess):
-        """Test voice generation with custom filename"""
-        generator = VoiceGenerator(self.config)
-        
-        # Mock all dependencies
-        mock_preprocess.return_value = "processed text"
-        mock_query.return_value = {'test': 'query'}
-        mock_synthesize.return_value = b'audio data'
-        mock_duration.return_value = 25.0
-        
-        result = generator.generate_voice("test script", "custom.wav")
-        
-        expected_path = os.path.join(self.config.temp_dir, "custom.wav")
-        self.assertEqual(result, expected_path)
-        mock_save.assert_called_once_with(b'audio data', expected_path)
-    
-    @patch.object(VoiceGenerator, '_get_audio_duration')
-    @patch.object(VoiceGenerator, '_save_audio_file')
-    @patch.object(VoiceGenerator, '_synthesize_voice')
-    @patch.object(VoiceGenerator, '_create_audio_query')
-    @patch.object(VoiceGenerator, '_preprocess_text')
-    @patch('builtins.print')
-    def test_generate_voice_duration_warning(self, mock_print, mock_preprocess, 
-                                           mock_query, mock_synthesize, mock_save, mock_duration):
-        """Test voice generation with duration warning"""
-        generator = VoiceGenerator(self.config)
-        
-        # Mock dependencies with long duration
-        mock_preprocess.return_value = "processed text"
-        mock_query.return_value = {'test': 'query'}
-        mock_synthesize.return_value = b'audio data'
-        mock_duration.return_value = 40.0  # Exceeds 35-second warning threshold
-        
-        generator.generate_voice("test script")
-        
-        # Should print warning
-        mock_print.assert_called()
-        warning_call = [call for call in mock_print.call_args_list 
-                       if 'Warning' in str(call)]
-        self.assertTrue(len(warning_call) > 0)
-
-
-class TestCreateVoiceGenerator(unittest.TestCase):
-    """Test cases for create_voice_generator factory function"""
-    
-    @patch('voice_generator.Config')
-    def test_create_voice_generator(self, mock_config_class):
-        """Test factory function creates VoiceGenerator instance"""
-        from voice_generator import create_voice_generator
-        
-        mock_config = Mock()
-        mock_config_class.return_value = mock_config
-        
-        generator = create_voice_generator()
-        
-        self.assertIsInstance(generator, VoiceGenerator)
-        mock_config_class.assert_called_once()
+# requests exception types raised by the mocked Session
+_ConnErr = requests.exceptions.ConnectionError
+_Timeout = requests.exceptions.Timeout
+_ReqExc = requests.exceptions.RequestException
+
+# Error message matched by more than one test
+_VOICEVOX_TIMEOUT_RE = re.compile(r"VOICEVOX server timeout")
+
+# PYTEST_FAST=1 skips the exhaustive error branches; one representative
+# branch per method always runs
+FAST = os.getenv("PYTEST_FAST") == "1"
+fast_skip = pytest.mark.skipif(FAST, reason="fast mode")
+
+
+def _make_wav_bytes(n_frames: int) -> bytes:
+    """Build an in-memory 16-bit mono WAV with the given number of silent frames"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(24000)
+        wav_file.writeframes(b'\x00\x00' * n_frames)
+    return buffer.getvalue()
+
+
+def _make_response(status=200, json_val=None, content=None):
+    """Build a mocked requests.Response"""
+    response = Mock(spec=requests.Response)
+    response.status_code = status
+    if json_val is not None:
+        response.json.return_value = json_val
+    if content is not None:
+        response.content = content
+    return response
+
+
+# Real WAV payloads for the _save_audio_file tests, built once
+WAV_BYTES = _make_wav_bytes(1000)
+EMPTY_WAV_BYTES = _make_wav_bytes(0)
+
+# VoiceGenerator steps replaced via patch.multiple when testing generate_voice
+VOICE_PIPELINE_STEPS = dict.fromkeys(
+    ('_preprocess_text', '_create_audio_query', '_synthesize_voice',
+     '_save_audio_file', '_get_audio_duration'),
+    DEFAULT
+)
+
+# File names tests expect under config.temp_dir; joined once by temp_paths
+TEMP_FILE_NAMES = (
+    'test.wav', 'not_created.wav', 'empty.wav', 'corrupted.wav',
+    'voice_123.wav', 'voice_456.wav', 'voice_789.wav',
+    'voice_1234567890.wav', 'custom.wav'
+)
+
+
+@pytest.fixture(scope="module")
+def config():
+    """Config shared by all tests in this module"""
+    config = Mock(spec=Config)
+    config.voicevox_server_url = "http://localhost:50021"
+    config.speaker_id = 1
+    config.voicevox_max_workers = 4
+    
+    # File I/O is mocked in nearly every test, so one directory serves the module
+    config.temp_dir = tempfile.mkdtemp()
+    
+    yield config
+    
+    # Skip the rmtree walk when no test left files behind (the usual case)
+    with os.scandir(config.temp_dir) as entries:
+        is_empty = next(entries, None) is None
+    
+    if is_empty:
+        os.rmdir(config.temp_dir)
+    else:
+        shutil.rmtree(config.temp_dir, ignore_errors=True)
+
+
+@pytest.fixture(scope="module")
+def generator(config):
+    """VoiceGenerator shared by all tests; tests only patch at class level"""
+    return VoiceGenerator(config)
+
+
+@pytest.fixture(scope="module")
+def temp_paths(config):
+    """Expected paths under config.temp_dir, keyed by file name"""
+    return {name: os.path.join(config.temp_dir, name) for name in TEMP_FILE_NAMES}
+
+
+@pytest.fixture
+def mock_post(monkeypatch):
+    """Replace requests.Session.post with a mock"""
+    mock = MagicMock()
+    monkeypatch.setattr(requests.Session, 'post', mock)
+    return mock
+
+
+@pytest.fixture
+def mock_get(monkeypatch):
+    """Replace requests.Session.get with a mock"""
+    mock = MagicMock()
+    monkeypatch.setattr(requests.Session, 'get', mock)
+    return mock
+
+
+@pytest.fixture
+def voice_pipeline():
+    """Replace the generate_voice pipeline steps with mocks, keyed by method name"""
+    with patch.multiple(VoiceGenerator, **VOICE_PIPELINE_STEPS) as mocks:
+        mocks['_preprocess_text'].return_value = "processed text"
+        mocks['_create_audio_query'].return_value = {'test': 'query'}
+        mocks['_synthesize_voice'].return_value = b'audio data'
+        yield mocks
+
+
+def test_init(generator, config):
+    """Test VoiceGenerator initialization"""
+    assert generator.config == config
+    assert generator.base_url == "http://localhost:50021"
+    assert isinstance(generator.session, requests.Session)
+    retry = generator.session.adapters['http://'].max_retries
+    assert retry.total == 2
+    assert 'POST' in retry.allowed_methods
+
+
+def test_init_does_not_retry_post_read_timeout(generator):
+    """Test a read timeout on a POST is raised instead of sending the request again"""
+    from urllib3.exceptions import MaxRetryError, ReadTimeoutError
+    retry = generator.session.adapters['http://'].max_retries
+    
+    with pytest.raises(MaxRetryError):
+        retry.increment(method='POST', url='/synthesis', error=ReadTimeoutError(None, '/synthesis', "Read timed out."))
+
+
+def test_init_strip_trailing_slash():
+    """Test initialization with trailing slash in URL"""
+    config = Mock(spec=Config)
+    config.voicevox_server_url = "http://localhost:50021/"
+    config.voicevox_max_workers = 4
+    generator = VoiceGenerator(config)
+    
+    assert generator.base_url == "http://localhost:50021"
+
+
+@pytest.mark.parametrize('text, expected', [
+    # Whitespace normalization
+    pytest.param("  こんにちは   世界  ", "こんにちは 世界", id="whitespace"),
+    # Punctuation with pauses
+    pytest.param("こんにちは。元気ですか？そうですね！", "こんにちは。、元気ですか？、そうですね！、", id="punctuation"),
+    # Special character replacement
+    pytest.param("AI・ML～50%の確率で成功…", "AIとMLから50パーセントの確率で成功。", id="special_characters"),
+])
+def test_preprocess_text(generator, text, expected):
+    """Test text preprocessing"""
+    assert generator._preprocess_text(text) == expected
+
+
+@pytest.mark.parametrize('script', ["", "   "])
+def test_generate_voice_empty_script(generator, script):
+    """Test voice generation with empty script"""
+    with pytest.raises(ValueError, match="Script text cannot be empty"):
+        generator.generate_voice(script)
+
+
+def test_create_audio_query_success(generator, mock_post):
+    """Test successful audio query creation"""
+    # Mock successful response
+    mock_post.return_value = _make_response(json_val={
+        'accent_phrases': [{'moras': [{'text': 'テ'}, {'text': 'ス'}, {'text': 'ト'}]}],
+        'speedScale': 1.0
+    })
+    
+    result = generator._create_audio_query("テスト")
+    
+    assert 'accent_phrases' in result
+    mock_post.assert_called_once()
+    args, kwargs = mock_post.call_args
+    assert 'audio_query' in args[0]
+    assert kwargs['params']['text'] == "テスト"
+    assert kwargs['params']['speaker'] == 1
+
+
+def test_create_audio_query_cached(generator, mock_post):
+    """Test repeated text reuses the cached audio query instead of calling VOICEVOX"""
+    mock_post.return_value = _make_response(json_val={'accent_phrases': [], 'kana': 'キャッシュ'})
+    
+    first = generator._create_audio_query("キャッシュ")
+    second = generator._create_audio_query("キャッシュ")
+    
+    assert second == first
+    assert second is not first  # Callers may modify the query
+    mock_post.assert_called_once()
+
+
+@pytest.mark.parametrize('status_code, expected', [
+    (400, "Invalid text or speaker ID"),
+    (503, "VOICEVOX server is not running"),
+    (500, "VOICEVOX API error: 500"),  # Other error
+])
+def test_create_audio_query_errors(generator, mock_post, status_code, expected):
+    """Test audio query creation error handling"""
+    mock_post.return_value = _make_response(status_code)
+    
+    with pytest.raises(RuntimeError, match=expected):
+        generator._create_audio_query("test")
+
+
+@pytest.mark.parametrize('error, expected', [
+    pytest.param(_ConnErr("Connection failed"), "Cannot connect to VOICEVOX server", id="connection"),
+    pytest.param(_Timeout("Timeout"), _VOICEVOX_TIMEOUT_RE, id="timeout", marks=fast_skip),
+    pytest.param(_ReqExc("Network error"), "Network error", id="request", marks=fast_skip),  # Generic request error
+])
+def test_create_audio_query_network_errors(generator, mock_post, error, expected):
+    """Test audio query network error handling"""
+    mock_post.side_effect = error
+    
+    with pytest.raises(RuntimeError, match=expected):
+        generator._create_audio_query("test")
+
+
+_ACCENT_PHRASES = [
+    {'moras': [{'text': 'テ'}, {'text': 'ス'}, {'text': 'ト'}]}
+]
+
+
+@pytest.mark.parametrize('audio_query, expected', [
+    # 3 moras * 0.15 seconds per mora
+    pytest.param({'accent_phrases': _ACCENT_PHRASES, 'speedScale': 1.0}, 3 * 0.15, id="normal_speed"),
+    pytest.param({'accent_phrases': _ACCENT_PHRASES, 'speedScale': 2.0}, (3 * 0.15) / 2.0, id="speed_scale"),
+    # No accent_phrases means total_moras is 0, so this returns 0.0
+    # rather than using the character-count fallback
+    pytest.param({"invalid": "data"}, 0.0, id="no_accent_phrases"),
+])
+def test_estimate_duration(generator, audio_query, expected):
+    """Test audio duration estimation"""
+    assert generator._estimate_duration(audio_query) == expected
+
+
+def test_synthesize_voice_success(generator, mock_post):
+    """Test successful voice synthesis"""
+    # Mock successful response
+    mock_post.return_value = _make_response(content=b'fake audio data')
+    
+    audio_query = {'accent_phrases': [], 'speedScale': 1.0}
+    result = generator._synthesize_voice(audio_query)
+    
+    assert result == b'fake audio data'
+    mock_post.assert_called_once()
+    args, kwargs = mock_post.call_args
+    assert 'synthesis' in args[0]
+    assert kwargs['json'] == audio_query
+
+
+def test_synthesize_voice_cached(generator, mock_post):
+    """Test synthesizing the same query twice calls VOICEVOX once"""
+    mock_post.return_value = _make_response(content=b'cached audio data')
+    
+    audio_query = {'accent_phrases': [], 'speedScale': 1.0, 'kana': 'キャッシュ'}
+    generator._synthesize_voice(dict(audio_query))
+    
+    assert generator._synthesize_voice(dict(audio_query)) == b'cached audio data'
+    mock_post.assert_called_once()
+
+
+def test_write_cache_evicts_least_recently_used(generator, monkeypatch):
+    """Test the cache drops least recently read entries once it exceeds CACHE_MAX_BYTES"""
+    monkeypatch.setattr(VoiceGenerator, 'CACHE_MAX_BYTES', 250)
+    paths = [generator._cache_path('eviction', str(i), '.wav') for i in range(3)]
+    
+    generator._write_cache(paths[0], b'0' * 100)
+    generator._write_cache(paths[1], b'1' * 100)
+    os.utime(paths[0], (1, os.stat(paths[0]).st_mtime))
+    os.utime(paths[1], (1, os.stat(paths[1]).st_mtime))
+    assert generator._read_cache(paths[0]) == b'0' * 100  # Now the most recently used
+    generator._write_cache(paths[2], b'2' * 100)
+    
+    assert os.path.exists(paths[0])
+    assert not os.path.exists(paths[1])
+    assert os.path.exists(paths[2])
+
+
+def test_write_cache_scans_only_when_over_limit(config, tmp_path, monkeypatch):
+    """Test writes below CACHE_MAX_BYTES add to a running total instead of rescanning the cache"""
+    monkeypatch.setattr(VoiceGenerator, 'CACHE_MAX_BYTES', 250)
+    monkeypatch.setattr(config, 'temp_dir', str(tmp_path))
+    generator = VoiceGenerator(config)
+    mock_evict = Mock(wraps=generator._evict_cache)
+    monkeypatch.setattr(generator, '_evict_cache', mock_evict)
+    
+    for i in range(3):
+        generator._write_cache(generator._cache_path('counter', str(i), '.wav'), b'0' * 100)
+    
+    # The first write finds the starting size; only the third goes over 250 bytes
+    assert mock_evict.call_count == 2
+
+
+def test_synthesize_voice_speed_adjustment(generator, mock_post, monkeypatch):
+    """Test voice synthesis with speed adjustment for long content"""
+    mock_post.return_value = _make_response(content=b'fake audio data')
+    
+    # Create query that would result in > 30 second duration
+    long_audio_query = {
+        'accent_phrases': [
+            {'moras': [{'text': 'あ'} for _ in range(250)]}  # 250 moras = 37.5 seconds
+        ],
+        'speedScale': 1.0
+    }
+    
+    monkeypatch.setattr(generator, '_estimate_duration', Mock(return_value=35))
+    generator._synthesize_voice(long_audio_query)
+    
+    # Speed should be adjusted
+    call_args = mock_post.call_args
+    adjusted_query = call_args[1]['json']
+    assert adjusted_query['speedScale'] > 1.0
+
+
+def test_split_sentences(generator):
+    """Test preprocessed text is split after each sentence end and its pause"""
+    text = generator._preprocess_text("こんにちは。元気ですか？はい")
+    
+    assert generator._split_sentences(text) == ["こんにちは。、", "元気ですか？、", "はい"]
+
+
+def test_synthesize_sentences(generator, monkeypatch):
+    """Test sentences are synthesized separately, sped up together and joined in order"""
+    # 140 moras per sentence = 21 seconds each
+    queries = {
+        text: {'accent_phrases': [{'moras': [{'text': 'あ'}] * 140}], 'speedScale': 1.0}
+        for text in ('一。、', '二。、')
+    }
+    monkeypatch.setattr(VoiceGenerator, '_create_audio_query', Mock(side_effect=queries.get))
+    chunks = {'一。、': _make_wav_bytes(100), '二。、': _make_wav_bytes(300)}
+    mock_synthesize = Mock(side_effect=lambda query, is_custom_script: chunks[query['text']])
+    monkeypatch.setattr(VoiceGenerator, '_synthesize_voice', mock_synthesize)
+    for text, query in queries.items():
+        query['text'] = text
+    
+    audio_data = generator._synthesize_sentences(['一。、', '二。、'])
+    
+    # 42s estimated in total, so both sentences get the same 1.5x speed
+    assert [query['speedScale'] for query in queries.values()] == [1.5, 1.5]
+    assert all(c.kwargs['is_custom_script'] for c in mock_synthesize.call_args_list)
+    
+    with wave.open(io.BytesIO(audio_data), 'rb') as wav_file:
+        assert wav_file.getnframes() == 400
+
+
+def test_synthesize_sentences_drops_silence_between_sentences(generator, monkeypatch):
+    """Test only the first and last sentences keep VOICEVOX's leading and trailing silence"""
+    texts = ['一。、', '二。、', '三']
+    queries = {
+        text: {'accent_phrases': [], 'speedScale': 1.0, 'prePhonemeLength': 0.1, 'postPhonemeLength': 0.1}
+        for text in texts
+    }
+    monkeypatch.setattr(VoiceGenerator, '_create_audio_query', Mock(side_effect=queries.get))
+    # Each sentence is 0.1s of speech plus its leading and trailing silence, at 24000 frames per second
+    monkeypatch.setattr(VoiceGenerator, '_synthesize_voice', Mock(side_effect=lambda query, is_custom_script: _make_wav_bytes(
+        round(24000 * (query['prePhonemeLength'] + 0.1 + query['postPhonemeLength']))
+    )))
+    
+    audio_data = generator._synthesize_sentences(texts)
+    
+    with wave.open(io.BytesIO(audio_data), 'rb') as wav_file:
+        assert wav_file.getnframes() == 24000 * 0.5  # 0.1s before, 3 x 0.1s of speech, 0.1s after
+
+
+def test_synthesize_voice_error(generator, mock_post):
+    """Test voice synthesis API error handling"""
+    mock_post.return_value = _make_response(500)
+    
+    with pytest.raises(RuntimeError, match="Voice synthesis failed: 500"):
+        generator._synthesize_voice({})
+
+
+@fast_skip
+def test_synthesize_voice_network_error(generator, mock_post):
+    """Test voice synthesis network error handling"""
+    mock_post.side_effect = _ReqExc("Network error")
+    
+    with pytest.raises(RuntimeError, match="Voice synthesis network error"):
+        generator._synthesize_voice({})
+
+
+def test_save_audio_file_success(generator, temp_paths):
+    """Test successful audio file saving"""
+    output_path = temp_paths["test.wav"]
+    
+    generator._save_audio_file(WAV_BYTES, output_path)
+    
+    with open(output_path, 'rb') as f:
+        assert f.read() == WAV_BYTES
+
+
+def test_save_audio_file_not_created(generator, temp_paths, monkeypatch):
+    """Test audio file saving when file is not created"""
+    monkeypatch.setattr('os.path.exists', Mock(return_value=False))  # File not created
+    
+    with pytest.raises(RuntimeError, match="Failed to create audio file"):
+        generator._save_audio_file(WAV_BYTES, temp_paths["not_created.wav"])
+
+
+def test_save_audio_file_empty(generator, temp_paths):
+    """Test audio file saving with empty audio"""
+    with pytest.raises(RuntimeError, match="Generated audio file is empty"):
+        generator._save_audio_file(EMPTY_WAV_BYTES, temp_paths["empty.wav"])
+
+
+def test_save_audio_file_corrupted(generator, temp_paths):
+    """Test audio file saving with corrupted file"""
+    # Not a RIFF header, so wave.open raises wave.Error
+    with pytest.raises(RuntimeError, match="Generated audio file is corrupted"):
+        generator._save_audio_file(b'corrupted audio data', temp_paths["corrupted.wav"])
+
+
+def test_save_audio_file_io_error(generator, monkeypatch):
+    """Test audio file saving with IO error"""
+    monkeypatch.setattr('builtins.open', Mock(side_effect=IOError("Permission denied")))
+    
+    with pytest.raises(RuntimeError, match="Failed to save audio file"):
+        generator._save_audio_file(b'data', "/tmp/test.wav")
+
+
+def test_get_audio_duration_success(generator, monkeypatch):
+    """Test successful audio duration calculation"""
+    mock_wave_open = MagicMock()
+    monkeypatch.setattr('wave.open', mock_wave_open)
+    
+    mock_wav_file = Mock()
+    mock_wav_file.getnframes.return_value = 44100  # 1 second at 44.1kHz
+    mock_wav_file.getframerate.return_value = 44100
+    mock_wave_open.return_value.__enter__.return_value = mock_wav_file
+    
+    duration = generator._get_audio_duration("/path/to/audio.wav")
+    
+    assert duration == 1.0
+
+
+def test_get_audio_duration_from_header(generator, temp_paths, monkeypatch):
+    """Test duration of a canonical WAV is read from its header without the wave module"""
+    output_path = temp_paths["test.wav"]
+    with open(output_path, 'wb') as f:
+        f.write(WAV_BYTES)
+    monkeypatch.setattr('wave.open', Mock(side_effect=AssertionError("wave.open should not be used")))
+    
+    # 1000 frames at 24kHz
+    assert generator._get_audio_duration(output_path) == 1000 / 24000
+
+
+def test_get_audio_duration_error(generator, monkeypatch):
+    """Test audio duration calculation with error"""
+    monkeypatch.setattr('wave.open', Mock(side_effect=Exception("File error")))
+    
+    duration = generator._get_audio_duration("/path/to/audio.wav")
+    
+    assert duration == 0.0
+
+
+@pytest.mark.parametrize('error_message', ["Connection failed", "Server not running"])
+def test_handle_voice_error_connection(generator, error_message):
+    """Test voice error handling for connection issues"""
+    with pytest.raises(RuntimeError, match="VOICEVOX server is not accessible"):
+        generator._handle_voice_error(Exception(error_message))
+
+
+def test_handle_voice_error_timeout(generator):
+    """Test voice error handling for timeout"""
+    with pytest.raises(RuntimeError, match=_VOICEVOX_TIMEOUT_RE):
+        generator._handle_voice_error(Exception("Request timeout"))
+
+
+def test_handle_voice_error_speaker(generator):
+    """Test voice error handling for speaker issues"""
+    with pytest.raises(RuntimeError, match="Invalid speaker ID"):
+        generator._handle_voice_error(Exception("Invalid speaker ID"))
+
+
+def test_handle_voice_error_generic(generator):
+    """Test voice error handling for generic errors"""
+    with pytest.raises(RuntimeError, match="Voice generation failed"):
+        generator._handle_voice_error(Exception("Unknown error"))
+
+
+def test_cleanup_temp_audio(generator, config):
+    """Test cleanup of temporary audio files"""
+    names = ('voice_123.wav', 'voice_456.wav', 'other_file.txt', 'voice_789.wav')
+    for name in names:
+        with open(os.path.join(config.temp_dir, name), 'wb'):
+            pass
+    os.mkdir(os.path.join(config.temp_dir, 'voice_dir.wav'))  # Not a file, so left alone
+    
+    generator.cleanup_temp_audio()
+    
+    # Should remove only voice files
+    remaining = set(os.listdir(config.temp_dir))
+    assert not remaining & {'voice_123.wav', 'voice_456.wav', 'voice_789.wav'}
+    assert {'other_file.txt', 'voice_dir.wav'} <= remaining
+    
+    os.remove(os.path.join(config.temp_dir, 'other_file.txt'))
+    os.rmdir(os.path.join(config.temp_dir, 'voice_dir.wav'))
+
+
+def test_test_connection_success(generator, mock_get):
+    """Test successful connection test"""
+    mock_get.return_value = _make_response()
+    
+    result = generator.test_connection()
+    
+    assert result is True
+    mock_get.assert_called_once_with("http://localhost:50021/version", timeout=5)
+
+
+def test_test_connection_failure(generator, mock_get):
+    """Test connection test failure on API error"""
+    mock_get.return_value = _make_response(500)
+    
+    result = generator.test_connection()
+    assert result is False
+
+
+@fast_skip
+def test_test_connection_network_error(generator, mock_get):
+    """Test connection test failure on network error"""
+    mock_get.side_effect = Exception("Network error")
+    
+    result = generator.test_connection()
+    assert result is False
+
+
+def test_get_available_speakers_success(generator, mock_get):
+    """Test successful speakers retrieval"""
+    mock_speakers = [
+        {'name': 'ずんだもん', 'speaker_uuid': 'test1'},
+        {'name': '四国めたん', 'speaker_uuid': 'test2'}
+    ]
+    
+    mock_get.return_value = _make_response(json_val=mock_speakers)
+    
+    result = generator.get_available_speakers()
+    
+    assert result == mock_speakers
+    mock_get.assert_called_once_with("http://localhost:50021/speakers", timeout=10)
+
+
+def test_get_available_speakers_failure(generator, mock_get):
+    """Test speakers retrieval failure on API error"""
+    generator.refresh_speakers()  # Drop speakers cached by earlier tests
+    mock_get.return_value = _make_response(500)
+    
+    result = generator.get_available_speakers()
+    assert result == []
+
+
+@fast_skip
+def test_get_available_speakers_network_error(generator, mock_get):
+    """Test speakers retrieval failure on network error"""
+    generator.refresh_speakers()  # Drop speakers cached by earlier tests
+    mock_get.side_effect = Exception("Network error")
+    
+    result = generator.get_available_speakers()
+    assert result == []
+
+
+def test_get_available_speakers_cached(generator, mock_get):
+    """Test speakers are reused until refresh_speakers is called"""
+    generator.refresh_speakers()
+    mock_speakers = [{'name': 'ずんだもん', 'speaker_uuid': 'test1'}]
+    mock_get.return_value = _make_response(json_val=mock_speakers)
+    
+    assert generator.get_available_speakers() == mock_speakers
+    assert generator.get_available_speakers() == mock_speakers
+    mock_get.assert_called_once()
+    
+    generator.refresh_speakers()
+    generator.get_available_speakers()
+    assert mock_get.call_count == 2
+    generator.refresh_speakers()
+
+
+def test_generate_voice_success(generator, temp_paths, voice_pipeline, monkeypatch):
+    """Test successful voice generation"""
+    monkeypatch.setattr('time.time', Mock(return_value=1234567890))
+    voice_pipeline['_get_audio_duration'].return_value = 25.0  # Within 30-second limit
+    
+    result = generator.generate_voice("test script")
+    
+    expected_path = temp_paths["voice_1234567890.wav"]
+    assert result == expected_path
+    
+    voice_pipeline['_preprocess_text'].assert_called_once_with("test script")
+    voice_pipeline['_create_audio_query'].assert_called_once_with("processed text")
+    voice_pipeline['_synthesize_voice'].assert_called_once_with({'test': 'query'})
+    voice_pipeline['_save_audio_file'].assert_called_once_with(b'audio data', expected_path)
+
+
+def test_generate_voice_custom_filename(generator, temp_paths, voice_pipeline):
+    """Test voice generation with custom filename"""
+    voice_pipeline['_get_audio_duration'].return_value = 25.0
+    
+    result = generator.generate_voice("test script", "custom.wav")
+    
+    expected_path = temp_paths["custom.wav"]
+    assert result == expected_path
+    voice_pipeline['_save_audio_file'].assert_called_once_with(b'audio data', expected_path)
+
+
+def test_generate_voice_duration_warning(generator, voice_pipeline, capsys):
+    """Test voice generation with duration warning"""
+    voice_pipeline['_get_audio_duration'].return_value = 40.0  # Exceeds 35-second warning threshold
+    
+    generator.generate_voice("test script")
+    
+    # Should print warning
+    assert 'Warning' in capsys.readouterr().out
+
+
+def test_generate_voice_duration_from_memory(generator, voice_pipeline, capsys):
+    """Test the duration check uses the synthesized WAV header instead of re-reading the file"""
+    voice_pipeline['_synthesize_voice'].return_value = _make_wav_bytes(24000 * 40)  # 40 seconds
+    
+    generator.generate_voice("test script")
+    
+    voice_pipeline['_get_audio_duration'].assert_not_called()
+    assert 'Warning: Audio duration (40.0s)' in capsys.readouterr().out
+
+
+def test_generate_long_voice_keeps_chunk_order(generator, config, monkeypatch):
+    """Test chunks are synthesized concurrently but combined in script order"""
+    def fake_generate_voice(self, chunk, output_filename=None, is_custom_script=False):
+        time.sleep(0.01 * (3 - int(chunk)))  # Later chunks finish first
+        return os.path.join(config.temp_dir, f"part_{chunk}.wav")
+    
+    monkeypatch.setattr(VoiceGenerator, '_split_text_for_voice', Mock(return_value=['0', '1', '2']))
+    monkeypatch.setattr(VoiceGenerator, 'generate_voice', fake_generate_voice)
+    mock_combine = Mock(side_effect=lambda files, output_path: output_path)
+    monkeypatch.setattr(VoiceGenerator, '_combine_audio_files', mock_combine)
+    monkeypatch.setattr(VoiceGenerator, '_get_audio_duration', Mock(return_value=3.0))
+    
+    generator.generate_long_voice("long script", "long.wav")
+    
+    files = mock_combine.call_args[0][0]
+    assert files == [os.path.join(config.temp_dir, f"part_{i}.wav") for i in range(3)]
+
+
+def test_generate_long_voice_reuses_repeated_chunks(generator, config, monkeypatch):
+    """Test identical chunks are synthesized once and their audio is reused in place"""
+    mock_generate_voice = Mock(side_effect=lambda chunk, *args, **kwargs: os.path.join(config.temp_dir, f"{chunk}.wav"))
+    monkeypatch.setattr(VoiceGenerator, '_split_text_for_voice', Mock(return_value=['intro', 'body', 'intro']))
+    monkeypatch.setattr(VoiceGenerator, 'generate_voice', mock_generate_voice)
+    mock_combine = Mock(side_effect=lambda files, output_path: output_path)
+    monkeypatch.setattr(VoiceGenerator, '_combine_audio_files', mock_combine)
+    monkeypatch.setattr(VoiceGenerator, '_get_audio_duration', Mock(return_value=3.0))
+    
+    generator.generate_long_voice("long script", "long.wav")
+    
+    assert mock_generate_voice.call_count == 2
+    files = mock_combine.call_args[0][0]
+    assert files == [os.path.join(config.temp_dir, f"{chunk}.wav") for chunk in ('intro', 'body', 'intro')]
+
+
+def test_generate_long_voice_limits_requests_in_flight(tmp_path, mock_post, monkeypatch):
+    """Test chunk and sentence pools together keep at most voicevox_max_workers requests in flight"""
+    config = Mock(spec=Config)
+    config.voicevox_server_url = "http://localhost:50021"
+    config.speaker_id = 1
+    config.voicevox_max_workers = 2
+    config.temp_dir = str(tmp_path)
+    generator = VoiceGenerator(config)
+    
+    lock = threading.Lock()
+    in_flight = [0]
+    peak = [0]
+    
+    def post(url, **kwargs):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.01)
+        with lock:
+            in_flight[0] -= 1
+        if url.endswith('/audio_query'):
+            return _make_response(json_val={'accent_phrases': [], 'text': kwargs['params']['text']})
+        return _make_response(content=_make_wav_bytes(10))
+    
+    mock_post.side_effect = post
+    monkeypatch.setattr(VoiceGenerator, '_split_text_for_voice', Mock(return_value=['あ。い。', 'う。え。', 'お。か。']))
+    
+    generator.generate_long_voice("long script", "long.wav")
+    
+    assert mock_post.call_count == 12
+    assert peak[0] <= 2
+
+
+@pytest.mark.parametrize('text, max_chars, expected', [
+    pytest.param("短い文。", 10, ["短い文。"], id="fits"),
+    pytest.param("一文目。二文目！三文目？", 8, ["一文目。二文目！", "三文目？"], id="sentences"),
+    # A long sentence is split at commas even when it follows another sentence
+    pytest.param("あい。" + "う、" * 10 + "え。", 8, ["あい。う、う、", "う、う、う、う、", "う、う、う、う、", "え。"], id="long_sentence"),
+])
+def test_split_text_for_voice(generator, text, max_chars, expected):
+    """Test long text is chunked at sentence endings, falling back to commas"""
+    assert generator._split_text_for_voice(text, max_chars) == expected
+
+
+def test_combine_audio_files(generator, config):
+    """Test chunks are joined in order with 0.2 seconds of silence between them"""
+    chunk_paths = []
+    for i, n_frames in enumerate((1000, 2000)):
+        path = os.path.join(config.temp_dir, f"combine_{i}.wav")
+        with open(path, 'wb') as f:
+            f.write(_make_wav_bytes(n_frames))
+        chunk_paths.append(path)
+    output_path = os.path.join(config.temp_dir, "combined.wav")
+    
+    assert generator._combine_audio_files(chunk_paths, output_path) == output_path
+    
+    with wave.open(output_path, 'rb') as wav_file:
+        assert wav_file.getnframes() == 1000 + 4800 + 2000
+        assert wav_file.getframerate() == 24000
+
+
+def test_combine_audio_files_incompatible_format(generator, config):
+    """Test a chunk with another sample rate is rejected before the output is written"""
+    first_path = os.path.join(config.temp_dir, "mismatch_0.wav")
+    with open(first_path, 'wb') as f:
+        f.write(_make_wav_bytes(1000))
+    second_path = os.path.join(config.temp_dir, "mismatch_1.wav")
+    with wave.open(second_path, 'wb') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(16000)
+        wav_file.writeframes(b'\x00\x00' * 1000)
+    output_path = os.path.join(config.temp_dir, "mismatch_combined.wav")
+    
+    with pytest.raises(RuntimeError, match="incompatible format"):
+        generator._combine_audio_files([first_path, second_path], output_path)
+    assert not os.path.exists(output_path)
+
+
+def test_create_voice_generator(monkeypatch):
+    """Test factory function creates VoiceGenerator instance"""
+    mock_config_class = Mock(return_value=Mock(voicevox_max_workers=4))
+    monkeypatch.setattr('voice_generator.Config', mock_config_class)
+    
+    generator = create_voice_generator()
+    
+    assert isinstance(generator, VoiceGenerator)
+    mock_config_class.assert_called_once()
 
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    pytest.main([__file__])
@@ -1,368 +1,358 @@
-import unittest
-from unittest.mock import Mock, patch, mock_open, MagicMock, call
+import pytest
+from unittest.mock import Mock, patch, mock_open, MagicMock
 import os
-import tempfile
-import shutil
+import io
 import pickle
-from youtube_uploader import YouTubeUploader, create_youtube_uploader
-from config import Config
+from contextlib import ExitStack
+from types import SimpleNamespace
+from functools import lru_cache
+import importlib
 
 
-class TestYouTubeUploader(unittest.TestCase):
-    """Test cases for YouTubeUploader class"""
+def make_config():
+    """Plain stand-in for Config carrying only the fields YouTubeUploader reads"""
+    return SimpleNamespace(
+        youtube_token_file="/test/youtube_token.json",
+        youtube_credentials_file="/test/youtube_credentials.json"
+    )
+
+
+@pytest.fixture(scope="module")
+def mock_config():
+    """Config shared by all tests; the uploader only reads it"""
+    return make_config()
+
+
+@pytest.fixture(scope="session")
+def uploader_module():
+    """youtube_uploader, imported on first use so collection skips the Google client import"""
+    return importlib.import_module('youtube_uploader')
+
+
+@pytest.fixture(scope="session")
+def gapi(uploader_module):
+    """Google client modules patched by the tests, already loaded by youtube_uploader"""
+    return SimpleNamespace(
+        discovery=importlib.import_module('googleapiclient.discovery'),
+        http=importlib.import_module('googleapiclient.http'),
+        InstalledAppFlow=importlib.import_module('google_auth_oauthlib.flow').InstalledAppFlow
+    )
+
+
+@pytest.fixture(scope="module")
+def uploader(uploader_module, mock_config):
+    """YouTubeUploader shared by tests that never touch its service or credentials"""
+    return uploader_module.YouTubeUploader(mock_config)
+
+
+@pytest.fixture
+def fresh_uploader(uploader_module, mock_config):
+    """New YouTubeUploader for tests that set its service or credentials"""
+    return uploader_module.YouTubeUploader(mock_config)
+
+
+def _wire_youtube_service(service):
+    """Pre-build the videos().insert() and channels().list() call chains"""
+    service.videos.return_value.insert.return_value = MagicMock()
+    service.channels.return_value.list.return_value = MagicMock()
+    return service
+
+
+@pytest.fixture(scope="module")
+def _shared_youtube_service():
+    """One googleapi service mock for the module"""
+    return _wire_youtube_service(MagicMock())
+
+
+@pytest.fixture
+def youtube_service(_shared_youtube_service):
+    """The shared service mock, reset after each test"""
+    yield _shared_youtube_service
+    # reset_mock(return_value=True) would also clear MagicMock's magic-method
+    # defaults (e.g. __bool__), so reset call state and re-wire the chains instead
+    _shared_youtube_service.reset_mock(side_effect=True)
+    _wire_youtube_service(_shared_youtube_service)
+
+
+@pytest.fixture
+def upload_ctx(fresh_uploader, youtube_service, uploader_module, monkeypatch):
+    """Factory wiring fresh_uploader for an upload of an existing file
     
-    def setUp(self):
-        """Set up test fixtures"""
-        # Create a mock config
-        self.mock_config = Mock(spec=Config)
-        self.mock_config.youtube_token_file = "/test/youtube_token.json"
-        self.mock_config.youtube_credentials_file = "/test/youtube_credentials.json"
+    next_chunk reports each of progress_steps as an upload status, then
+    finishes with a response carrying final_id.
+    """
+    def make(final_id='test_video_id', progress_steps=()):
+        fresh_uploader.service = youtube_service
+        monkeypatch.setattr(os.path, 'exists', lambda p: True)
         
-        # Create test directories
-        self.test_dir = tempfile.mkdtemp()
+        media_upload = Mock()
+        # youtube_uploader imported the name, so patch it where upload_video looks it up
+        monkeypatch.setattr(uploader_module, 'MediaFileUpload', media_upload)
         
-    def tearDown(self):
-        """Clean up test fixtures"""
-        shutil.rmtree(self.test_dir, ignore_errors=True)
-    
-    def test_init(self):
-        """Test YouTubeUploader initialization"""
-        uploader = YouTubeUploader(self.mock_config)
+        chunks = iter([*((status, None) for status in progress_steps), (None, {'id': final_id})])
+        youtube_service.videos.return_value.insert.return_value.next_chunk = lambda: next(chunks)
         
-        self.assertEqual(uploader.config, self.mock_config)
-        self.assertIsNone(uploader.service)
-        self.assertIsNone(uploader.credentials)
-        self.assertEqual(uploader.SCOPES, ['https://www.googleapis.com/auth/youtube.upload'])
+        return SimpleNamespace(uploader=fresh_uploader, service=youtube_service, media_upload=media_upload)
     
-    @patch('os.path.exists')
-    @patch('builtins.open', new_callable=mock_open)
-    @patch('pickle.load')
-    @patch('googleapiclient.discovery.build')
-    def test_authenticate_with_existing_valid_token(self, mock_build, mock_pickle_load, mock_file, mock_exists):
-        """Test authentication with existing valid token"""
-        uploader = YouTubeUploader(self.mock_config)
-        
-        # Mock existing token file
-        mock_exists.return_value = True
-        
-        # Mock valid credentials
-        mock_creds = Mock()
-        mock_creds.valid = True
-        mock_pickle_load.return_value = mock_creds
-        
-        # Mock service build
-        mock_service = Mock()
-        mock_build.return_value = mock_service
-        
-        result = uploader.authenticate()
-        
-        self.assertTrue(result)
-        self.assertEqual(uploader.credentials, mock_creds)
-        self.assertEqual(uploader.service, mock_service)
-        mock_build.assert_called_once_with('youtube', 'v3', credentials=mock_creds)
-    
-    @patch('os.path.exists')
-    @patch('builtins.open', new_callable=mock_open)
-    @patch('pickle.load')
-    @patch('pickle.dump')
-    @patch('googleapiclient.discovery.build')
-    @patch('google_auth_oauthlib.flow.InstalledAppFlow.from_client_secrets_file')
-    def test_authenticate_with_expired_token_refresh(self, mock_flow, mock_build, mock_pickle_dump, 
-                                                   mock_pickle_load, mock_file, mock_exists):
-        """Test authentication with expired token that can be refreshed"""
-        uploader = YouTubeUploader(self.mock_config)
-        
-        # Mock existing token file
-        mock_exists.return_value = True
-        
-        # Mock expired but refreshable credentials
-        mock_creds = Mock()
-        mock_creds.valid = False
-        mock_creds.expired = True
-        mock_creds.refresh_token = "refresh_token"
-        mock_pickle_load.return_value = mock_creds
-        
-        # Mock successful refresh
-        mock_creds.refresh = Mock()
-        mock_creds.refresh.side_effect = lambda req: setattr(mock_creds, 'valid', True)
-        
-        # Mock service build
-        mock_service = Mock()
-        mock_build.return_value = mock_service
-        
-        result = uploader.authenticate()
-        
-        self.assertTrue(result)
-        mock_creds.refresh.assert_called_once()
-        mock_pickle_dump.assert_called_once()
+    return make
+
+
+@pytest.fixture
+def patched_env(gapi):
+    """Patch the filesystem, pickle and Google API entry points used by authenticate"""
+    with ExitStack() as stack:
+        yield SimpleNamespace(
+            exists=stack.enter_context(patch('os.path.exists')),
+            open=stack.enter_context(patch('builtins.open', new_callable=mock_open)),
+            pickle_load=stack.enter_context(patch('pickle.load')),
+            pickle_dump=stack.enter_context(patch('pickle.dump')),
+            build=stack.enter_context(patch.object(gapi.discovery, 'build')),
+            flow=stack.enter_context(patch.object(gapi.InstalledAppFlow, 'from_client_secrets_file'))
+        )
+
+
+@lru_cache(maxsize=None)
+def creds_stub(valid=True, expired=False, refresh_token=None):
+    """Shared credentials stand-in per shape; callers must not mutate it"""
+    return SimpleNamespace(valid=valid, expired=expired, refresh_token=refresh_token)
+
+
+# Token file payload: a real pickle of valid credentials, built once
+_CREDS_BLOB = pickle.dumps(creds_stub(), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def test_authenticate_with_existing_valid_token(fresh_uploader, gapi, youtube_service, monkeypatch):
+    """Test authentication with existing valid token"""
+    uploader = fresh_uploader
     
-    @patch('os.path.exists')
-    @patch('builtins.open', new_callable=mock_open)
-    @patch('pickle.dump')
-    @patch('googleapiclient.discovery.build')
-    @patch('google_auth_oauthlib.flow.InstalledAppFlow.from_client_secrets_file')
-    def test_authenticate_new_oauth_flow(self, mock_flow_class, mock_build, mock_pickle_dump, 
-                                       mock_file, mock_exists):
-        """Test authentication with new OAuth flow"""
-        uploader = YouTubeUploader(self.mock_config)
-        
-        # Mock credentials file exists, but no token file
-        def mock_exists_side_effect(path):
-            return path == self.mock_config.youtube_credentials_file
-        
-        mock_exists.side_effect = mock_exists_side_effect
-        
-        # Mock OAuth flow
-        mock_flow = Mock()
-        mock_flow_class.return_value = mock_flow
-        
-        mock_new_creds = Mock()
-        mock_new_creds.valid = True
-        mock_flow.run_local_server.return_value = mock_new_creds
-        
-        # Mock service build
-        mock_service = Mock()
-        mock_build.return_value = mock_service
-        
-        result = uploader.authenticate()
-        
-        self.assertTrue(result)
-        mock_flow.run_local_server.assert_called_once_with(port=0)
-        mock_pickle_dump.assert_called_once()
-        self.assertEqual(uploader.credentials, mock_new_creds)
+    # Existing token file; the real pickle.load reads the blob
+    monkeypatch.setattr(os.path, 'exists', lambda p: True)
+    monkeypatch.setattr('builtins.open', lambda path, mode='r': io.BytesIO(_CREDS_BLOB))
     
-    @patch('os.path.exists')
-    def test_authenticate_missing_credentials_file(self, mock_exists):
-        """Test authentication failure when credentials file is missing"""
-        uploader = YouTubeUploader(self.mock_config)
-        
-        # Mock no files exist
-        mock_exists.return_value = False
-        
+    # Mock service build
+    with patch.object(gapi.discovery, 'build', return_value=youtube_service) as mock_build:
         result = uploader.authenticate()
+    
+    assert result
+    assert uploader.credentials == creds_stub()
+    assert uploader.service == youtube_service
+    mock_build.assert_called_once_with('youtube', 'v3', credentials=creds_stub())
+
+
+def test_authenticate_with_expired_token_refresh(fresh_uploader, patched_env, youtube_service):
+    """Test authentication with expired token that can be refreshed"""
+    uploader = fresh_uploader
+    
+    # Mock existing token file
+    patched_env.exists.return_value = True
+    
+    # Mock expired but refreshable credentials
+    mock_creds = Mock()
+    mock_creds.valid = False
+    mock_creds.expired = True
+    mock_creds.refresh_token = "refresh_token"
+    patched_env.pickle_load.return_value = mock_creds
+    
+    # Mock successful refresh
+    mock_creds.refresh = Mock()
+    mock_creds.refresh.side_effect = lambda req: setattr(mock_creds, 'valid', True)
+    
+    # Mock service build
+    patched_env.build.return_value = youtube_service
+    
+    result = uploader.authenticate()
+    
+    assert result
+    mock_creds.refresh.assert_called_once()
+    patched_env.pickle_dump.assert_called_once()
+
+
+def test_authenticate_new_oauth_flow(fresh_uploader, mock_config, patched_env, youtube_service):
+    """Test authentication with new OAuth flow"""
+    uploader = fresh_uploader
+    
+    # Mock credentials file exists, but no token file
+    patched_env.exists.side_effect = lambda path: path == mock_config.youtube_credentials_file
+    
+    # Mock OAuth flow
+    mock_flow = Mock()
+    patched_env.flow.return_value = mock_flow
+    
+    mock_new_creds = creds_stub()
+    mock_flow.run_local_server.return_value = mock_new_creds
+    
+    # Mock service build
+    patched_env.build.return_value = youtube_service
+    
+    result = uploader.authenticate()
+    
+    assert result
+    mock_flow.run_local_server.assert_called_once_with(port=0)
+    patched_env.pickle_dump.assert_called_once()
+    assert uploader.credentials == mock_new_creds
+
+
+def test_authenticate_missing_credentials_file(fresh_uploader, patched_env):
+    """Test authentication failure when credentials file is missing"""
+    uploader = fresh_uploader
+    
+    # Mock no files exist
+    patched_env.exists.return_value = False
+    
+    result = uploader.authenticate()
+    
+    assert not result
+
+
+# Extensions validate_video_file should accept and reject
+VIDEO_EXTENSIONS = ['.mp4', '.mov', '.avi', '.wmv', '.flv', '.webm']
+OTHER_EXTENSIONS = ['.txt', '.pdf', '.jpg', '.png', '.doc']
+
+
+@pytest.mark.parametrize('exists, size, path, expected', [
+    pytest.param(False, 0, "/test/nonexistent.mp4", False, id="not_found"),
+    pytest.param(True, 3 * 1024 * 1024 * 1024, "/test/large_video.mp4", False, id="too_large"),
+    pytest.param(True, 0, "/test/empty.mp4", False, id="empty"),
+    *[pytest.param(True, 50 * 1024 * 1024, f"/test/video{ext}", True, id=f"accepts{ext}")
+      for ext in VIDEO_EXTENSIONS],
+    *[pytest.param(True, 50 * 1024 * 1024, f"/test/file{ext}", False, id=f"rejects{ext}")
+      for ext in OTHER_EXTENSIONS],
+])
+def test_validate_video_file(uploader, monkeypatch, exists, size, path, expected):
+    """Test video file validation for existence, size and extension"""
+    monkeypatch.setattr(os.path, 'exists', lambda p: exists)
+    monkeypatch.setattr(os.path, 'getsize', lambda p: size)
+    
+    assert uploader.validate_video_file(path) is expected
+
+
+class TestYouTubeUploader:
+    """Test cases for YouTubeUploader class"""
+    
+    @pytest.fixture(autouse=True)
+    def _use_fixtures(self, mock_config, uploader, fresh_uploader, upload_ctx, youtube_service, monkeypatch):
+        """Expose the module fixtures to the test methods"""
+        self.mock_config = mock_config
+        self.uploader = uploader
+        self.fresh_uploader = fresh_uploader
+        self.upload_ctx = upload_ctx
+        self.youtube_service = youtube_service
+        self.monkeypatch = monkeypatch
+    
+    def test_init(self):
+        """Test YouTubeUploader initialization"""
+        uploader = self.fresh_uploader
         
-        self.assertFalse(result)
+        assert uploader.config == self.mock_config
+        assert uploader.service is None
+        assert uploader.credentials is None
+        assert uploader.SCOPES == ['https://www.googleapis.com/auth/youtube.upload']
     
     def test_generate_video_metadata(self):
         """Test video metadata generation"""
-        uploader = YouTubeUploader(self.mock_config)
-        
         theme = "人工知能の未来"
         script = "人工知能は急速に発展しています。\n機械学習が社会を変えています。\n未来はAIと共にあります。"
         
-        metadata = uploader.generate_video_metadata(theme, script)
+        metadata = self.uploader.generate_video_metadata(theme, script)
         
         # Check metadata structure
-        self.assertIn('title', metadata)
-        self.assertIn('description', metadata)
-        self.assertIn('tags', metadata)
-        self.assertIn('categoryId', metadata)
+        assert 'title' in metadata
+        assert 'description' in metadata
+        assert 'tags' in metadata
+        assert 'categoryId' in metadata
         
         # Check content
-        self.assertIn(theme, metadata['title'])
-        self.assertIn("30秒で学ぶ", metadata['title'])
-        self.assertIn(theme, metadata['description'])
-        self.assertIn("人工知能は急速に発展しています。", metadata['description'])
-        self.assertIn('教育', metadata['tags'])
-        self.assertEqual(metadata['categoryId'], '27')  # Education category
+        assert theme in metadata['title']
+        assert "30秒で学ぶ" in metadata['title']
+        assert theme in metadata['description']
+        assert "人工知能は急速に発展しています。" in metadata['description']
+        assert '教育' in metadata['tags']
+        assert metadata['categoryId'] == '27'  # Education category
         
         # Check title length constraint
-        self.assertLessEqual(len(metadata['title']), 100)
+        assert len(metadata['title']) <= 100
     
     def test_generate_video_metadata_long_theme(self):
         """Test video metadata generation with long theme"""
-        uploader = YouTubeUploader(self.mock_config)
-        
         # Very long theme
         theme = "これは非常に長いテーマ名で、YouTubeのタイトル制限を超える可能性があるテーマです。さらに文字を追加して制限をテストします。"
         script = "テストスクリプトです。"
         
-        metadata = uploader.generate_video_metadata(theme, script)
+        metadata = self.uploader.generate_video_metadata(theme, script)
         
         # Title should be truncated to fit within 100 characters
-        self.assertLessEqual(len(metadata['title']), 100)
-        self.assertIn("...", metadata['title'])
-    
-    @patch('os.path.exists')
-    def test_validate_video_file_success(self, mock_exists):
-        """Test successful video file validation"""
-        uploader = YouTubeUploader(self.mock_config)
-        
-        # Mock file exists and has reasonable size
-        mock_exists.return_value = True
-        
-        with patch('os.path.getsize', return_value=50 * 1024 * 1024):  # 50MB
-            result = uploader.validate_video_file("/test/video.mp4")
-        
-        self.assertTrue(result)
-    
-    @patch('os.path.exists')
-    def test_validate_video_file_not_found(self, mock_exists):
-        """Test video file validation when file doesn't exist"""
-        uploader = YouTubeUploader(self.mock_config)
-        
-        mock_exists.return_value = False
-        
-        result = uploader.validate_video_file("/test/nonexistent.mp4")
-        
-        self.assertFalse(result)
-    
-    @patch('os.path.exists')
-    def test_validate_video_file_too_large(self, mock_exists):
-        """Test video file validation when file is too large"""
-        uploader = YouTubeUploader(self.mock_config)
-        
-        mock_exists.return_value = True
-        
-        # Mock file size too large (3GB)
-        with patch('os.path.getsize', return_value=3 * 1024 * 1024 * 1024):
-            result = uploader.validate_video_file("/test/large_video.mp4")
-        
-        self.assertFalse(result)
-    
-    @patch('os.path.exists')
-    def test_validate_video_file_empty(self, mock_exists):
-        """Test video file validation when file is empty"""
-        uploader = YouTubeUploader(self.mock_config)
-        
-        mock_exists.return_value = True
-        
-        with patch('os.path.getsize', return_value=0):
-            result = uploader.validate_video_file("/test/empty.mp4")
-        
-        self.assertFalse(result)
-    
-    @patch('os.path.exists')
-    def test_validate_video_file_invalid_extension(self, mock_exists):
-        """Test video file validation with invalid extension"""
-        uploader = YouTubeUploader(self.mock_config)
-        
-        mock_exists.return_value = True
-        
-        with patch('os.path.getsize', return_value=50 * 1024 * 1024):
-            result = uploader.validate_video_file("/test/video.txt")
-        
-        self.assertFalse(result)
+        assert len(metadata['title']) <= 100
+        assert "..." in metadata['title']
     
     def test_upload_video_not_authenticated(self):
         """Test video upload when not authenticated"""
-        uploader = YouTubeUploader(self.mock_config)
-        
         # Service is not set (not authenticated)
-        result = uploader.upload_video("/test/video.mp4", "テスト", "テストスクリプト")
+        result = self.uploader.upload_video("/test/video.mp4", "テスト", "テストスクリプト")
         
-        self.assertIsNone(result)
+        assert result is None
     
-    @patch('os.path.exists')
-    def test_upload_video_file_not_found(self, mock_exists):
+    def test_upload_video_file_not_found(self):
         """Test video upload when file doesn't exist"""
-        uploader = YouTubeUploader(self.mock_config)
+        uploader = self.fresh_uploader
         
         # Mock authenticated state
-        uploader.service = Mock()
+        uploader.service = self.youtube_service
         
         # Mock file doesn't exist
-        mock_exists.return_value = False
+        self.monkeypatch.setattr(os.path, 'exists', lambda p: False)
         
         result = uploader.upload_video("/test/nonexistent.mp4", "テスト", "テストスクリプト")
         
-        self.assertIsNone(result)
+        assert result is None
     
-    @patch('os.path.exists')
-    @patch('googleapiclient.http.MediaFileUpload')
-    def test_upload_video_success(self, mock_media_upload, mock_exists):
+    def test_upload_video_success(self):
         """Test successful video upload"""
-        uploader = YouTubeUploader(self.mock_config)
+        ctx = self.upload_ctx()
         
-        # Mock authenticated state
-        mock_service = Mock()
-        uploader.service = mock_service
-        
-        # Mock file exists
-        mock_exists.return_value = True
+        result = ctx.uploader.upload_video("/test/video.mp4", "テストテーマ", "テストスクリプト", 'private')
         
-        # Mock media upload
-        mock_media = Mock()
-        mock_media_upload.return_value = mock_media
-        
-        # Mock API response
-        mock_insert_request = Mock()
-        mock_service.videos().insert.return_value = mock_insert_request
-        
-        # Mock successful upload
-        mock_insert_request.next_chunk.return_value = (None, {'id': 'test_video_id'})
-        
-        result = uploader.upload_video("/test/video.mp4", "テストテーマ", "テストスクリプト", 'private')
-        
-        expected_url = "https://www.youtube.com/watch?v=test_video_id"
-        self.assertEqual(result, expected_url)
+        assert result == "https://www.youtube.com/watch?v=test_video_id"
         
         # Verify API call
-        mock_service.videos().insert.assert_called_once()
-        call_args = mock_service.videos().insert.call_args
-        self.assertIn('body', call_args[1])
-        self.assertIn('media_body', call_args[1])
-    
-    @patch('os.path.exists')
-    @patch('googleapiclient.http.MediaFileUpload')
-    def test_upload_video_with_progress_callback(self, mock_media_upload, mock_exists):
-        """Test video upload with progress callback"""
-        uploader = YouTubeUploader(self.mock_config)
-        
-        # Mock authenticated state
-        mock_service = Mock()
-        uploader.service = mock_service
-        
-        # Mock file exists
-        mock_exists.return_value = True
-        
-        # Mock media upload
-        mock_media = Mock()
-        mock_media_upload.return_value = mock_media
-        
-        # Mock API response with progress
-        mock_insert_request = Mock()
-        mock_service.videos().insert.return_value = mock_insert_request
+        ctx.service.videos().insert.assert_called_once()
+        call_args = ctx.service.videos().insert.call_args
+        assert 'body' in call_args[1]
+        assert 'media_body' in call_args[1]
         
+        # Uploaded in resumable chunks rather than one request
+        assert ctx.media_upload.call_args[1]['chunksize'] == ctx.uploader.UPLOAD_CHUNK_SIZE
+    
+    def test_upload_video_with_progress_callback(self):
+        """Test video upload with progress callback"""
         # Mock upload progress
         mock_status = Mock()
         mock_status.progress.return_value = 0.5  # 50% progress
         
-        # Mock upload steps: first call returns progress, second call returns final result
-        mock_insert_request.next_chunk.side_effect = [
-            (mock_status, None),  # Progress update
-            (None, {'id': 'test_video_id'})  # Final result
-        ]
+        ctx = self.upload_ctx(progress_steps=[mock_status])
         
-        # Mock callback
         callback_calls = []
-        def test_callback(message):
-            callback_calls.append(message)
+        result = ctx.uploader.upload_video(
+            "/test/video.mp4", "テスト", "スクリプト", 'private', callback_calls.append
+        )
         
-        result = uploader.upload_video("/test/video.mp4", "テスト", "スクリプト", 'private', test_callback)
-        
-        # Check result
-        expected_url = "https://www.youtube.com/watch?v=test_video_id"
-        self.assertEqual(result, expected_url)
+        assert result == "https://www.youtube.com/watch?v=test_video_id"
         
         # Check callback was called
-        self.assertGreater(len(callback_calls), 0)
-        self.assertTrue(any("progress" in call.lower() or "upload" in call.lower() for call in callback_calls))
+        assert len(callback_calls) > 0
+        assert any("progress" in call.lower() or "upload" in call.lower() for call in callback_calls)
     
     def test_get_upload_quota_usage_not_authenticated(self):
         """Test quota usage check when not authenticated"""
-        uploader = YouTubeUploader(self.mock_config)
-        
-        result = uploader.get_upload_quota_usage()
+        result = self.uploader.get_upload_quota_usage()
         
-        self.assertIsNone(result)
+        assert result is None
     
     def test_get_upload_quota_usage_success(self):
         """Test successful quota usage check"""
-        uploader = YouTubeUploader(self.mock_config)
+        uploader = self.fresh_uploader
         
         # Mock authenticated state
-        mock_service = Mock()
+        mock_service = self.youtube_service
         uploader.service = mock_service
         
         # Mock API response
@@ -372,144 +362,115 @@ class TestYouTubeUploader(unittest.TestCase):
         
         result = uploader.get_upload_quota_usage()
         
-        self.assertIsNotNone(result)
-        self.assertIn('quota_used', result)
-        self.assertIn('quota_limit', result)
-        self.assertEqual(result['quota_used'], 1)
-        self.assertEqual(result['quota_limit'], 10000)
+        assert result is not None
+        assert 'quota_used' in result
+        assert 'quota_limit' in result
+        assert result['quota_used'] == 1
+        assert result['quota_limit'] == 10000
     
     def test_check_authentication_status(self):
         """Test authentication status check"""
-        uploader = YouTubeUploader(self.mock_config)
+        uploader = self.fresh_uploader
         
         # Initially not authenticated
-        self.assertFalse(uploader.check_authentication_status())
+        assert not uploader.check_authentication_status()
         
         # Set authenticated state
-        uploader.service = Mock()
-        uploader.credentials = Mock()
+        uploader.service = self.youtube_service
+        uploader.credentials = creds_stub()
         
-        self.assertTrue(uploader.check_authentication_status())
+        assert uploader.check_authentication_status()
     
-    @patch('os.path.exists')
-    @patch('os.remove')
-    def test_revoke_credentials_success(self, mock_remove, mock_exists):
+    def test_revoke_credentials_success(self):
         """Test successful credential revocation"""
-        uploader = YouTubeUploader(self.mock_config)
+        uploader = self.fresh_uploader
+        mock_remove = Mock()
+        self.monkeypatch.setattr(os, 'remove', mock_remove)
         
         # Set authenticated state
-        uploader.service = Mock()
-        uploader.credentials = Mock()
+        uploader.service = self.youtube_service
+        uploader.credentials = creds_stub()
         
         # Mock token file exists
-        mock_exists.return_value = True
+        self.monkeypatch.setattr(os.path, 'exists', lambda p: True)
         
         result = uploader.revoke_credentials()
         
-        self.assertTrue(result)
+        assert result
         mock_remove.assert_called_once_with(self.mock_config.youtube_token_file)
-        self.assertIsNone(uploader.service)
-        self.assertIsNone(uploader.credentials)
+        assert uploader.service is None
+        assert uploader.credentials is None
     
-    @patch('os.path.exists')
-    def test_revoke_credentials_no_token_file(self, mock_exists):
+    def test_revoke_credentials_no_token_file(self):
         """Test credential revocation when token file doesn't exist"""
-        uploader = YouTubeUploader(self.mock_config)
+        uploader = self.fresh_uploader
         
         # Mock token file doesn't exist
-        mock_exists.return_value = False
+        self.monkeypatch.setattr(os.path, 'exists', lambda p: False)
         
         result = uploader.revoke_credentials()
         
-        self.assertTrue(result)
-        self.assertIsNone(uploader.service)
-        self.assertIsNone(uploader.credentials)
+        assert result
+        assert uploader.service is None
+        assert uploader.credentials is None
     
-    @patch('os.path.exists')
-    @patch('os.remove')
-    def test_revoke_credentials_error(self, mock_remove, mock_exists):
+    def test_revoke_credentials_error(self):
         """Test credential revocation error handling"""
-        uploader = YouTubeUploader(self.mock_config)
+        uploader = self.fresh_uploader
         
         # Mock token file exists but removal fails
-        mock_exists.return_value = True
-        mock_remove.side_effect = OSError("Permission denied")
+        def failing_remove(path):
+            raise OSError("Permission denied")
+        
+        self.monkeypatch.setattr(os.path, 'exists', lambda p: True)
+        self.monkeypatch.setattr(os, 'remove', failing_remove)
         
         result = uploader.revoke_credentials()
         
-        self.assertFalse(result)
+        assert not result
 
 
-class TestCreateYouTubeUploader(unittest.TestCase):
+class TestCreateYouTubeUploader:
     """Test cases for create_youtube_uploader factory function"""
     
+    @pytest.fixture(autouse=True)
+    def _use_fixtures(self, uploader_module):
+        """Expose the lazily imported module to the test methods"""
+        self.uploader_module = uploader_module
+    
     def test_create_youtube_uploader(self):
         """Test YouTubeUploader factory function"""
-        mock_config = Mock(spec=Config)
-        
-        uploader = create_youtube_uploader(mock_config)
-        
-        self.assertIsInstance(uploader, YouTubeUploader)
-        self.assertEqual(uploader.config, mock_config)
-
-
-class TestYouTubeUploaderIntegration(unittest.TestCase):
-    """Integration tests for YouTubeUploader"""
-    
-    def setUp(self):
-        """Set up integration test fixtures"""
-        self.mock_config = Mock(spec=Config)
-        self.mock_config.youtube_token_file = "/test/token.json"
-        self.mock_config.youtube_credentials_file = "/test/credentials.json"
-    
-    def test_metadata_generation_with_real_data(self):
-        """Test metadata generation with realistic data"""
-        uploader = YouTubeUploader(self.mock_config)
-        
-        # Test with various themes and scripts
-        test_cases = [
-            ("AI技術", "人工知能について説明します。"),
-            ("宇宙探査の未来", "宇宙探査技術の発展について。火星探査が注目されています。"),
-            ("量子コンピュータ", "量子コンピュータは従来のコンピュータとは異なる仕組みで動作します。")
-        ]
-        
-        for theme, script in test_cases:
-            with self.subTest(theme=theme):
-                metadata = uploader.generate_video_metadata(theme, script)
-                
-                # Check required fields exist
-                self.assertIn('title', metadata)
-                self.assertIn('description', metadata)
-                self.assertIn('tags', metadata)
-                self.assertIn('categoryId', metadata)
-                
-                # Check content quality
-                self.assertIn(theme, metadata['title'])
-                self.assertIn(script.split('。')[0], metadata['description'])
-                self.assertIn('教育', metadata['tags'])
-                self.assertIn(theme, metadata['tags'])
-    
-    def test_file_validation_edge_cases(self):
-        """Test file validation with edge cases"""
-        uploader = YouTubeUploader(self.mock_config)
-        
-        # Test various file extensions
-        valid_extensions = ['.mp4', '.mov', '.avi', '.wmv', '.flv', '.webm']
-        invalid_extensions = ['.txt', '.pdf', '.jpg', '.png', '.doc']
-        
-        with patch('os.path.exists', return_value=True), \
-             patch('os.path.getsize', return_value=50 * 1024 * 1024):  # 50MB
-            
-            for ext in valid_extensions:
-                with self.subTest(extension=ext):
-                    result = uploader.validate_video_file(f"/test/video{ext}")
-                    self.assertTrue(result, f"Should accept {ext} files")
-            
-            for ext in invalid_extensions:
-                with self.subTest(extension=ext):
-                    result = uploader.validate_video_file(f"/test/file{ext}")
-                    self.assertFalse(result, f"Should reject {ext} files")
+        mock_config = make_config()
+        
+        uploader = self.uploader_module.create_youtube_uploader(mock_config)
+        
+        assert isinstance(uploader, self.uploader_module.YouTubeUploader)
+        assert uploader.config == mock_config
+
+
+# Integration tests for YouTubeUploader
+
+@pytest.mark.parametrize('theme, script', [
+    ("AI技術", "人工知能について説明します。"),
+    ("宇宙探査の未来", "宇宙探査技術の発展について。火星探査が注目されています。"),
+    ("量子コンピュータ", "量子コンピュータは従来のコンピュータとは異なる仕組みで動作します。")
+])
+def test_metadata_generation_with_real_data(uploader, theme, script):
+    """Test metadata generation with realistic data"""
+    metadata = uploader.generate_video_metadata(theme, script)
+    
+    # Check required fields exist
+    assert 'title' in metadata
+    assert 'description' in metadata
+    assert 'tags' in metadata
+    assert 'categoryId' in metadata
+    
+    # Check content quality
+    assert theme in metadata['title']
+    assert script.split('。')[0] in metadata['description']
+    assert '教育' in metadata['tags']
+    assert theme in metadata['tags']
 
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    pytest.main([__file__])
@@ -7,10 +7,13 @@
 
 import os
 import sys
-from typing import Optional, Tuple
-from PIL import Image, ImageDraw, ImageFont
+import datetime
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple, Dict, List, Any
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
 import requests
-from io import BytesIO
 from config import Config
 
 
@@ -20,11 +23,35 @@ class ThumbnailGenerator:
     # YouTubeサムネイルの推奨サイズ
     THUMBNAIL_SIZE = (1280, 720)  # 16:9 アスペクト比
     
+    # システムのデフォルトフォントパス（先に見つかったものを使用）
+    FONT_PATHS = [
+        "/System/Library/Fonts/Helvetica.ttc",  # macOS
+        "/System/Library/Fonts/Arial.ttf",      # macOS
+        "C:/Windows/Fonts/arial.ttf",           # Windows
+        "C:/Windows/Fonts/meiryo.ttc",          # Windows（日本語）
+        "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",  # Linux
+        "/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf",  # Linux
+    ]
+    
+    # フォントパスの探索結果とサイズ別フォントのキャッシュ（全インスタンスで共有）
+    _font_path_resolved = False
+    _RESOLVED_FONT_PATH: Optional[str] = None
+    _FONT_CACHE: Dict[Tuple[Optional[str], int], ImageFont.ImageFont] = {}
+    
+    # レイアウトキャッシュの最大件数（古いものから破棄）
+    TEXT_LAYOUT_CACHE_SIZE = 32
+    
+    # デフォルトのグラデーション背景（全インスタンスで共有する読み取り専用の原本）
+    _DEFAULT_GRADIENT: Optional[Image.Image] = None
+    
     def __init__(self, config: Config):
         """サムネイル生成器を初期化"""
         self.config = config
         self.temp_dir = self.config.temp_dir
         
+        # 同じテキスト・フォントのレイアウト結果（bboxと文字マスク）を再利用する
+        self._text_layout_cache: 'OrderedDict[Tuple[str, Optional[str], int], Tuple[Tuple[int, int, int, int], Optional[Image.Image]]]' = OrderedDict()
+        
         # 一時ディレクトリを作成
         os.makedirs(self.temp_dir, exist_ok=True)
     
@@ -46,7 +73,6 @@ class ThumbnailGenerator:
         
         # 出力ファイル名を決定
         if output_filename is None:
-            import datetime
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             output_filename = f"thumbnail_{timestamp}.jpg"
         
@@ -60,8 +86,9 @@ class ThumbnailGenerator:
             if text:
                 background = self._add_text_to_image(background, text)
             
-            # ファイルに保存
-            background.save(output_path, "JPEG", quality=95)
+            # ファイルに保存（4:2:0サブサンプリング、追加のハフマン最適化パスなし）
+            background.save(output_path, "JPEG", quality=self.config.jpeg_quality,
+                            subsampling=2, optimize=False, progressive=False)
             
             print(f"サムネイル生成完了: {output_path}")
             return output_path
@@ -69,23 +96,54 @@ class ThumbnailGenerator:
         except Exception as e:
             raise RuntimeError(f"サムネイル生成中にエラーが発生しました: {e}")
     
+    def generate_many(self, specs: List[Dict[str, Any]], max_workers: Optional[int] = None) -> List[str]:
+        """
+        複数のサムネイル画像をプロセスプールで並列に生成
+        
+        Args:
+            specs: generate_thumbnailの引数（text, background_image_url, output_filename）の辞書のリスト
+            max_workers: ワーカープロセス数（省略時はCPU数）
+            
+        Returns:
+            生成されたサムネイル画像のパス（specsと同じ順序）
+        """
+        # 既定のファイル名は秒単位のタイムスタンプなので、並列生成で衝突しないよう連番を付ける
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        specs = [
+            spec if spec.get('output_filename') else
+            {**spec, 'output_filename': f"thumbnail_{timestamp}_{i}.jpg"}
+            for i, spec in enumerate(specs, 1)
+        ]
+        
+        if len(specs) <= 1:
+            return [self.generate_thumbnail(**spec) for spec in specs]
+        
+        # フォントとグラデーションのキャッシュは各ワーカープロセスで初回使用時に作られる
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            futures = [executor.submit(self.generate_thumbnail, **spec) for spec in specs]
+            return [future.result() for future in futures]
+    
     def _create_background(self, image_url: str = None) -> Image.Image:
         """背景画像を作成または取得"""
         if image_url:
             try:
-                # URLから画像をダウンロード
-                response = requests.get(image_url, timeout=10)
-                response.raise_for_status()
-                
-                # 画像を開く
-                background = Image.open(BytesIO(response.content))
-                
-                # RGBモードに変換（アルファチャンネルを削除）
-                if background.mode != 'RGB':
-                    background = background.convert('RGB')
-                
-                # サムネイルサイズにリサイズ（アスペクト比を保持してクロップ）
-                background = self._resize_and_crop(background, self.THUMBNAIL_SIZE)
+                # URLから画像をストリーミングでダウンロード
+                with requests.get(image_url, stream=True, timeout=10) as response:
+                    response.raise_for_status()
+                    
+                    # 画像を開く（転送エンコーディングはその場で展開）
+                    response.raw.decode_content = True
+                    background = Image.open(response.raw)
+                    
+                    # JPEGはデコード時にサムネイルサイズ付近まで縮小（DCTスケーリング）
+                    background.draft('RGB', self.THUMBNAIL_SIZE)
+                    
+                    # RGBモードに変換（アルファチャンネルを削除）
+                    if background.mode != 'RGB':
+                        background = background.convert('RGB')
+                    
+                    # サムネイルサイズにリサイズ（アスペクト比を保持してクロップ）
+                    background = self._resize_and_crop(background, self.THUMBNAIL_SIZE)
                 
                 return background
                 
@@ -106,86 +164,116 @@ class ThumbnailGenerator:
         original_ratio = original_width / original_height
         
         if original_ratio > target_ratio:
-            # 幅が広すぎる場合、高さに合わせてリサイズしてから幅をクロップ
-            new_height = target_height
-            new_width = int(original_width * (target_height / original_height))
-            image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            
-            # 中央でクロップ
-            left = (new_width - target_width) // 2
-            image = image.crop((left, 0, left + target_width, target_height))
+            # 幅が広すぎる場合、高さに合わせて左右をクロップ
+            crop_width = original_height * target_ratio
+            left = (original_width - crop_width) / 2
+            box = (left, 0, left + crop_width, original_height)
         else:
-            # 高さが高すぎる場合、幅に合わせてリサイズしてから高さをクロップ
-            new_width = target_width
-            new_height = int(original_height * (target_width / original_width))
-            image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            
-            # 中央でクロップ
-            top = (new_height - target_height) // 2
-            image = image.crop((0, top, target_width, top + target_height))
+            # 高さが高すぎる場合、幅に合わせて上下をクロップ
+            crop_height = original_width / target_ratio
+            top = (original_height - crop_height) / 2
+            box = (0, top, original_width, top + crop_height)
         
-        return image
+        # 中央のクロップ範囲だけをリサイズ（捨てる部分は再サンプリングしない）
+        # reducing_gapにより大きな縮小は整数倍のボックス縮小を先に行う
+        return image.resize(target_size, Image.Resampling.LANCZOS, box=box, reducing_gap=3.0)
     
     def _create_gradient_background(self) -> Image.Image:
         """グラデーション背景を作成"""
-        width, height = self.THUMBNAIL_SIZE
+        cls = type(self)
+        if cls._DEFAULT_GRADIENT is not None:
+            # 呼び出し側がテキストを描き込むため、原本のコピーを返す
+            return cls._DEFAULT_GRADIENT.copy()
         
-        # 新しい画像を作成
-        image = Image.new('RGB', (width, height))
-        draw = ImageDraw.Draw(image)
+        width, height = self.THUMBNAIL_SIZE
         
         # 青から紫へのグラデーション
-        start_color = (64, 128, 255)   # 明るい青
-        end_color = (128, 64, 255)     # 紫
+        start_color = np.array((64, 128, 255), dtype=np.float64)   # 明るい青
+        end_color = np.array((128, 64, 255), dtype=np.float64)     # 紫
         
-        for y in range(height):
-            # グラデーション比率を計算
-            ratio = y / height
-            
-            # 色を補間
-            r = int(start_color[0] * (1 - ratio) + end_color[0] * ratio)
-            g = int(start_color[1] * (1 - ratio) + end_color[1] * ratio)
-            b = int(start_color[2] * (1 - ratio) + end_color[2] * ratio)
-            
-            # 水平線を描画
-            draw.line([(0, y), (width, y)], fill=(r, g, b))
+        # 行ごとのグラデーション比率を一括計算 (height, 1)
+        ratios = (np.arange(height, dtype=np.float64) / height)[:, None]
         
-        return image
+        # 色を補間し、各行の色を画像幅に展開
+        row_colors = (start_color * (1 - ratios) + end_color * ratios).astype(np.uint8)
+        pixels = np.broadcast_to(row_colors[:, None, :], (height, width, 3))
+        
+        cls._DEFAULT_GRADIENT = Image.fromarray(np.ascontiguousarray(pixels), 'RGB')
+        return cls._DEFAULT_GRADIENT.copy()
     
     def _add_text_to_image(self, image: Image.Image, text: str) -> Image.Image:
         """画像にテキストを描画"""
-        draw = ImageDraw.Draw(image)
         width, height = image.size
         
         # フォントサイズを自動調整
         font_size = self._calculate_font_size(text, width * 0.8)  # 幅の80%を使用
         font = self._get_font(font_size)
         
-        # テキストのバウンディングボックスを取得
-        bbox = draw.textbbox((0, 0), text, font=font)
+        # テキストのバウンディングボックスと文字マスクを取得
+        bbox, text_mask = self._get_text_layout(text, font)
+        if text_mask is None:
+            return image
+        
         text_width = bbox[2] - bbox[0]
         text_height = bbox[3] - bbox[1]
         
         # テキストの位置を計算（中央配置）
-        x = (width - text_width) // 2
-        y = (height - text_height) // 2
+        # bboxの左上は原点からずれているので、その分を差し引いて見た目を中央に揃える
+        x = (width - text_width) // 2 - bbox[0]
+        y = (height - text_height) // 2 - bbox[1]
         
-        # 影を描画（テキストの可読性向上）
-        shadow_offset = max(2, font_size // 20)
-        draw.text((x + shadow_offset, y + shadow_offset), text, font=font, fill=(0, 0, 0, 128))
+        glyph_box = (x + bbox[0], y + bbox[1], x + bbox[2], y + bbox[3])
         
-        # アウトラインを描画
+        shadow_offset = max(2, font_size // 20)
         outline_width = max(1, font_size // 30)
-        for dx in range(-outline_width, outline_width + 1):
-            for dy in range(-outline_width, outline_width + 1):
-                if dx != 0 or dy != 0:
-                    draw.text((x + dx, y + dy), text, font=font, fill=(0, 0, 0))
         
-        # メインテキストを描画
-        draw.text((x, y), text, font=font, fill=(255, 255, 255))
+        # 文字の周辺だけを処理対象にする
+        margin = max(shadow_offset, outline_width)
+        region = (
+            max(0, glyph_box[0] - margin),
+            max(0, glyph_box[1] - margin),
+            min(width, glyph_box[2] + margin),
+            min(height, glyph_box[3] + margin),
+        )
+        glyphs = Image.new('L', (region[2] - region[0], region[3] - region[1]), 0)
+        glyphs.paste(text_mask, (glyph_box[0] - region[0], glyph_box[1] - region[1]))
+        
+        # 影（テキストの可読性向上）: マスクを右下にずらす
+        shadow = Image.new('L', glyphs.size, 0)
+        shadow.paste(glyphs, (shadow_offset, shadow_offset))
+        
+        # アウトライン: 最大値フィルタでマスクを正方形に膨張
+        outline = glyphs.filter(ImageFilter.MaxFilter(2 * outline_width + 1))
+        
+        # 影 → アウトライン → メインテキストの順に合成
+        area = image.crop(region)
+        area.paste((0, 0, 0), None, shadow)
+        area.paste((0, 0, 0), None, outline)
+        area.paste((255, 255, 255), None, glyphs)
+        image.paste(area, region[:2])
         
         return image
     
+    def _get_text_layout(self, text: str, font: ImageFont.ImageFont) -> Tuple[Tuple[int, int, int, int], Optional[Image.Image]]:
+        """テキストのbboxと、bbox範囲に描画した文字マスクを取得（キャッシュ付き）"""
+        # id()は解放済みフォントのものが再利用されうるため、フォントパスとサイズで識別する
+        key = (text, getattr(font, 'path', None), getattr(font, 'size', 0))
+        if key in self._text_layout_cache:
+            self._text_layout_cache.move_to_end(key)
+        else:
+            bbox = ImageDraw.Draw(Image.new('L', (1, 1))).textbbox((0, 0), text, font=font)
+            
+            text_mask = None
+            if bbox[2] > bbox[0] and bbox[3] > bbox[1]:
+                text_mask = Image.new('L', (bbox[2] - bbox[0], bbox[3] - bbox[1]), 0)
+                ImageDraw.Draw(text_mask).text((-bbox[0], -bbox[1]), text, font=font, fill=255)
+            
+            self._text_layout_cache[key] = (bbox, text_mask)
+            if len(self._text_layout_cache) > self.TEXT_LAYOUT_CACHE_SIZE:
+                self._text_layout_cache.popitem(last=False)
+        
+        return self._text_layout_cache[key]
+    
     def _calculate_font_size(self, text: str, max_width: float) -> int:
         """テキストの長さに基づいてフォントサイズを計算"""
         # 基本フォントサイズ
@@ -204,56 +292,69 @@ class ThumbnailGenerator:
         
         return int(base_size * size_factor)
     
+    @classmethod
+    def _resolve_font_path(cls) -> Optional[str]:
+        """利用可能なシステムフォントのパスを一度だけ探索"""
+        if not cls._font_path_resolved:
+            cls._RESOLVED_FONT_PATH = next(
+                (font_path for font_path in cls.FONT_PATHS if os.path.exists(font_path)), None
+            )
+            cls._font_path_resolved = True
+        return cls._RESOLVED_FONT_PATH
+    
     def _get_font(self, size: int) -> ImageFont.FreeTypeFont:
-        """フォントを取得"""
+        """フォントを取得（パスとサイズごとにキャッシュ）"""
         try:
-            # システムのデフォルトフォントパスを試す
-            font_paths = [
-                "/System/Library/Fonts/Helvetica.ttc",  # macOS
-                "/System/Library/Fonts/Arial.ttf",      # macOS
-                "C:/Windows/Fonts/arial.ttf",           # Windows
-                "C:/Windows/Fonts/meiryo.ttc",          # Windows（日本語）
-                "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",  # Linux
-                "/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf",  # Linux
-            ]
+            font_path = self._resolve_font_path()
+            key = (font_path, size)
             
-            for font_path in font_paths:
-                if os.path.exists(font_path):
-                    return ImageFont.truetype(font_path, size)
+            font = self._FONT_CACHE.get(key)
+            if font is None:
+                if font_path:
+                    font = ImageFont.truetype(font_path, size)
+                else:
+                    # システムフォントが見つからない場合はデフォルトフォントを使用
+                    font = ImageFont.load_default()
+                self._FONT_CACHE[key] = font
             
-            # システムフォントが見つからない場合はデフォルトフォントを使用
-            return ImageFont.load_default()
+            return font
             
         except Exception:
-            # フォント読み込みに失敗した場合はデフォルトフォントを使用
-            return ImageFont.load_default()
+            # フォント読み込みに失敗した場合はデフォルトフォントを使用（同じオブジェクトを使い回す）
+            font = self._FONT_CACHE.get((None, size))
+            if font is None:
+                font = ImageFont.load_default()
+                self._FONT_CACHE[(None, size)] = font
+            return font
     
     def validate_thumbnail(self, thumbnail_path: str) -> bool:
         """サムネイル画像を検証"""
-        if not os.path.exists(thumbnail_path):
+        # 存在確認とファイルサイズ取得を1回のstatで済ませる
+        try:
+            file_size = os.stat(thumbnail_path).st_size
+        except FileNotFoundError:
             print(f"エラー: サムネイル画像が見つかりません: {thumbnail_path}")
             return False
         
         try:
-            # 画像を開いて検証
+            # ファイルサイズチェック（YouTubeの制限: 2MB）
+            max_size = 2 * 1024 * 1024  # 2MB
+            
+            if file_size > max_size:
+                print(f"エラー: サムネイル画像が大きすぎます: {file_size / (1024*1024):.1f}MB (最大: 2MB)")
+                return False
+            
+            # ヘッダーだけを読んで寸法を取得（load()/verify()は呼ばない）
             with Image.open(thumbnail_path) as img:
-                # ファイルサイズチェック（YouTubeの制限: 2MB）
-                file_size = os.path.getsize(thumbnail_path)
-                max_size = 2 * 1024 * 1024  # 2MB
-                
-                if file_size > max_size:
-                    print(f"エラー: サムネイル画像が大きすぎます: {file_size / (1024*1024):.1f}MB (最大: 2MB)")
-                    return False
-                
-                # サイズと形式チェック
                 width, height = img.size
-                if width < 640 or height < 360:
-                    print(f"エラー: サムネイル画像が小さすぎます: {width}x{height} (最小: 640x360)")
-                    return False
-                
-                print(f"サムネイル検証成功: {os.path.basename(thumbnail_path)} ({width}x{height}, {file_size / 1024:.1f}KB)")
-                return True
-                
+            
+            if width < 640 or height < 360:
+                print(f"エラー: サムネイル画像が小さすぎます: {width}x{height} (最小: 640x360)")
+                return False
+            
+            print(f"サムネイル検証成功: {os.path.basename(thumbnail_path)} ({width}x{height}, {file_size / 1024:.1f}KB)")
+            return True
+            
         except Exception as e:
             print(f"エラー: サムネイル画像の検証に失敗しました: {e}")
             return False
@@ -262,11 +363,13 @@ class ThumbnailGenerator:
         """一時サムネイルファイルをクリーンアップ"""
         try:
             if os.path.exists(self.temp_dir):
-                for filename in os.listdir(self.temp_dir):
-                    if filename.startswith('thumbnail_') and filename.endswith(('.jpg', '.jpeg', '.png')):
-                        file_path = os.path.join(self.temp_dir, filename)
-                        os.remove(file_path)
-                        print(f"一時サムネイルファイルを削除: {filename}")
+                # scandirのエントリはファイル種別を保持しているので追加のstatが不要
+                with os.scandir(self.temp_dir) as entries:
+                    for entry in entries:
+                        name = entry.name
+                        if name.startswith('thumbnail_') and name.endswith(('.jpg', '.jpeg', '.png')) and entry.is_file():
+                            os.remove(entry.path)
+                            print(f"一時サムネイルファイルを削除: {name}")
         except Exception as e:
             print(f"警告: 一時サムネイルファイルの削除中にエラーが発生しました: {e}")
 
@@ -296,21 +399,25 @@ if __name__ == "__main__":
     
     print("サムネイル生成テスト開始...")
     
-    for i, text in enumerate(test_cases, 1):
-        try:
-            print(f"\nテスト {i}: '{text}'")
-            thumbnail_path = generator.generate_thumbnail(
-                text=text,
-                output_filename=f"test_thumbnail_{i}.jpg"
-            )
-            
-            # 検証
-            if generator.validate_thumbnail(thumbnail_path):
-                print(f"✅ テスト {i} 成功: {thumbnail_path}")
-            else:
-                print(f"❌ テスト {i} 失敗: 検証エラー")
+    # 各ケースをワーカープロセスで並列に生成し、成否はケースごとに報告する
+    with ProcessPoolExecutor() as executor:
+        futures = [
+            executor.submit(generator.generate_thumbnail, text=text, output_filename=f"test_thumbnail_{i}.jpg")
+            for i, text in enumerate(test_cases, 1)
+        ]
+        
+        for i, (text, future) in enumerate(zip(test_cases, futures), 1):
+            try:
+                print(f"\nテスト {i}: '{text}'")
+                thumbnail_path = future.result()
                 
-        except Exception as e:
-            print(f"❌ テスト {i} 失敗: {e}")
+                # 検証
+                if generator.validate_thumbnail(thumbnail_path):
+                    print(f"✅ テスト {i} 成功: {thumbnail_path}")
+                else:
+                    print(f"❌ テスト {i} 失敗: 検証エラー")
+                    
+            except Exception as e:
+                print(f"❌ テスト {i} 失敗: {e}")
     
     print(f"\nテスト完了。生成されたファイルは {config.temp_dir} にあります。")
\ No newline at end of file
@@ -1,20 +1,222 @@
+import copy
+import json
 import os
+import subprocess
+import tempfile
 import time
-from typing import List, Dict, Optional
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, List, Dict, Optional, Tuple
+import numpy as np
+from PIL import Image
 from moviepy.editor import (
-    VideoFileClip, ImageClip, AudioFileClip, CompositeVideoClip,
-    concatenate_videoclips, ColorClip, TextClip
+    VideoClip, VideoFileClip, ImageClip, AudioFileClip,
+    concatenate_videoclips, TextClip
 )
+from moviepy.video.fx.loop import loop
 from config import Config
 
+# Extensions of temporary video files swept by cleanup_temp_files
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.avi')
+
+# OpenCV (optional): SIMD-optimized resampling for still images
+try:
+    import cv2
+    OPENCV_AVAILABLE = True
+except ImportError:
+    OPENCV_AVAILABLE = False
+
+# PyAV (optional): multi-threaded decoding for background videos
+try:
+    import av
+    PYAV_AVAILABLE = True
+except ImportError:
+    PYAV_AVAILABLE = False
+
+
+class PyAVVideoReader:
+    """Read RGB frames from a video with PyAV's threaded decoder, seeking only when time goes backwards"""
+    
+    def __init__(self, path: str):
+        self.container = av.open(path)
+        self.stream = self.container.streams.video[0]
+        self.stream.thread_type = 'AUTO'
+        self.stream.thread_count = 0  # Let FFmpeg pick the thread count
+        
+        if self.stream.duration:
+            self.duration = float(self.stream.duration * self.stream.time_base)
+        else:
+            self.duration = self.container.duration / av.time_base
+        self.fps = float(self.stream.average_rate or 24)
+        # Frame times include the stream's start offset, while clip time starts at 0
+        self._start_pts = self.stream.start_time or 0
+        self._start_time = float(self._start_pts * self.stream.time_base)
+        
+        self._decoder = None
+        self._current = None  # Frame shown for the last requested time
+        self._pending = None  # Next decoded frame, not yet reached
+        self._array = None
+        self._array_frame = None
+    
+    def _restart(self, t: float):
+        """Seek to the keyframe at or before t and restart decoding"""
+        self.container.seek(self._start_pts + int(t / self.stream.time_base), stream=self.stream, backward=True)
+        self._decoder = self.container.decode(self.stream)
+        self._current = None
+        self._pending = next(self._decoder, None)
+    
+    def _decode_until(self, t: float):
+        """Decode forward until the next frame would be shown after t"""
+        target = t + self._start_time
+        while self._pending is not None and (self._current is None or self._pending.time <= target):
+            self._current = self._pending
+            self._pending = next(self._decoder, None)
+    
+    def get_frame(self, t: float) -> np.ndarray:
+        """Return the frame displayed at time t as an RGB array"""
+        if self._decoder is None or (self._current is not None and t + self._start_time < self._current.time):
+            self._restart(t)
+        self._decode_until(t)
+        
+        # A seek near the end can leave the decoder with nothing to yield
+        if self._current is None:
+            if self._array_frame is not None:
+                self._current = self._array_frame
+            else:
+                self._restart(max(self.duration - 1 / self.fps, 0))
+                self._decode_until(t)
+        if self._current is None:
+            raise RuntimeError(f"No frame could be decoded at t={t:.3f}s")
+        
+        # Only convert frames that are actually returned, and each of them once
+        if self._current is not self._array_frame:
+            self._array = self._current.to_ndarray(format='rgb24')
+            self._array_frame = self._current
+        
+        return self._array
+    
+    def close(self):
+        self.container.close()
+
+
+class PyAVVideoClip(VideoClip):
+    """Video clip decoded by PyAV instead of MoviePy's single-threaded FFmpeg pipe reader"""
+    
+    def __init__(self, path: str):
+        self.reader = PyAVVideoReader(path)
+        VideoClip.__init__(self, make_frame=self.reader.get_frame, duration=self.reader.duration)
+        self.fps = self.reader.fps
+        self.filename = path
+    
+    def close(self):
+        if self.reader:
+            self.reader.close()
+            self.reader = None
+        VideoClip.close(self)
+
+
 class VideoCreator:
     """Create videos using MoviePy with video background and audio"""
     
+    # H.264 encoders in order of preference; libx264 is the software fallback
+    ENCODER_PRIORITY = ['h264_nvenc', 'h264_qsv', 'h264_videotoolbox']
+    DEFAULT_ENCODER = 'libx264'
+    
+    # Preset and constant-quality flags per encoder ({crf} is filled from config.video_crf);
+    # VideoToolbox has neither presets nor a constant-quality mode, so it keeps the fixed bitrate
+    ENCODER_OPTIONS = {
+        'h264_nvenc': {'preset': 'p4', 'quality_params': ['-rc', 'vbr', '-cq', '{crf}', '-maxrate', '4000k', '-bufsize', '8000k']},
+        'h264_qsv': {'preset': 'veryfast', 'quality_params': ['-global_quality', '{crf}']},
+        'h264_videotoolbox': {'preset': None, 'quality_params': None},
+        'libx264': {'preset': 'veryfast', 'quality_params': ['-crf', '{crf}']},
+    }
+    FALLBACK_BITRATE = '2000k'
+    
+    # Hardware decoder to pair with the encoder for background video inputs;
+    # FFmpeg falls back to software decoding for codecs the GPU can't handle
+    ENCODER_HWACCEL = {'h264_nvenc': 'cuda'}
+    
+    # Broadly playable pixel format, with the index up front so playback can start before download finishes
+    OUTPUT_PARAMS = ['-pix_fmt', 'yuv420p', '-movflags', '+faststart']
+    
+    # Leading arguments for every FFmpeg render
+    FFMPEG_BASE_ARGS = ('ffmpeg', '-y', '-hide_banner', '-loglevel', 'error')
+    
+    # Encoder detected on first use, shared by all instances
+    _detected_encoder: Optional[str] = None
+    
     def __init__(self, config: Config):
         self.config = config
         self.target_duration = config.video_duration
         self.video_size = (config.video_width, config.video_height)
         self.fps = config.video_fps
+        self.video_codec = self._detect_encoder(config.video_crf)
+        self.video_crf = config.video_crf
+        self.use_pyav_decoder = config.use_pyav_decoder
+        self.threads: Optional[int] = None  # Encoder threads per render (None uses every core)
+        
+        # Size, frame rate and encoder are fixed per instance, so build the
+        # encoder settings and FFmpeg filter/arguments once
+        self._bitrate, self._quality_params = self._encoder_quality()
+        self._fit_filter = self._build_fit_filter()
+        self._video_encode_args = self._build_video_encode_args()
+        hwaccel = self.ENCODER_HWACCEL.get(self.video_codec)
+        self._video_decode_args = ['-hwaccel', hwaccel] if hwaccel else []
+    
+    @classmethod
+    def _detect_encoder(cls, crf: int = 23) -> str:
+        """Pick the first hardware H.264 encoder FFmpeg can actually use, else libx264"""
+        if cls._detected_encoder is not None:
+            return cls._detected_encoder
+        
+        encoder = cls.DEFAULT_ENCODER
+        try:
+            result = subprocess.run(
+                ['ffmpeg', '-hide_banner', '-encoders'],
+                capture_output=True, text=True, timeout=10
+            )
+            available = result.stdout if result.returncode == 0 else ''
+            
+            for candidate in cls.ENCODER_PRIORITY:
+                if candidate not in available:
+                    continue
+                
+                # Being compiled in doesn't mean the hardware is present, so encode one test frame
+                # with the encoder options the renders use, so a rejected option fails here instead
+                probe = subprocess.run(
+                    ['ffmpeg', '-hide_banner', '-loglevel', 'error',
+                     '-f', 'lavfi', '-i', 'color=c=black:s=256x256:d=0.1',
+                     '-frames:v', '1', *cls._encoder_args(candidate, crf), '-pix_fmt', 'yuv420p',
+                     '-f', 'null', '-'],
+                    capture_output=True, text=True, timeout=10
+                )
+                if probe.returncode == 0:
+                    encoder = candidate
+                    break
+        except (OSError, subprocess.SubprocessError):
+            pass
+        
+        cls._detected_encoder = encoder
+        return encoder
+    
+    @classmethod
+    def _encoder_args(cls, codec: str, crf: int) -> List[str]:
+        """FFmpeg codec, preset and rate-control arguments for an encoder"""
+        options = cls.ENCODER_OPTIONS[codec]
+        args = ['-c:v', codec]
+        if options['preset'] is not None:
+            args += ['-preset', options['preset']]
+        if options['quality_params'] is None:
+            return args + ['-b:v', cls.FALLBACK_BITRATE]
+        return args + [param.replace('{crf}', str(crf)) for param in options['quality_params']]
+    
+    def _encoder_quality(self) -> Tuple[Optional[str], List[str]]:
+        """Return (bitrate, ffmpeg_params) for the selected encoder's rate control"""
+        quality_params = self.ENCODER_OPTIONS[self.video_codec]['quality_params']
+        if quality_params is None:
+            return self.FALLBACK_BITRATE, list(self.OUTPUT_PARAMS)
+        
+        crf = str(self.video_crf)
+        return None, [param.replace('{crf}', crf) for param in quality_params] + self.OUTPUT_PARAMS
     
     def create_video(self, images: List[Dict[str, str]], audio_path: str, output_filename: str = None, is_custom_script: bool = False, videos: Optional[List[Dict[str, str]]] = None) -> str:
         """
@@ -37,30 +239,50 @@ class VideoCreator:
             raise ValueError(f"Audio file not found: {audio_path}")
         
         try:
-            # Load audio to get actual duration
-            audio_clip = AudioFileClip(audio_path)
+            # Read audio duration from the header; the MoviePy audio reader is only opened
+            # when ffprobe can't tell or the MoviePy render path needs the audio stream
+            audio_clip = None
+            audio_duration = self._probe_duration(audio_path)
+            if audio_duration is None:
+                audio_clip = AudioFileClip(audio_path)
+                audio_duration = audio_clip.duration
+            
             # For custom scripts, use full audio duration; for regular scripts, limit to target duration
-            actual_duration = audio_clip.duration if is_custom_script else min(audio_clip.duration, self.target_duration)
+            actual_duration = audio_duration if is_custom_script else min(audio_duration, self.target_duration)
+            
+            # Generate output filename
+            if output_filename is None:
+                timestamp = int(time.time())
+                output_filename = f"video_{timestamp}.mp4"
+            
+            output_path = os.path.join(self.config.output_dir, output_filename)
             
             # Create video background (videos prioritized over images)
             if videos and len(videos) > 0:
+                # Background videos are only scaled, padded and looped, which FFmpeg does without MoviePy
+                if self._render_video_background_ffmpeg(videos, audio_path, actual_duration, output_path):
+                    if audio_clip:
+                        audio_clip.close()
+                    return output_path
+                
                 video_clip = self._create_video_background(videos, actual_duration)
             else:
+                # Still images don't need MoviePy at all when FFmpeg can render them directly
+                if self._render_slideshow_ffmpeg(images, audio_path, actual_duration, output_path):
+                    if audio_clip:
+                        audio_clip.close()
+                    return output_path
+                
                 # Fallback to image slideshow
                 video_clip = self._create_image_slideshow(images, actual_duration)
             
             # Combine video and audio
+            if audio_clip is None:
+                audio_clip = AudioFileClip(audio_path)
             final_clip = video_clip.set_audio(audio_clip.subclip(0, actual_duration))
             
-            # Generate output filename
-            if output_filename is None:
-                timestamp = int(time.time())
-                output_filename = f"video_{timestamp}.mp4"
-            
-            output_path = os.path.join(self.config.output_dir, output_filename)
-            
             # Render video
-            self._render_video(final_clip, output_path)
+            self._render_video(final_clip, output_path, audio_path)
             
             # Cleanup after successful render
             audio_clip.close()
@@ -69,18 +291,47 @@ class VideoCreator:
             if hasattr(final_clip, 'close'):
                 final_clip.close()
             
-            print(f"🔍 DEBUG: Cleanup completed after successful render")
-            
             return output_path
             
         except Exception as e:
             self._handle_video_error(e)
     
+    def create_videos_batch(self, jobs: List[Dict[str, any]], max_workers: Optional[int] = None) -> List[str]:
+        """
+        Create several videos in parallel worker processes
+        
+        Args:
+            jobs: List of create_video keyword argument dictionaries (images, audio_path, output_filename, ...)
+            max_workers: Number of worker processes (default: a quarter of the CPU count)
+            
+        Returns:
+            Paths to created video files, in the same order as jobs
+        """
+        # The default filename is a per-second timestamp, so number jobs to keep parallel outputs apart
+        timestamp = int(time.time())
+        jobs = [
+            job if job.get('output_filename') else
+            {**job, 'output_filename': f"video_{timestamp}_{i}.mp4"}
+            for i, job in enumerate(jobs, 1)
+        ]
+        
+        if len(jobs) <= 1:
+            return [self.create_video(**job) for job in jobs]
+        
+        # Short encodes don't keep every core busy, so run a few at once and
+        # split the cores between them instead of letting each take them all
+        cpu_count = os.cpu_count() or 1
+        max_workers = max_workers or max(1, cpu_count // 4)
+        worker = copy.copy(self)
+        worker.threads = max(1, cpu_count // max_workers)
+        
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(worker.create_video, **job) for job in jobs]
+            return [future.result() for future in futures]
+    
     def _create_video_background(self, videos: List[Dict[str, str]], duration: float) -> VideoFileClip:
         """Create video background with looping/cutting to match audio duration"""
         try:
-            print(f"🔍 DEBUG: _create_video_background called with {len(videos)} videos, duration={duration}")
-            
             # Validate inputs
             if not videos:
                 raise ValueError("No videos provided")
@@ -90,20 +341,15 @@ class VideoCreator:
             
             # Collect all valid videos
             valid_videos = []
-            for i, video_info in enumerate(videos):
-                print(f"🔍 DEBUG: Checking video {i}: {video_info}")
+            for video_info in videos:
                 if 'local_path' in video_info and os.path.exists(video_info['local_path']):
                     valid_videos.append(video_info['local_path'])
-                    print(f"🔍 DEBUG: Added valid video path: {video_info['local_path']}")
             
             if not valid_videos:
                 raise RuntimeError("No valid video files found")
             
             # Create concatenated video from multiple videos
-            print(f"🔍 DEBUG: Creating concatenated video from {len(valid_videos)} videos")
             concatenated_clip = self._create_concatenated_video(valid_videos)
-            print(f"🔍 DEBUG: Concatenated clip: duration={concatenated_clip.duration}, size={concatenated_clip.size}")
-            print(f"🔍 DEBUG: Concatenated clip type: {type(concatenated_clip)}")
             
             # Validate concatenated clip
             if not concatenated_clip or concatenated_clip.duration <= 0:
@@ -114,34 +360,25 @@ class VideoCreator:
             # Adjust video duration to match audio by looping the concatenated video
             if concatenated_clip.duration >= duration:
                 # Concatenated video is longer than needed, cut it
-                print(f"🔍 DEBUG: Cutting concatenated video from {concatenated_clip.duration}s to {duration}s")
                 final_video = concatenated_clip.subclip(0, duration)
             else:
                 # Concatenated video is shorter than needed, loop it
-                print(f"🔍 DEBUG: Looping concatenated video from {concatenated_clip.duration}s to {duration}s")
                 final_video = self._loop_video(concatenated_clip, duration)
             
-            print(f"🔍 DEBUG: Final video: duration={final_video.duration}, type={type(final_video)}")
-            
             # Remove original audio from video (we'll use the generated audio)
             final_video = final_video.without_audio()
-            print(f"🔍 DEBUG: Audio removed, final video ready")
             
             # Don't close original clips here - they may be referenced by the final video
             # Cleanup will be handled later
-            print(f"🔍 DEBUG: Keeping original clips open for final video")
             
             return final_video
             
         except Exception as e:
-            print(f"🔍 DEBUG: Exception in _create_video_background: {e}")
             raise RuntimeError(f"Failed to create video background: {e}")
     
     def _resize_and_fit_video(self, video_clip: VideoFileClip) -> VideoFileClip:
         """Resize and fit video to target dimensions while maintaining aspect ratio"""
         try:
-            print(f"🔍 DEBUG: _resize_and_fit_video called with clip: {type(video_clip)}")
-            
             # Validate input
             if not video_clip:
                 raise ValueError("Invalid video clip provided")
@@ -152,7 +389,6 @@ class VideoCreator:
             # Get original dimensions
             orig_w, orig_h = video_clip.size
             target_w, target_h = self.video_size
-            print(f"🔍 DEBUG: Original size: {orig_w}x{orig_h}, Target size: {target_w}x{target_h}")
             
             if orig_w <= 0 or orig_h <= 0:
                 raise ValueError(f"Invalid video dimensions: {orig_w}x{orig_h}")
@@ -165,14 +401,12 @@ class VideoCreator:
             # Resize video
             new_w = int(orig_w * scale)
             new_h = int(orig_h * scale)
-            print(f"🔍 DEBUG: Calculated new size: {new_w}x{new_h}, scale: {scale}")
             
             # Ensure minimum dimensions
             if new_w <= 0 or new_h <= 0:
                 raise ValueError(f"Calculated dimensions too small: {new_w}x{new_h}")
             
             resized_clip = video_clip.resize((new_w, new_h))
-            print(f"🔍 DEBUG: Resized clip created: {type(resized_clip)}")
             
             # Validate resized clip
             if not resized_clip:
@@ -180,89 +414,49 @@ class VideoCreator:
             
             # If video doesn't fill the entire frame, add black background
             if new_w < target_w or new_h < target_h:
-                print(f"🔍 DEBUG: Video needs background - creating composite")
-                
-                # Create black background
-                background = ColorClip(size=self.video_size, color=(0, 0, 0))
-                background = background.set_duration(video_clip.duration)
-                print(f"🔍 DEBUG: Background created: {type(background)}, duration: {background.duration}")
-                
-                # Validate background
-                if not background:
-                    raise RuntimeError("Failed to create background clip")
-                
-                # Center the video on the background
-                x_offset = (target_w - new_w) // 2
-                y_offset = (target_h - new_h) // 2
-                print(f"🔍 DEBUG: Positioning video at offset: ({x_offset}, {y_offset})")
-                
-                resized_clip = resized_clip.set_position((x_offset, y_offset))
-                print(f"🔍 DEBUG: Positioned clip: {type(resized_clip)}")
-                
-                # Create composite clip with validation
+                # Paste each frame into a black canvas with numpy instead of compositing
+                # it over a solid background clip
                 try:
-                    print(f"🔍 DEBUG: Creating CompositeVideoClip with background and resized clip")
-                    final_clip = CompositeVideoClip([background, resized_clip])
-                    print(f"🔍 DEBUG: CompositeVideoClip created: {type(final_clip)}")
-                    
-                    # Check if the composite clip has the bg attribute
-                    if hasattr(final_clip, 'bg'):
-                        print(f"🔍 DEBUG: CompositeVideoClip.bg: {final_clip.bg}")
-                    else:
-                        print(f"🔍 DEBUG: CompositeVideoClip has no bg attribute!")
+                    final_clip = resized_clip.fl_image(self._make_frame_letterboxer())
                     
                     # Validate final clip
                     if not final_clip:
-                        raise RuntimeError("Failed to create composite video clip")
+                        raise RuntimeError("Failed to create letterboxed video clip")
                     
                     return final_clip
                 except Exception as e:
-                    print(f"🔍 DEBUG: Exception creating composite clip: {e}")
                     # Clean up on error
-                    if background:
-                        background.close()
                     if resized_clip:
                         resized_clip.close()
-                    raise RuntimeError(f"Failed to create composite clip: {e}")
-            else:
-                print(f"🔍 DEBUG: Video fits perfectly, no background needed")
+                    raise RuntimeError(f"Failed to letterbox clip: {e}")
             
             return resized_clip
             
         except Exception as e:
-            print(f"🔍 DEBUG: Exception in _resize_and_fit_video: {e}")
             raise RuntimeError(f"Failed to resize video: {e}")
     
     def _create_concatenated_video(self, video_paths: List[str]) -> VideoFileClip:
         """複数の動画を連結して1つの動画を作成"""
         processed_clips = []
         try:
-            print(f"🔍 DEBUG: _create_concatenated_video called with {len(video_paths)} videos")
-            
             if not video_paths:
                 raise ValueError("No video paths provided")
             
             # 各動画をロードしてリサイズ
-            for i, video_path in enumerate(video_paths):
-                print(f"🔍 DEBUG: Loading video {i+1}/{len(video_paths)}: {video_path}")
-                
+            for video_path in video_paths:
                 # 動画をロード
-                video_clip = VideoFileClip(video_path)
-                print(f"🔍 DEBUG: Loaded video {i+1}: duration={video_clip.duration}, size={video_clip.size}")
+                video_clip = self._load_video_clip(video_path)
                 
                 # 動画を検証
                 if not video_clip or video_clip.duration <= 0:
-                    print(f"🔍 DEBUG: Invalid video {i+1}, skipping")
                     video_clip.close()
                     continue
                 
                 # 動画をリサイズ
                 resized_clip = self._resize_and_fit_video(video_clip)
-                print(f"🔍 DEBUG: Resized video {i+1}: duration={resized_clip.duration}, type={type(resized_clip)}")
                 
                 # リサイズした動画を検証
                 if not resized_clip or resized_clip.duration <= 0:
-                    print(f"🔍 DEBUG: Failed to resize video {i+1}, skipping")
                     video_clip.close()
                     if resized_clip:
                         resized_clip.close()
@@ -271,7 +465,6 @@ class VideoCreator:
                 # 音声を除去（後で生成した音声を使用）
                 resized_clip = resized_clip.without_audio()
                 processed_clips.append(resized_clip)
-                print(f"🔍 DEBUG: Added processed video {i+1} to concatenation list")
             
             # 処理された動画が1つもない場合
             if not processed_clips:
@@ -279,18 +472,14 @@ class VideoCreator:
             
             # 動画が1つだけの場合
             if len(processed_clips) == 1:
-                print(f"🔍 DEBUG: Only one video available, returning it directly")
                 return processed_clips[0]
             
             # 複数の動画を連結
-            print(f"🔍 DEBUG: Concatenating {len(processed_clips)} videos")
             concatenated_clip = concatenate_videoclips(processed_clips, method='compose')
-            print(f"🔍 DEBUG: Concatenation complete: duration={concatenated_clip.duration}")
             
             return concatenated_clip
             
         except Exception as e:
-            print(f"🔍 DEBUG: Exception in _create_concatenated_video: {e}")
             # エラー時はクリップをクリーンアップ
             for clip in processed_clips:
                 try:
@@ -299,11 +488,16 @@ class VideoCreator:
                     pass
             raise RuntimeError(f"Failed to create concatenated video: {e}")
     
+    def _load_video_clip(self, video_path: str) -> VideoClip:
+        """Open a background video with PyAV when enabled and installed, otherwise with MoviePy"""
+        if self.use_pyav_decoder and PYAV_AVAILABLE:
+            return PyAVVideoClip(video_path)
+        
+        return VideoFileClip(video_path)
+    
     def _loop_video(self, video_clip: VideoFileClip, target_duration: float) -> VideoFileClip:
         """Loop video to match target duration"""
         try:
-            print(f"🔍 DEBUG: _loop_video called with duration={video_clip.duration}, target={target_duration}")
-            
             # Validate input
             if not video_clip or video_clip.duration <= 0:
                 raise ValueError("Invalid video clip provided")
@@ -313,172 +507,381 @@ class VideoCreator:
             
             # If video is already longer than target, just cut it
             if video_clip.duration >= target_duration:
-                print(f"🔍 DEBUG: Video is longer than target, cutting to {target_duration}s")
                 return video_clip.subclip(0, target_duration)
             
-            clips = []
-            current_duration = 0
-            
-            while current_duration < target_duration:
-                remaining_duration = target_duration - current_duration
-                
-                if remaining_duration >= video_clip.duration:
-                    # Add full video clip (use subclip to preserve reader)
-                    clip_copy = video_clip.subclip(0, video_clip.duration)
-                    clips.append(clip_copy)
-                    current_duration += video_clip.duration
-                    print(f"🔍 DEBUG: Added full clip subclip {len(clips)}, duration={clip_copy.duration}")
-                else:
-                    # Add partial clip to reach exact duration
-                    partial_clip = video_clip.subclip(0, remaining_duration)
-                    clips.append(partial_clip)
-                    current_duration += remaining_duration
-                    print(f"🔍 DEBUG: Added partial clip {len(clips)}, duration={partial_clip.duration}")
-            
-            # Ensure we have clips to concatenate
-            if not clips:
-                raise RuntimeError("No clips generated for looping")
-            
-            print(f"🔍 DEBUG: About to concatenate {len(clips)} clips")
-            
-            # Validate all clips before concatenation
-            for i, clip in enumerate(clips):
-                if not clip or not hasattr(clip, 'duration') or clip.duration <= 0:
-                    raise RuntimeError(f"Invalid clip at index {i}")
-                
-                print(f"🔍 DEBUG: Clip {i}: type={type(clip)}, duration={clip.duration}")
-                
-                # Check if this is a CompositeVideoClip and examine its bg
-                if hasattr(clip, 'bg'):
-                    print(f"🔍 DEBUG: Clip {i} has bg attribute: {clip.bg}")
-                    if clip.bg is None:
-                        print(f"🔍 DEBUG: ⚠️ WARNING: Clip {i} has None bg!")
-            
-            # Concatenate all clips with method='compose'
-            print(f"🔍 DEBUG: Concatenating clips with method='compose'")
-            looped_video = concatenate_videoclips(clips, method='compose')
-            print(f"🔍 DEBUG: Concatenated video: type={type(looped_video)}, duration={looped_video.duration}")
-            
-            # Check the final concatenated video for bg issues
-            if hasattr(looped_video, 'bg'):
-                print(f"🔍 DEBUG: Final looped video bg: {looped_video.bg}")
+            # Loop lazily (frames are read at t % duration) instead of concatenating subclip copies
+            looped_video = loop(video_clip, duration=target_duration)
             
             return looped_video
             
         except Exception as e:
-            print(f"🔍 DEBUG: Exception in _loop_video: {e}")
             raise RuntimeError(f"Failed to loop video: {e}")
     
     def _create_image_slideshow(self, images: List[Dict[str, str]], duration: float) -> VideoFileClip:
         """Create image slideshow with transitions"""
         try:
-            # Calculate duration per image
-            image_duration = duration / len(images)
             transition_duration = 0.5  # 0.5 seconds for fade transition
             
             clips = []
             
-            for i, image_info in enumerate(images):
+            # Collect existing images, keyed by real path so repeated images are loaded once
+            slides = []
+            unique_paths: Dict[str, str] = {}
+            for image_info in images:
                 image_path = image_info['local_path']
                 
                 if not os.path.exists(image_path):
                     print(f"Warning: Image not found: {image_path}")
                     continue
                 
-                # Create image clip
-                img_clip = ImageClip(image_path)
+                key = os.path.realpath(image_path)
+                unique_paths.setdefault(key, image_path)
+                slides.append(key)
+            
+            if not slides:
+                raise RuntimeError("No valid images found for slideshow")
+            
+            # Split the duration across the images that exist; the last one absorbs
+            # any rounding so the slideshow ends exactly on the target duration
+            image_duration = duration / len(slides)
+            last_duration = duration - image_duration * (len(slides) - 1)
+            
+            # Decode and resize in parallel (Pillow releases the GIL); clips are built below
+            # on this thread since MoviePy clip construction isn't thread-safe
+            if len(unique_paths) > 1:
+                with ThreadPoolExecutor(max_workers=min(len(unique_paths), os.cpu_count() or 1)) as pool:
+                    frames = list(pool.map(self._load_fitted_image, unique_paths.values()))
+            else:
+                frames = [self._load_fitted_image(path) for path in unique_paths.values()]
+            fitted_frames = dict(zip(unique_paths, frames))
+            
+            for i, key in enumerate(slides):
+                is_last = i == len(slides) - 1
                 
-                # Resize and fit to video dimensions
-                img_clip = self._resize_and_fit_image(img_clip)
+                # Create image clip from a frame already fitted to video dimensions
+                img_clip = ImageClip(fitted_frames[key])
                 
                 # Set duration
-                img_clip = img_clip.set_duration(image_duration)
+                img_clip = img_clip.set_duration(last_duration if is_last else image_duration)
                 
                 # Add fade transitions (except for first and last clips)
                 if i > 0:
                     img_clip = img_clip.fadein(transition_duration)
-                if i < len(images) - 1:
+                if not is_last:
                     img_clip = img_clip.fadeout(transition_duration)
                 
                 clips.append(img_clip)
             
-            if not clips:
-                raise RuntimeError("No valid images found for slideshow")
-            
-            # Concatenate all clips
-            final_clip = concatenate_videoclips(clips, method="compose")
-            
-            # Ensure exact duration
-            if final_clip.duration > duration:
-                final_clip = final_clip.subclip(0, duration)
-            elif final_clip.duration < duration:
-                # Extend last frame if needed
-                last_frame = clips[-1].to_ImageClip()
-                extension = last_frame.set_duration(duration - final_clip.duration)
-                final_clip = concatenate_videoclips([final_clip, extension])
+            # Concatenate all clips (every clip is a full-frame still and fades go to
+            # black, so plain chaining is enough and avoids per-frame compositing)
+            final_clip = concatenate_videoclips(clips, method="chain")
             
             return final_clip
             
         except Exception as e:
             raise RuntimeError(f"Failed to create image slideshow: {e}")
     
-    def _resize_and_fit_image(self, image_clip: ImageClip) -> ImageClip:
-        """Resize and fit image to video dimensions while maintaining aspect ratio"""
+    def _render_video_background_ffmpeg(self, videos: List[Dict[str, str]], audio_path: str, duration: float, output_path: str) -> bool:
+        """
+        Render background video(s) with audio directly through FFmpeg (scale, pad and loop)
+        
+        Returns:
+            True if the video was rendered, False if the MoviePy path should be used instead
+        """
+        video_paths = [
+            video_info['local_path'] for video_info in videos
+            if 'local_path' in video_info and os.path.exists(video_info['local_path'])
+        ]
+        if not video_paths:
+            return False
+        
+        # A single source already in the output format only needs remuxing, not re-encoding
+        if len(video_paths) == 1 and self._can_stream_copy(video_paths[0], duration):
+            cmd = [
+                *self.FFMPEG_BASE_ARGS,
+                '-t', f"{duration:.3f}", '-i', video_paths[0], '-i', audio_path,
+                '-map', '0:v:0', '-map', '1:a:0',
+                '-c:v', 'copy', *self._audio_args(audio_path),
+                '-shortest', '-movflags', '+faststart',
+                output_path
+            ]
+            if self._run_ffmpeg(cmd, output_path, "stream copy"):
+                return True
+        
+        cmd = list(self.FFMPEG_BASE_ARGS)
+        concat_list_path = None
+        
+        if len(video_paths) == 1:
+            source = video_paths[0]
+        else:
+            # Play the videos back to back through the concat demuxer, so the sequence is one
+            # input with one decoder and one fit filter, however often it has to repeat
+            with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False, encoding='utf-8') as f:
+                for path in video_paths:
+                    escaped_path = os.path.abspath(path).replace("'", "'\\''")
+                    f.write(f"file '{escaped_path}'\n")
+                concat_list_path = f.name
+            cmd += ['-f', 'concat', '-safe', '0']
+            source = concat_list_path
+        
+        # Loop at the demuxer; -t below cuts it to the audio duration
+        cmd += [*self._video_decode_args, '-stream_loop', '-1', '-i', source]
+        cmd += ['-i', audio_path, '-filter_complex', f"[0:v]{self._fit_filter}[v0]", '-map', '[v0]']
+        cmd += self._ffmpeg_output_args(1, audio_path, duration, output_path)
+        
         try:
-            # Get original dimensions
-            orig_w, orig_h = image_clip.size
-            target_w, target_h = self.video_size
-            
-            # Calculate scale factor to fit within target dimensions
-            scale_w = target_w / orig_w
-            scale_h = target_h / orig_h
-            scale = min(scale_w, scale_h)
-            
-            # Resize image
+            return self._run_ffmpeg(cmd, output_path, "background video")
+        finally:
+            if concat_list_path:
+                os.remove(concat_list_path)
+    
+    def _render_slideshow_ffmpeg(self, images: List[Dict[str, str]], audio_path: str, duration: float, output_path: str) -> bool:
+        """
+        Render still-image slideshow with audio directly through FFmpeg
+        
+        Returns:
+            True if the video was rendered, False if the MoviePy path should be used instead
+        """
+        image_paths = []
+        for image_info in images:
+            image_path = image_info['local_path']
+            if not os.path.exists(image_path):
+                print(f"Warning: Image not found: {image_path}")
+                continue
+            image_paths.append(image_path)
+        
+        if not image_paths:
+            raise RuntimeError("No valid images found for slideshow")
+        
+        image_duration = duration / len(image_paths)
+        transition_duration = 0.5  # Same fade length as the MoviePy slideshow
+        
+        cmd = list(self.FFMPEG_BASE_ARGS)
+        filters = []
+        for i, image_path in enumerate(image_paths):
+            cmd += ['-loop', '1', '-framerate', str(self.fps), '-t', f"{image_duration:.3f}", '-i', image_path]
+            
+            # Fit inside the frame with black bars, then fade to/from black between images
+            chain = f"[{i}:v]{self._fit_filter}"
+            if i > 0:
+                chain += f",fade=t=in:st=0:d={transition_duration}"
+            if i < len(image_paths) - 1:
+                chain += f",fade=t=out:st={image_duration - transition_duration:.3f}:d={transition_duration}"
+            filters.append(chain + f"[v{i}]")
+        
+        concat_inputs = ''.join(f"[v{i}]" for i in range(len(image_paths)))
+        filters.append(f"{concat_inputs}concat=n={len(image_paths)}:v=1:a=0[v]")
+        
+        cmd += ['-i', audio_path, '-filter_complex', ';'.join(filters), '-map', '[v]']
+        cmd += self._ffmpeg_output_args(len(image_paths), audio_path, duration, output_path)
+        
+        return self._run_ffmpeg(cmd, output_path, "slideshow")
+    
+    def _build_fit_filter(self) -> str:
+        """FFmpeg filter chain that fits a stream inside the video frame with black bars"""
+        target_w, target_h = self.video_size
+        return (
+            f"scale={target_w}:{target_h}:force_original_aspect_ratio=decrease,"
+            f"pad={target_w}:{target_h}:(ow-iw)/2:(oh-ih)/2:color=black,"
+            f"setsar=1,fps={self.fps},format=yuv420p"
+        )
+    
+    def _build_video_encode_args(self) -> List[str]:
+        """FFmpeg video encoder arguments for the selected encoder"""
+        return [*self._encoder_args(self.video_codec, self.video_crf), *self.OUTPUT_PARAMS, '-r', str(self.fps)]
+    
+    def _ffmpeg_output_args(self, audio_index: int, audio_path: str, duration: float, output_path: str) -> List[str]:
+        """Encoder, audio and duration arguments shared by the FFmpeg render paths"""
+        return [
+            '-map', f"{audio_index}:a",
+            *self._video_encode_args,
+            *self._audio_args(audio_path),
+            *(['-threads', str(self.threads)] if self.threads else []),
+            '-t', f"{duration:.3f}",
+            output_path
+        ]
+    
+    def _audio_args(self, audio_path: str) -> List[str]:
+        """Copy audio that is already AAC as-is, encode anything else to AAC"""
+        if audio_path.lower().endswith(('.m4a', '.aac')):
+            return ['-c:a', 'copy']
+        
+        return ['-c:a', 'aac', '-b:a', '128k']
+    
+    def _can_stream_copy(self, video_path: str, duration: float) -> bool:
+        """Check whether a video is H.264 at the output size and frame rate and long enough to use unchanged"""
+        try:
+            result = subprocess.run(
+                ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-select_streams', 'v:0',
+                 '-show_streams', '-show_format', video_path],
+                capture_output=True, text=True, timeout=30
+            )
+            info = json.loads(result.stdout)
+            stream = info['streams'][0]
+            num, den = (int(part) for part in stream['r_frame_rate'].split('/'))
+            source_duration = float(info['format']['duration'])
+        except (OSError, subprocess.SubprocessError, ValueError, KeyError, IndexError, ZeroDivisionError):
+            return False
+        
+        return (
+            stream.get('codec_name') == 'h264'
+            and stream.get('pix_fmt') == 'yuv420p'
+            and (stream.get('width'), stream.get('height')) == tuple(self.video_size)
+            and den > 0 and abs(num / den - self.fps) < 0.01
+            and source_duration >= duration
+        )
+    
+    def _run_ffmpeg(self, cmd: List[str], output_path: str, description: str) -> bool:
+        """Run an FFmpeg render, removing partial output and reporting False on failure"""
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True)
+        except OSError as e:
+            print(f"FFmpeg {description} unavailable, using fallback: {e}")
+            return False
+        
+        if result.returncode != 0 or not os.path.exists(output_path) or os.path.getsize(output_path) < 1000:
+            print(f"FFmpeg {description} failed, using fallback: {result.stderr.strip()}")
+            if os.path.exists(output_path):
+                try:
+                    os.remove(output_path)
+                except:
+                    pass
+            return False
+        
+        return True
+    
+    def _probe_duration(self, path: str) -> Optional[float]:
+        """Read a media file's duration with ffprobe, or None if it can't be determined"""
+        try:
+            result = subprocess.run(
+                ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+                 '-of', 'default=noprint_wrappers=1:nokey=1', path],
+                capture_output=True, text=True, timeout=30
+            )
+            duration = float(result.stdout.strip())
+        except (OSError, subprocess.SubprocessError, ValueError):
+            return None
+        
+        return duration if duration > 0 else None
+    
+    def _probe_video_info(self, video_path: str) -> Optional[Dict[str, any]]:
+        """Read duration, frame rate, size and audio presence with one ffprobe call, without decoding frames"""
+        try:
+            result = subprocess.run(
+                ['ffprobe', '-v', 'error', '-print_format', 'json', '-show_streams', '-show_format', video_path],
+                capture_output=True, text=True, timeout=30
+            )
+            info = json.loads(result.stdout)
+            streams = info['streams']
+            video_stream = next(stream for stream in streams if stream.get('codec_type') == 'video')
+            num, den = (int(part) for part in video_stream['r_frame_rate'].split('/'))
+            return {
+                'duration': float(info['format']['duration']),
+                'fps': num / den,
+                'size': (video_stream['width'], video_stream['height']),
+                'has_audio': any(stream.get('codec_type') == 'audio' for stream in streams)
+            }
+        except (OSError, subprocess.SubprocessError, ValueError, KeyError, StopIteration, ZeroDivisionError):
+            return None
+    
+    def _load_fitted_image(self, image_path: str) -> np.ndarray:
+        """Load image with Pillow, scaled to fit video dimensions (with OpenCV if installed) and letterboxed in black"""
+        target_w, target_h = self.video_size
+        
+        with Image.open(image_path) as image:
+            # Let JPEG decode at a reduced scale when the source is much larger
+            image.draft('RGB', self.video_size)
+            if image.mode != 'RGB':
+                image = image.convert('RGB')
+            
+            orig_w, orig_h = image.size
+            scale = min(target_w / orig_w, target_h / orig_h)
             new_w = int(orig_w * scale)
             new_h = int(orig_h * scale)
             
-            resized_clip = image_clip.resize((new_w, new_h))
-            
-            # If image doesn't fill the entire frame, add black background
-            if new_w < target_w or new_h < target_h:
-                # Create black background
-                background = ColorClip(size=self.video_size, color=(0, 0, 0))
-                
-                # Center the image on the background
-                x_offset = (target_w - new_w) // 2
-                y_offset = (target_h - new_h) // 2
-                
-                resized_clip = resized_clip.set_position((x_offset, y_offset))
-                final_clip = CompositeVideoClip([background, resized_clip])
-                
-                return final_clip
-            
-            return resized_clip
-            
-        except Exception as e:
-            raise RuntimeError(f"Failed to resize image: {e}")
+            # Resize once here instead of per frame inside MoviePy
+            if (new_w, new_h) == image.size:
+                frame = np.asarray(image)
+            elif OPENCV_AVAILABLE:
+                # Area averaging for shrinks, Lanczos for enlargements
+                interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LANCZOS4
+                frame = cv2.resize(np.asarray(image), (new_w, new_h), interpolation=interpolation)
+            else:
+                image = image.resize((new_w, new_h), Image.Resampling.LANCZOS, reducing_gap=3.0)
+                frame = np.asarray(image)
+        
+        return self._letterbox_frame(frame)
+    
+    def _letterbox_frame(self, frame: np.ndarray) -> np.ndarray:
+        """Center frame on a black canvas of the video dimensions"""
+        target_w, target_h = self.video_size
+        frame_h, frame_w = frame.shape[:2]
+        
+        if (frame_w, frame_h) == (target_w, target_h):
+            return frame
+        
+        canvas = np.zeros((target_h, target_w, 3), dtype=np.uint8)
+        x_offset = (target_w - frame_w) // 2
+        y_offset = (target_h - frame_h) // 2
+        canvas[y_offset:y_offset + frame_h, x_offset:x_offset + frame_w] = frame[:, :, :3]
+        
+        return canvas
     
-    def _render_video(self, clip: VideoFileClip, output_path: str):
+    def _make_frame_letterboxer(self) -> Callable[[np.ndarray], np.ndarray]:
+        """Letterbox function for one clip's frames that reuses a single black canvas
+        
+        Frames within a clip share one size, so the bars never change and only the picture
+        area is overwritten. Each frame is written out before the next is requested.
+        """
+        target_w, target_h = self.video_size
+        canvas = np.zeros((target_h, target_w, 3), dtype=np.uint8)
+        
+        def letterbox(frame: np.ndarray) -> np.ndarray:
+            frame_h, frame_w = frame.shape[:2]
+            if (frame_w, frame_h) == (target_w, target_h):
+                return frame
+            
+            x_offset = (target_w - frame_w) // 2
+            y_offset = (target_h - frame_h) // 2
+            canvas[y_offset:y_offset + frame_h, x_offset:x_offset + frame_w] = frame[:, :, :3]
+            return canvas
+        
+        return letterbox
+    
+    def _render_video(self, clip: VideoFileClip, output_path: str, audio_path: Optional[str] = None):
         """Render video to MP4 format"""
         try:
+            encoder_options = self.ENCODER_OPTIONS[self.video_codec]
+            
             # Video codec settings for good quality and compatibility
             codec_params = {
-                'codec': 'libx264',
+                'codec': self.video_codec,
                 'audio_codec': 'aac',
                 'fps': self.fps,
-                'bitrate': '2000k',  # 2 Mbps for good quality
-                'audio_bitrate': '128k'
+                'bitrate': self._bitrate,  # Only set when the encoder has no constant-quality mode
+                'audio_bitrate': '128k',
+                'ffmpeg_params': list(self._quality_params),
+                'threads': self.threads or os.cpu_count()
             }
+            # MoviePy always passes -preset, using its own default when none is given
+            if encoder_options['preset'] is not None:
+                codec_params['preset'] = encoder_options['preset']
+            
+            if audio_path and audio_path.lower().endswith(('.m4a', '.aac')):
+                # Audio is already AAC: mux the file as-is instead of decoding and
+                # re-encoding it, trimmed to the video length
+                audio_params = {'audio': audio_path}
+                codec_params['ffmpeg_params'] += ['-shortest']
+            else:
+                audio_params = {'temp_audiofile': 'temp-audio.m4a', 'remove_temp': True}
             
             # Render video with progress bar
             clip.write_videofile(
                 output_path,
                 **codec_params,
+                **audio_params,
                 verbose=False,
-                logger=None,  # Disable verbose logging
-                temp_audiofile='temp-audio.m4a',
-                remove_temp=True
+                logger=None  # Disable verbose logging
             )
             
             # Verify output file
@@ -519,16 +922,21 @@ class VideoCreator:
             if not os.path.exists(video_path):
                 return None
             
-            clip = VideoFileClip(video_path)
-            info = {
-                'duration': clip.duration,
-                'fps': clip.fps,
-                'size': clip.size,
-                'file_size': os.path.getsize(video_path),
-                'has_audio': clip.audio is not None
-            }
-            clip.close()
+            info = self._probe_video_info(video_path)
+            if info is None:
+                # ffprobe unavailable or unable to parse the file, so open it with MoviePy
+                clip = VideoFileClip(video_path)
+                try:
+                    info = {
+                        'duration': clip.duration,
+                        'fps': clip.fps,
+                        'size': clip.size,
+                        'has_audio': clip.audio is not None
+                    }
+                finally:
+                    clip.close()
             
+            info['file_size'] = os.path.getsize(video_path)
             return info
             
         except Exception as e:
@@ -546,23 +954,22 @@ class VideoCreator:
                     os.remove(temp_file)
             
             # Clean up any other temporary video files
-            for filename in os.listdir('.'):
-                if filename.startswith('TEMP_MPY_'):
-                    try:
-                        os.remove(filename)
-                    except:
-                        pass
+            with os.scandir('.') as entries:
+                for entry in entries:
+                    if entry.name.startswith('TEMP_MPY_') and entry.is_file(follow_symlinks=False):
+                        try:
+                            os.remove(entry.path)
+                        except:
+                            pass
             
             # Clean up temporary video files from temp directory
             try:
                 if os.path.exists(self.config.temp_dir):
-                    temp_video_files = [f for f in os.listdir(self.config.temp_dir) 
-                                      if f.startswith('video_') and f.endswith(('.mp4', '.mov', '.avi'))]
-                    
-                    for filename in temp_video_files:
-                        filepath = os.path.join(self.config.temp_dir, filename)
-                        if os.path.exists(filepath):
-                            os.remove(filepath)
+                    with os.scandir(self.config.temp_dir) as entries:
+                        for entry in entries:
+                            name = entry.name
+                            if name.startswith('video_') and name.endswith(VIDEO_EXTENSIONS) and entry.is_file(follow_symlinks=False):
+                                os.remove(entry.path)
             except Exception as e:
                 print(f"Warning: Failed to cleanup temp video files: {e}")
                         
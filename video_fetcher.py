@@ -5,16 +5,68 @@
 Pexels APIを使用してテーマに基づいた動画を取得します。
 """
 
+import copy
+import hashlib
 import os
-import requests
+import shutil
+import threading
 import time
-from typing import List, Dict, Optional
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Set
 from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from config import Config
 
+class _TokenBucket:
+    """スレッド間で共有するトークンバケット方式のレート制限"""
+    
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate  # 1秒あたりに補充されるトークン数
+        self.capacity = capacity  # 連続で許可するリクエスト数
+        self.tokens = float(capacity)
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """トークンを1つ消費（不足している場合は補充されるまで待機）"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            
+            # ロックを保持したまま待つので、待機中の他スレッドは順番に続く
+            if self.tokens < 1:
+                time.sleep((1 - self.tokens) / self.rate)
+                self.tokens = 1
+                self.last = time.monotonic()
+            
+            self.tokens -= 1
+    
+    def pause(self, seconds: float = 0):
+        """トークンを空にし、指定秒数が経過するまで補充を止める"""
+        with self.lock:
+            self.tokens = 0
+            self.last = time.monotonic() + seconds
+
 class VideoFetcher:
     """Pexels APIを使用して動画を取得するクラス"""
     
+    # 動画ファイルサイズの許容範囲（100KB〜100MB）
+    MIN_FILE_SIZE = 100000
+    MAX_FILE_SIZE = 100 * 1024 * 1024
+    
+    # 動画ファイルの品質の優先順位 (HD → SD → その他)
+    QUALITY_PRIORITY = ('hd', 'sd', 'hls')
+    
+    # 検索結果を再利用する秒数
+    SEARCH_CACHE_TTL = 3600
+    
+    # ダウンロード済み動画のキャッシュを再利用する秒数と、キャッシュ全体の上限サイズ
+    VIDEO_CACHE_TTL = 7 * 24 * 60 * 60
+    VIDEO_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+    
     def __init__(self, config: Config):
         self.config = config
         self.base_url = "https://api.pexels.com"
@@ -24,6 +76,20 @@ class VideoFetcher:
         }
         self.session = requests.Session()
         self.session.headers.update(self.headers)
+        
+        # API検索と動画ダウンロードで接続を再利用し、一時的なエラーは自動で再試行
+        # （再試行後も失敗した場合はレスポンスをそのまま返し、ステータス別のエラー処理に任せる）
+        retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504], raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        
+        # 並列の検索・ダウンロード全体でPexelsへのリクエストを毎秒5件まで（バーストは5件）に抑える
+        self._bucket = _TokenBucket(rate=5, capacity=5)
+        
+        # (検索語, 件数) ごとの検索結果と取得時刻（並列検索から参照されるのでロックで保護）
+        self._search_cache: Dict[tuple, tuple] = {}
+        self._search_cache_lock = threading.Lock()
     
     def fetch_videos(self, keywords: str, count: int = None) -> List[Dict[str, str]]:
         """
@@ -41,17 +107,12 @@ class VideoFetcher:
         
         try:
             search_terms = self._process_keywords(keywords)
-            videos = []
             
-            for term in search_terms:
-                if len(videos) >= count:
-                    break
-                    
-                term_videos = self._search_videos(term, count - len(videos))
-                videos.extend(term_videos)
-                
-                # Rate limiting - Pexels API制限に配慮
-                time.sleep(0.2)
+            # 検索語ごとの検索は独立しているので並列に実行し、検索語の順に結合する
+            # （検索語は最大3つなので、同時リクエスト数もPexels APIの制限内に収まる）
+            with ThreadPoolExecutor(max_workers=len(search_terms)) as executor:
+                results = executor.map(lambda term: self._search_videos(term, count), search_terms)
+                videos = [video for term_videos in results for video in term_videos][:count]
             
             # 十分な動画が取得できない場合のフォールバック
             if len(videos) < self.config.min_videos:
@@ -75,8 +136,8 @@ class VideoFetcher:
             # カンマ区切りで分割してクリーニング
             terms = [term.strip() for term in str(keywords).split(',')]
         
-        # 空の要素と重複を除去
-        terms = list(set([term for term in terms if term]))
+        # 空の要素と重複を除去（順序を保つので、同じキーワードからは毎回同じ検索語になる）
+        terms = list(dict.fromkeys(term for term in terms if term))
         
         # 最低1つの検索語を保証
         if not terms:
@@ -86,6 +147,14 @@ class VideoFetcher:
     
     def _search_videos(self, query: str, per_page: int) -> List[Dict[str, str]]:
         """Pexels APIで動画を検索"""
+        # 同じ検索は一定時間キャッシュから返す（呼び出し側が変更しても影響しないようコピーを渡す）
+        cache_key = (query, per_page)
+        with self._search_cache_lock:
+            cached = self._search_cache.get(cache_key)
+        if cached and time.monotonic() - cached[0] < self.SEARCH_CACHE_TTL:
+            return copy.deepcopy(cached[1])
+        
+        self._bucket.acquire()
         try:
             params = {
                 'query': query,
@@ -100,10 +169,14 @@ class VideoFetcher:
                 params=params,
                 timeout=15
             )
+            self._apply_rate_limit_headers(response)
             
             if response.status_code == 200:
                 data = response.json()
-                return self._extract_video_info(data)
+                videos = self._extract_video_info(data)
+                with self._search_cache_lock:
+                    self._search_cache[cache_key] = (time.monotonic(), copy.deepcopy(videos))
+                return videos
             elif response.status_code == 403:
                 raise RuntimeError("Pexels API access denied. Check your API key.")
             elif response.status_code == 429:
@@ -114,6 +187,23 @@ class VideoFetcher:
         except requests.exceptions.RequestException as e:
             raise RuntimeError(f"Network error while searching videos: {e}")
     
+    def _apply_rate_limit_headers(self, response: requests.Response):
+        """Pexelsのレート制限ヘッダーに応じて、以降のリクエストを減速させる"""
+        try:
+            if response.status_code == 429:
+                # 制限超過時はRetry-Afterの間、他のスレッドを含めてリクエストを止める
+                self._bucket.pause(float(response.headers.get('Retry-After', 1)))
+                return
+            
+            limit = int(response.headers['X-Ratelimit-Limit'])
+            remaining = int(response.headers['X-Ratelimit-Remaining'])
+        except (KeyError, TypeError, ValueError):
+            return
+        
+        # 残りが1割を切ったらバーストをやめ、補充レートでのみ送信する
+        if remaining < limit * 0.1:
+            self._bucket.pause()
+    
     def _extract_video_info(self, data: Dict) -> List[Dict[str, str]]:
         """API レスポンスから動画情報を抽出"""
         videos = []
@@ -135,19 +225,23 @@ class VideoFetcher:
                         'file_type': best_video.get('file_type', 'mp4'),
                         'photographer': video.get('user', {}).get('name', 'Unknown')
                     }
-                    videos.append(video_info)
+                    
+                    # 解像度や長さが条件外の動画はダウンロード対象にしない
+                    if self._validate_metadata(video_info):
+                        videos.append(video_info)
         
         return videos
     
     def _select_best_video_quality(self, video_files: List[Dict]) -> Optional[Dict]:
         """最適な品質の動画ファイルを選択"""
-        # 品質の優先順位 (HD → SD → その他)
-        quality_priority = ['hd', 'sd', 'hls']
+        # 品質ごとに最初のファイルを1回の走査でまとめる
+        files_by_quality = {}
+        for video_file in video_files:
+            files_by_quality.setdefault(video_file.get('quality'), video_file)
         
-        for quality in quality_priority:
-            for video_file in video_files:
-                if video_file.get('quality') == quality:
-                    return video_file
+        for quality in self.QUALITY_PRIORITY:
+            if quality in files_by_quality:
+                return files_by_quality[quality]
         
         # フォールバック: 最初の利用可能な動画ファイル
         return video_files[0] if video_files else None
@@ -155,72 +249,181 @@ class VideoFetcher:
     def _download_and_validate_videos(self, video_list: List[Dict[str, str]]) -> List[Dict[str, str]]:
         """動画をダウンロードして品質を検証"""
         downloaded_videos = []
+        downloads = []
+        pending = {}
         
-        for i, video_info in enumerate(video_list):
+        # 動画はURLごとにキャッシュし、過去の実行や他のキーワードで取得済みのものは再ダウンロードしない
+        cache_dir = os.path.join(self.config.temp_dir, 'video_cache')
+        os.makedirs(cache_dir, exist_ok=True)
+        
+        # 未取得の動画だけを並列にダウンロード（接続はセッションのプールで再利用）
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            for i, video_info in enumerate(video_list):
+                try:
+                    url = video_info['download_url']
+                    filename = f"video_{i+1}_{video_info['id']}.mp4"
+                    key = hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]
+                    cache_path = os.path.join(cache_dir, f"pexels_{key}.mp4")
+                    
+                    if cache_path not in pending and not self._touch_cached_video(cache_path):
+                        pending[cache_path] = executor.submit(self._download_video, url, cache_path)
+                    downloads.append((i, video_info, filename, cache_path))
+                    
+                except Exception as e:
+                    print(f"Warning: Failed to download video {i+1}: {e}")
+                    continue
+        
+        # 検証はディスク上の確認だけなので、元の順序を保って順に行う
+        for i, video_info, filename, cache_path in downloads:
             try:
-                filename = f"video_{i+1}_{video_info['id']}.mp4"
-                filepath = os.path.join(self.config.temp_dir, filename)
+                future = pending.get(cache_path)
+                if future is not None and not future.result():
+                    continue
                 
-                # 動画をダウンロード
-                if self._download_video(video_info['download_url'], filepath):
-                    # 動画を検証
-                    if self._validate_video(filepath, video_info):
-                        video_info['local_path'] = filepath
-                        video_info['filename'] = filename
-                        downloaded_videos.append(video_info)
-                    else:
-                        # 無効な動画ファイルを削除
-                        if os.path.exists(filepath):
-                            os.remove(filepath)
+                # 動画を検証
+                if self._validate_file(cache_path):
+                    # 後続処理はこれまで通り一時ディレクトリ内のファイル名で扱う
+                    filepath = self._link_cached_video(cache_path, os.path.join(self.config.temp_dir, filename))
+                    video_info['local_path'] = filepath
+                    video_info['filename'] = os.path.basename(filepath)
+                    downloaded_videos.append(video_info)
+                else:
+                    # 無効な動画ファイルを削除
+                    if os.path.exists(cache_path):
+                        os.remove(cache_path)
                 
             except Exception as e:
                 print(f"Warning: Failed to download video {i+1}: {e}")
                 continue
         
+        # 新しく取得した分だけキャッシュが増えるので、今回使う動画以外から上限まで削る（走査は1回だけ）
+        if pending:
+            self._evict_video_cache(cache_dir, keep={path for _, _, _, path in downloads})
+        
         if len(downloaded_videos) == 0:
             raise RuntimeError("No valid videos could be downloaded")
         
         return downloaded_videos
     
+    def _touch_cached_video(self, cache_path: str) -> bool:
+        """キャッシュ済みで期限内の動画があれば、LRU用に最終利用時刻(atime)を更新してTrueを返す"""
+        try:
+            stat = os.stat(cache_path)
+            if time.time() - stat.st_mtime > self.VIDEO_CACHE_TTL:
+                return False
+            # mtimeはダウンロード時刻のまま残し、有効期限の判定に使う
+            os.utime(cache_path, (time.time(), stat.st_mtime))
+            return True
+        except OSError:
+            return False
+    
+    def _evict_video_cache(self, cache_dir: str, keep: Set[str] = frozenset()):
+        """期限切れの動画を削除し、残りは最終利用が古い順にVIDEO_CACHE_MAX_BYTES以下になるまで削除"""
+        now = time.time()
+        entries = []
+        total_size = 0
+        try:
+            with os.scandir(cache_dir) as it:
+                for entry in it:
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    stat = entry.stat(follow_symlinks=False)
+                    expired = now - stat.st_mtime > self.VIDEO_CACHE_TTL
+                    # 書き込み中の一時ファイルは、異常終了で残った古いものだけを対象にする
+                    if entry.name.endswith('.part') and not expired:
+                        continue
+                    total_size += stat.st_size
+                    if entry.path not in keep:
+                        entries.append((0.0 if expired else stat.st_atime, stat.st_size, entry.path))
+        except OSError as e:
+            print(f"Warning: Failed to scan video cache: {e}")
+            return
+        
+        for last_used, size, path in sorted(entries):
+            if last_used and total_size <= self.VIDEO_CACHE_MAX_BYTES:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
+    
+    def _link_cached_video(self, cache_path: str, filepath: str) -> str:
+        """キャッシュ済み動画を一時ディレクトリにハードリンク（作れない場合はキャッシュのパスを返す）"""
+        try:
+            if os.path.lexists(filepath):
+                os.remove(filepath)
+            os.link(cache_path, filepath)
+            return filepath
+        except OSError:
+            return cache_path
+    
     def _download_video(self, url: str, filepath: str) -> bool:
         """単一の動画をダウンロード"""
+        # 途中で失敗した不完全なファイルがキャッシュとして残らないよう、別名で書いてから置き換える
+        # （同じtemp_dirを使う他のプロセス・スレッドと衝突しないよう、名前にPIDとスレッドIDを含める）
+        partial_path = f"{filepath}.{os.getpid()}.{threading.get_ident()}.part"
+        self._bucket.acquire()
         try:
-            response = requests.get(url, stream=True, timeout=60)
-            response.raise_for_status()
-            
-            with open(filepath, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            # CDNへのリクエストにはAPIキーを送らない
+            # （withで閉じることで、失敗時も接続がプールに戻る）
+            with self.session.get(url, stream=True, timeout=60, headers={"Authorization": None}) as response:
+                response.raise_for_status()
+                
+                # 上限を超える動画は本文を読む前に中止
+                expected_size = int(response.headers.get('Content-Length') or 0)
+                if expected_size > self.MAX_FILE_SIZE:
+                    print(f"Skipping video larger than {self.MAX_FILE_SIZE // (1024 * 1024)}MB: {url}")
+                    return False
+                
+                with open(partial_path, 'wb') as f:
+                    # サイズが分かる場合は先に領域を確保して断片化を抑える（圧縮転送時はサイズが変わるので除く）
+                    if expected_size and not response.headers.get('Content-Encoding') and hasattr(os, 'posix_fallocate'):
+                        try:
+                            os.posix_fallocate(f.fileno(), 0, expected_size)
+                        except OSError:
+                            pass
+                    
+                    # 1MiB単位でソケットから直接ファイルへコピー
+                    response.raw.decode_content = True
+                    shutil.copyfileobj(response.raw, f, length=1024 * 1024)
+                    
+                    # 確保したサイズより短く終わった場合に備えて実際のサイズに揃える
+                    f.truncate()
+                os.replace(partial_path, filepath)
             
             return True
             
         except Exception as e:
             print(f"Failed to download video from {url}: {e}")
+            try:
+                os.remove(partial_path)
+            except OSError:
+                pass
             return False
     
-    def _validate_video(self, filepath: str, video_info: Dict) -> bool:
-        """ダウンロードした動画の品質と形式を検証"""
+    def _validate_metadata(self, video_info: Dict) -> bool:
+        """APIの動画情報で解像度と長さを検証（ダウンロード前に実行）"""
+        duration = video_info.get('duration', 0)
+        width = video_info.get('width', 0)
+        height = video_info.get('height', 0)
+        
+        # 最小解像度チェック
+        if width < 640 or height < 360:
+            return False
+        
+        # 時間チェック (5秒〜120秒)
+        if duration < 5 or duration > 120:
+            return False
+        
+        return True
+    
+    def _validate_file(self, filepath: str) -> bool:
+        """ダウンロードした動画ファイルのサイズと形式を検証"""
         try:
             # ファイルサイズチェック
             file_size = os.path.getsize(filepath)
-            if file_size < 100000:  # 100KB minimum
-                return False
-            
-            # 最大ファイルサイズチェック (100MB)
-            if file_size > 100 * 1024 * 1024:
-                return False
-            
-            # 動画情報の基本チェック
-            duration = video_info.get('duration', 0)
-            width = video_info.get('width', 0)
-            height = video_info.get('height', 0)
-            
-            # 最小解像度チェック
-            if width < 640 or height < 360:
-                return False
-            
-            # 時間チェック (5秒〜120秒)
-            if duration < 5 or duration > 120:
+            if file_size < self.MIN_FILE_SIZE or file_size > self.MAX_FILE_SIZE:
                 return False
             
             # ファイル拡張子チェック
@@ -248,13 +451,14 @@ class VideoFetcher:
     def cleanup_temp_videos(self):
         """一時動画ファイルをクリーンアップ"""
         try:
-            temp_files = [f for f in os.listdir(self.config.temp_dir) 
-                         if f.startswith('video_') and f.endswith(('.mp4', '.mov', '.avi'))]
-            
-            for filename in temp_files:
-                filepath = os.path.join(self.config.temp_dir, filename)
-                if os.path.exists(filepath):
-                    os.remove(filepath)
+            with os.scandir(self.config.temp_dir) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if name.startswith('video_') and name.endswith(('.mp4', '.mov', '.avi')) and entry.is_file(follow_symlinks=False):
+                        try:
+                            os.remove(entry.path)
+                        except FileNotFoundError:
+                            pass
                     
         except Exception as e:
             print(f"Warning: Failed to cleanup temp videos: {e}")
@@ -1,20 +1,89 @@
+import copy
+import io
 import os
 import requests
+import hashlib
 import json
+import random
+import threading
 import wave
 import time
 import re
-from typing import Dict, List, Optional
+import shutil
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from typing import Dict, List, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from config import Config
 
+# Pauses after sentence endings (for better pacing) and readings for special characters
+_TEXT_REPLACEMENTS = {
+    '。': '。、',
+    '！': '！、',
+    '？': '？、',
+    '・': 'と',
+    '～': 'から',
+    '&': 'アンド',
+    '%': 'パーセント',
+    '…': '。'
+}
+_TEXT_REPLACEMENT_RE = re.compile('|'.join(re.escape(key) for key in _TEXT_REPLACEMENTS))
+
+# Sentences and clauses for chunking long text, each with its ending mark (a trailing piece may have none)
+_SENTENCE_RE = re.compile(r'[^。！？]*[。！？]|[^。！？]+')
+_CLAUSE_RE = re.compile(r'[^、，]*[、，]|[^、，]+')
+# Boundaries after a sentence ending and the pause _preprocess_text added after it
+_SENTENCE_BOUNDARY_RE = re.compile(r'(?<=[。！？]、)')
+
+# Canonical 44-byte PCM WAV header (RIFF, fmt and data chunks), as written by VOICEVOX
+_WAV_HEADER = struct.Struct('<4sI4s4sIHHIIHH4sI')
+
+class _JitteredRetry(Retry):
+    """Retry whose exponential backoff is spread by +/-20% so parallel requests do not retry in lockstep"""
+    
+    def get_backoff_time(self) -> float:
+        return super().get_backoff_time() * random.uniform(0.8, 1.2)
+
 class VoiceGenerator:
     """Generate voice audio using VOICEVOX API"""
     
+    # Seconds that cached audio queries and synthesized audio are reused
+    CACHE_TTL = 24 * 60 * 60
+    # Total size of the cache directory before least recently used entries are evicted
+    CACHE_MAX_BYTES = 500 * 1024 * 1024
+    # Seconds that the /speakers list is reused before asking VOICEVOX again
+    SPEAKERS_CACHE_TTL = 30
+    
     def __init__(self, config: Config):
         self.config = config
         self.base_url = config.voicevox_server_url.rstrip('/')
         self.session = requests.Session()
-        self.session.timeout = 600
+        
+        # Keep connections to VOICEVOX open for the parallel chunk and sentence requests, and
+        # retry briefly if the server is momentarily busy (timeouts are passed per request).
+        # /audio_query and /synthesis have no side effects, so their POSTs are safe to retry.
+        # Read timeouts are not retried: the engine keeps working on the abandoned request,
+        # and resending a 600-second synthesis would only pile more work onto a busy server.
+        retry = _JitteredRetry(
+            total=2, read=0, backoff_factor=0.5, status_forcelist=[502, 503, 504],
+            allowed_methods=frozenset({'GET', 'POST'}), raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=config.voicevox_max_workers, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        # Chunk workers each run their own sentence pool, so the requests actually sent to
+        # the engine are limited here, across all pools, to voicevox_max_workers at a time
+        self._request_slots = threading.BoundedSemaphore(config.voicevox_max_workers)
+        
+        # (time fetched, speakers) from the last successful /speakers call
+        self._speakers_cache: Optional[Tuple[float, List[Dict]]] = None
+        
+        # Cache size found by the last eviction scan plus bytes written since (None until the first scan)
+        self._cache_lock = threading.Lock()
+        self._cache_size: Optional[int] = None
     
     def generate_voice(self, script: str, output_filename: str = None, is_custom_script: bool = False) -> str:
         """
@@ -35,11 +104,16 @@ class VoiceGenerator:
             # Preprocess text
             processed_text = self._preprocess_text(script)
             
-            # Generate audio query
-            audio_query = self._create_audio_query(processed_text)
-            
-            # Synthesize voice
-            audio_data = self._synthesize_voice(audio_query, is_custom_script)
+            sentences = self._split_sentences(processed_text)
+            if len(sentences) > 1:
+                # Analyze and synthesize sentences concurrently instead of as one long request
+                audio_data = self._synthesize_sentences(sentences, is_custom_script)
+            else:
+                # Generate audio query
+                audio_query = self._create_audio_query(processed_text)
+                
+                # Synthesize voice
+                audio_data = self._synthesize_voice(audio_query, is_custom_script)
             
             # Save audio file
             if output_filename is None:
@@ -49,8 +123,13 @@ class VoiceGenerator:
             output_path = os.path.join(self.config.temp_dir, output_filename)
             self._save_audio_file(audio_data, output_path)
             
-            # Validate audio duration (skip for custom scripts)
-            duration = self._get_audio_duration(output_path)
+            # Validate audio duration (skip for custom scripts), from the header already in memory
+            header = self._parse_wav_header(audio_data[:_WAV_HEADER.size])
+            if header is not None:
+                sample_rate, frames, _ = header
+                duration = frames / sample_rate
+            else:
+                duration = self._get_audio_duration(output_path)
             if not is_custom_script and duration > 35:  # Allow 5 seconds buffer for 30-second target
                 print(f"Warning: Audio duration ({duration:.1f}s) exceeds 30-second target")
             
@@ -79,15 +158,19 @@ class VoiceGenerator:
             text_chunks = self._split_text_for_voice(script, max_chunk_chars)
             print(f"Split text into {len(text_chunks)} chunks")
             
-            # Generate audio for each chunk
-            temp_audio_files = []
-            for i, chunk in enumerate(text_chunks):
-                print(f"Generating audio for chunk {i + 1}/{len(text_chunks)}")
-                
-                # Generate audio for this chunk
-                chunk_filename = f"chunk_{i}_{int(time.time())}.wav"
-                chunk_path = self.generate_voice(chunk, chunk_filename, is_custom_script=True)
-                temp_audio_files.append(chunk_path)
+            # Generate audio once per distinct chunk, concurrently; repeated chunks reuse the same file
+            unique_chunks = list(dict.fromkeys(text_chunks))
+            chunk_timestamp = int(time.time())
+            
+            def generate_chunk(indexed_chunk: Tuple[int, str]) -> str:
+                i, chunk = indexed_chunk
+                print(f"Generating audio for chunk {i + 1}/{len(unique_chunks)}")
+                return self.generate_voice(chunk, f"chunk_{i}_{chunk_timestamp}.wav", is_custom_script=True)
+            
+            max_workers = min(self.config.voicevox_max_workers, len(unique_chunks))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                chunk_paths = dict(zip(unique_chunks, executor.map(generate_chunk, enumerate(unique_chunks))))
+            temp_audio_files = [chunk_paths[chunk] for chunk in text_chunks]
             
             # Combine all audio files
             if output_filename is None:
@@ -98,7 +181,7 @@ class VoiceGenerator:
             combined_path = self._combine_audio_files(temp_audio_files, output_path)
             
             # Clean up temporary chunk files
-            for temp_file in temp_audio_files:
+            for temp_file in chunk_paths.values():
                 try:
                     if os.path.exists(temp_file):
                         os.remove(temp_file)
@@ -116,27 +199,9 @@ class VoiceGenerator:
     
     def _preprocess_text(self, text: str) -> str:
         """Preprocess text for better voice synthesis"""
-        # Remove extra whitespace
+        # Remove extra whitespace, then add pauses and replace special characters in one pass
         processed = ' '.join(text.split())
-        
-        # Add pauses for better pacing
-        processed = processed.replace('。', '。、')
-        processed = processed.replace('！', '！、')
-        processed = processed.replace('？', '？、')
-        
-        # Handle special characters
-        replacements = {
-            '・': 'と',
-            '～': 'から',
-            '&': 'アンド',
-            '%': 'パーセント',
-            '…': '。'
-        }
-        
-        for old, new in replacements.items():
-            processed = processed.replace(old, new)
-        
-        return processed.strip()
+        return _TEXT_REPLACEMENT_RE.sub(lambda match: _TEXT_REPLACEMENTS[match.group(0)], processed).strip()
     
     def _split_text_for_voice(self, text: str, max_chars: int = 200) -> List[str]:
         """Split text into smaller chunks for voice generation"""
@@ -146,36 +211,14 @@ class VoiceGenerator:
         chunks = []
         current_chunk = ""
         
-        # Split by natural break points
-        sentences = re.split(r'([。！？])', text)
-        
-        for i in range(0, len(sentences), 2):
-            if i + 1 < len(sentences):
-                sentence = sentences[i] + sentences[i + 1]
-            else:
-                sentence = sentences[i]
-            
-            if len(current_chunk) + len(sentence) <= max_chars:
-                current_chunk += sentence
-            else:
-                if current_chunk:
+        # One pass over the sentences; a sentence too long for a chunk on its own goes clause by clause
+        for sentence in _SENTENCE_RE.findall(text):
+            pieces = _CLAUSE_RE.findall(sentence) if len(sentence) > max_chars else (sentence,)
+            for piece in pieces:
+                if current_chunk and len(current_chunk) + len(piece) > max_chars:
                     chunks.append(current_chunk.strip())
-                    current_chunk = sentence
-                else:
-                    # If single sentence is too long, split by commas
-                    comma_parts = re.split(r'([、，])', sentence)
-                    for j in range(0, len(comma_parts), 2):
-                        if j + 1 < len(comma_parts):
-                            part = comma_parts[j] + comma_parts[j + 1]
-                        else:
-                            part = comma_parts[j]
-                        
-                        if len(current_chunk) + len(part) <= max_chars:
-                            current_chunk += part
-                        else:
-                            if current_chunk:
-                                chunks.append(current_chunk.strip())
-                            current_chunk = part
+                    current_chunk = ""
+                current_chunk += piece
         
         if current_chunk:
             chunks.append(current_chunk.strip())
@@ -184,20 +227,29 @@ class VoiceGenerator:
     
     def _create_audio_query(self, text: str) -> Dict:
         """Create audio query using VOICEVOX API"""
+        # The same text and speaker always analyze to the same query
+        cache_path = self._cache_path('query', text, '.json')
+        cached = self._read_cache(cache_path)
+        if cached is not None:
+            return json.loads(cached)
+        
         try:
             params = {
                 'text': text,
                 'speaker': self.config.speaker_id
             }
             
-            response = self.session.post(
-                f"{self.base_url}/audio_query",
-                params=params,
-                timeout=300
-            )
+            with self._request_slots:
+                response = self.session.post(
+                    f"{self.base_url}/audio_query",
+                    params=params,
+                    timeout=300
+                )
             
             if response.status_code == 200:
-                return response.json()
+                audio_query = response.json()
+                self._write_cache(cache_path, json.dumps(audio_query, ensure_ascii=False).encode('utf-8'))
+                return audio_query
             elif response.status_code == 400:
                 raise RuntimeError("Invalid text or speaker ID")
             elif response.status_code == 503:
@@ -217,23 +269,28 @@ class VoiceGenerator:
         try:
             # Adjust speaking speed to fit 30-second target (skip for custom scripts)
             if not is_custom_script:
-                estimated_duration = self._estimate_duration(audio_query)
-                if estimated_duration > 30:
-                    speed_factor = min(estimated_duration / 28, 2.0)  # Max 2x speed
-                    audio_query['speedScale'] = audio_query.get('speedScale', 1.0) * speed_factor
+                self._fit_speed_to_target([audio_query])
+            
+            # Keyed on the final query, so speed adjustments get their own entry
+            cache_path = self._cache_path('synthesis', json.dumps(audio_query, sort_keys=True), '.wav')
+            cached = self._read_cache(cache_path)
+            if cached is not None:
+                return cached
             
             params = {
                 'speaker': self.config.speaker_id
             }
             
-            response = self.session.post(
-                f"{self.base_url}/synthesis",
-                params=params,
-                json=audio_query,
-                timeout=600
-            )
+            with self._request_slots:
+                response = self.session.post(
+                    f"{self.base_url}/synthesis",
+                    params=params,
+                    json=audio_query,
+                    timeout=600
+                )
             
             if response.status_code == 200:
+                self._write_cache(cache_path, response.content)
                 return response.content
             else:
                 raise RuntimeError(f"Voice synthesis failed: {response.status_code}")
@@ -241,6 +298,122 @@ class VoiceGenerator:
         except requests.exceptions.RequestException as e:
             raise RuntimeError(f"Voice synthesis network error: {e}")
     
+    def _split_sentences(self, text: str) -> List[str]:
+        """Split preprocessed text after each sentence-ending mark (and the pause added after it)"""
+        return [sentence for sentence in _SENTENCE_BOUNDARY_RE.split(text) if sentence.strip()]
+    
+    def _synthesize_sentences(self, sentences: List[str], is_custom_script: bool = False) -> bytes:
+        """Create queries and synthesize each sentence in parallel, then join the audio in order"""
+        with ThreadPoolExecutor(max_workers=min(self.config.voicevox_max_workers, len(sentences))) as executor:
+            audio_queries = list(executor.map(self._create_audio_query, sentences))
+            
+            # Keep the leading and trailing silence only at the ends of the script; between sentences
+            # the pause after each sentence end already separates them
+            for audio_query in audio_queries[1:]:
+                audio_query['prePhonemeLength'] = 0
+            for audio_query in audio_queries[:-1]:
+                audio_query['postPhonemeLength'] = 0
+            
+            # Fit the whole script to the target, not each sentence on its own
+            if not is_custom_script:
+                self._fit_speed_to_target(audio_queries)
+            
+            audio_chunks = list(executor.map(
+                lambda audio_query: self._synthesize_voice(audio_query, is_custom_script=True),
+                audio_queries
+            ))
+        
+        return self._join_wav_data(audio_chunks)
+    
+    def _fit_speed_to_target(self, audio_queries: List[Dict]):
+        """Speed up the queries together when their estimated total exceeds 30 seconds"""
+        estimated_duration = sum(self._estimate_duration(audio_query) for audio_query in audio_queries)
+        if estimated_duration > 30:
+            speed_factor = min(estimated_duration / 28, 2.0)  # Max 2x speed
+            for audio_query in audio_queries:
+                audio_query['speedScale'] = audio_query.get('speedScale', 1.0) * speed_factor
+    
+    def _join_wav_data(self, audio_chunks: List[bytes]) -> bytes:
+        """Concatenate WAV payloads that share one format into a single WAV"""
+        output = io.BytesIO()
+        with wave.open(io.BytesIO(audio_chunks[0]), 'rb') as first_wav:
+            params = first_wav.getparams()
+        
+        with wave.open(output, 'wb') as output_wav:
+            output_wav.setparams(params)
+            for audio_chunk in audio_chunks:
+                with wave.open(io.BytesIO(audio_chunk), 'rb') as input_wav:
+                    if (input_wav.getframerate(), input_wav.getsampwidth(), input_wav.getnchannels()) != \
+                            (params.framerate, params.sampwidth, params.nchannels):
+                        raise RuntimeError("Synthesized sentences have incompatible audio formats")
+                    output_wav.writeframes(input_wav.readframes(input_wav.getnframes()))
+        
+        return output.getvalue()
+    
+    def _cache_path(self, kind: str, key_text: str, extension: str) -> str:
+        """Path of the cached VOICEVOX response for this text and speaker"""
+        key = hashlib.blake2b(f"{key_text}|{self.config.speaker_id}".encode('utf-8'), digest_size=16).hexdigest()
+        return os.path.join(self.config.temp_dir, 'voicevox_cache', f"{kind}_{key}{extension}")
+    
+    def _read_cache(self, path: str) -> Optional[bytes]:
+        """Return cached bytes, or None if missing or older than CACHE_TTL"""
+        try:
+            stat = os.stat(path)
+            if time.time() - stat.st_mtime > self.CACHE_TTL:
+                return None
+            with open(path, 'rb') as f:
+                data = f.read()
+            # Record the hit in atime for LRU eviction; mtime stays the write time for the TTL
+            os.utime(path, (time.time(), stat.st_mtime))
+            return data
+        except OSError:
+            return None
+    
+    def _write_cache(self, path: str, data: bytes):
+        """Write a cache entry via a temp file and rename, so readers never see a partial file"""
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+            
+            # Scan the directory only when the running total says the cache may be over its limit
+            with self._cache_lock:
+                if self._cache_size is not None:
+                    self._cache_size += len(data)
+                if self._cache_size is None or self._cache_size > self.CACHE_MAX_BYTES:
+                    self._cache_size = self._evict_cache(os.path.dirname(path))
+        except OSError as e:
+            print(f"Warning: Failed to write VOICEVOX cache: {e}")
+    
+    def _evict_cache(self, cache_dir: str) -> int:
+        """Remove expired entries, then least recently used ones until the cache fits CACHE_MAX_BYTES; return the size left"""
+        now = time.time()
+        entries = []
+        total_size = 0
+        with os.scandir(cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith('.tmp') or not entry.is_file(follow_symlinks=False):
+                    continue
+                stat = entry.stat(follow_symlinks=False)
+                if now - stat.st_mtime > self.CACHE_TTL:
+                    entries.append((0.0, stat.st_size, entry.path))
+                else:
+                    entries.append((stat.st_atime, stat.st_size, entry.path))
+                total_size += stat.st_size
+        
+        for last_used, size, path in sorted(entries):
+            if last_used and total_size <= self.CACHE_MAX_BYTES:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
+        
+        return total_size
+    
     def _estimate_duration(self, audio_query: Dict) -> float:
         """Estimate audio duration from audio query"""
         try:
@@ -268,7 +441,13 @@ class VoiceGenerator:
             if not os.path.exists(output_path):
                 raise RuntimeError("Failed to create audio file")
             
-            # Basic WAV file validation
+            # Basic WAV file validation, from the in-memory header when it's the canonical layout
+            header = self._parse_wav_header(audio_data[:_WAV_HEADER.size])
+            if header is not None:
+                if header[1] == 0:
+                    raise RuntimeError("Generated audio file is empty")
+                return
+            
             try:
                 with wave.open(output_path, 'rb') as wav_file:
                     if wav_file.getnframes() == 0:
@@ -279,8 +458,34 @@ class VoiceGenerator:
         except IOError as e:
             raise RuntimeError(f"Failed to save audio file: {e}")
     
+    def _parse_wav_header(self, header: bytes) -> Optional[Tuple[int, int, int]]:
+        """
+        Read (sample_rate, num_frames, channels) from a canonical PCM WAV header
+        
+        Returns None for other layouts (extra chunks, non-PCM, not a WAV), which are left to the wave module
+        """
+        if len(header) < _WAV_HEADER.size:
+            return None
+        
+        (riff, _, wave_id, fmt_id, fmt_size, audio_format, channels,
+         sample_rate, _, block_align, _, data_id, data_size) = _WAV_HEADER.unpack_from(header)
+        if (riff != b'RIFF' or wave_id != b'WAVE' or fmt_id != b'fmt ' or fmt_size != 16
+                or audio_format != 1 or data_id != b'data' or not sample_rate or not block_align):
+            return None
+        
+        return sample_rate, data_size // block_align, channels
+    
     def _get_audio_duration(self, audio_path: str) -> float:
         """Get duration of audio file in seconds"""
+        try:
+            with open(audio_path, 'rb') as f:
+                header = self._parse_wav_header(f.read(_WAV_HEADER.size))
+            if header is not None:
+                sample_rate, frames, _ = header
+                return frames / sample_rate
+        except OSError:
+            pass
+        
         try:
             with wave.open(audio_path, 'rb') as wav_file:
                 frames = wav_file.getnframes()
@@ -296,41 +501,40 @@ class VoiceGenerator:
             raise ValueError("No audio files to combine")
         
         if len(audio_files) == 1:
-            # If only one file, just copy it
-            import shutil
-            shutil.copy2(audio_files[0], output_path)
+            # If only one file, just copy its contents (copyfile uses sendfile on Linux)
+            shutil.copyfile(audio_files[0], output_path)
             return output_path
         
         try:
-            # Get parameters from first file
-            with wave.open(audio_files[0], 'rb') as first_wav:
-                params = first_wav.getparams()
-                sample_rate = first_wav.getframerate()
-                sample_width = first_wav.getsampwidth()
-                channels = first_wav.getnchannels()
-            
-            # Create output file
-            with wave.open(output_path, 'wb') as output_wav:
-                output_wav.setparams(params)
+            with ExitStack() as stack:
+                # Open every chunk once: check formats and count frames first, so the output
+                # header is written once with the final length, then copy from the same readers
+                input_wavs = [stack.enter_context(wave.open(audio_file, 'rb')) for audio_file in audio_files]
+                params = input_wavs[0].getparams()
                 
                 # Add silence between chunks (0.2 seconds)
-                silence_frames = int(sample_rate * 0.2)
-                silence_data = b'\x00' * (silence_frames * sample_width * channels)
+                silence_frames = int(params.framerate * 0.2)
+                total_frames = silence_frames * (len(audio_files) - 1)
+                for audio_file, input_wav in zip(audio_files, input_wavs):
+                    # Verify compatibility
+                    if (input_wav.getframerate(), input_wav.getsampwidth(), input_wav.getnchannels()) != \
+                            (params.framerate, params.sampwidth, params.nchannels):
+                        raise RuntimeError(f"Audio file {audio_file} has incompatible format")
+                    total_frames += input_wav.getnframes()
                 
-                for i, audio_file in enumerate(audio_files):
-                    with wave.open(audio_file, 'rb') as input_wav:
-                        # Verify compatibility
-                        if (input_wav.getframerate() != sample_rate or 
-                            input_wav.getsampwidth() != sample_width or 
-                            input_wav.getnchannels() != channels):
-                            raise RuntimeError(f"Audio file {audio_file} has incompatible format")
-                        
-                        # Copy audio data
-                        output_wav.writeframes(input_wav.readframes(input_wav.getnframes()))
+                silence_data = b'\x00' * (silence_frames * params.sampwidth * params.nchannels)
+                
+                # Stream one chunk at a time; writeframesraw skips the per-call header rewrite
+                with wave.open(output_path, 'wb') as output_wav:
+                    output_wav.setparams(params)
+                    output_wav.setnframes(total_frames)
+                    
+                    for i, input_wav in enumerate(input_wavs):
+                        output_wav.writeframesraw(input_wav.readframes(input_wav.getnframes()))
                         
                         # Add silence between files (except after last file)
-                        if i < len(audio_files) - 1:
-                            output_wav.writeframes(silence_data)
+                        if i < len(input_wavs) - 1:
+                            output_wav.writeframesraw(silence_data)
             
             return output_path
             
@@ -353,13 +557,14 @@ class VoiceGenerator:
     def cleanup_temp_audio(self):
         """Clean up temporary audio files"""
         try:
-            temp_files = [f for f in os.listdir(self.config.temp_dir) 
-                         if f.startswith('voice_') and f.endswith('.wav')]
-            
-            for filename in temp_files:
-                filepath = os.path.join(self.config.temp_dir, filename)
-                if os.path.exists(filepath):
-                    os.remove(filepath)
+            with os.scandir(self.config.temp_dir) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if name.startswith('voice_') and name.endswith('.wav') and entry.is_file(follow_symlinks=False):
+                        try:
+                            os.remove(entry.path)
+                        except FileNotFoundError:
+                            pass
                     
         except Exception as e:
             print(f"Warning: Failed to cleanup temp audio files: {e}")
@@ -373,15 +578,25 @@ class VoiceGenerator:
             return False
     
     def get_available_speakers(self) -> List[Dict]:
-        """Get list of available speakers"""
+        """Get list of available speakers (reused for SPEAKERS_CACHE_TTL seconds after a successful call)"""
+        cached = self._speakers_cache
+        if cached and time.monotonic() - cached[0] < self.SPEAKERS_CACHE_TTL:
+            return copy.deepcopy(cached[1])
+        
         try:
             response = self.session.get(f"{self.base_url}/speakers", timeout=60)
             if response.status_code == 200:
-                return response.json()
+                speakers = response.json()
+                self._speakers_cache = (time.monotonic(), copy.deepcopy(speakers))
+                return speakers
             else:
                 return []
         except Exception:
             return []
+    
+    def refresh_speakers(self):
+        """Forget the cached speakers so the next get_available_speakers call asks VOICEVOX"""
+        self._speakers_cache = None
 
 def create_voice_generator() -> VoiceGenerator:
     """Factory function to create VoiceGenerator instance"""
@@ -1,6 +1,7 @@
 import os
 import pickle
 import json
+import time
 from typing import Optional, Dict, Any
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
@@ -16,6 +17,9 @@ class YouTubeUploader:
     # YouTube API scopes
     SCOPES = ['https://www.googleapis.com/auth/youtube.upload']
     
+    # Resumable upload chunk size (must be a multiple of 256 KB)
+    UPLOAD_CHUNK_SIZE = 5 * 1024 * 1024
+    
     def __init__(self, config: Config):
         """Initialize YouTube uploader with configuration"""
         self.config = config
@@ -164,10 +168,12 @@ class YouTubeUploader:
             }
             
             # Create media upload object
+            # Upload in chunks so a failed request resumes from the last chunk, not from the start
             media = MediaFileUpload(
                 video_path, 
-                chunksize=-1,  # Upload in one request
-                resumable=True
+                chunksize=self.UPLOAD_CHUNK_SIZE,
+                resumable=True,
+                mimetype='video/*'
             )
             
             print(f"Starting upload of video: {metadata['title']}")
@@ -204,6 +210,7 @@ class YouTubeUploader:
                             print(f"Upload failed after {retry} retries: {e}")
                             return None
                         print(f"Retryable error occurred, retrying ({retry}/3)...")
+                        time.sleep(2 ** retry)
                     else:
                         print(f"Non-retryable error occurred: {e}")
                         return None